@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+"""
+DRIP. ads toolkit
+Planning, validation, rendering and benchmarks of the TikTok ads
+
+Usage: python3 scripts/drip-ads.py plan
+       python3 scripts/drip-ads.py validate
+       python3 scripts/drip-ads.py render {campaign,viral,countdown,catalog}
+       python3 scripts/drip-ads.py bench
+
+See drip_ads/cli.py for the options of each command.
+"""
+
+import sys
+
+from drip_ads.cli import main
+
+if __name__ == "__main__":
+    sys.exit(main())
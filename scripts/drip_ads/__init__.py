@@ -0,0 +1,10 @@
+"""
+DRIP. ads rendering library
+Shared code of the TikTok ad generators in scripts/
+
+- config: paths, video geometry, brand colors
+- fonts: font discovery and cached FreeType faces
+- imaging / text: image preparation and text sprite primitives
+- effects: moviepy scene and clip builders
+- ads, viral, layered, catalog: the generators
+"""
@@ -0,0 +1,147 @@
+"""
+DRIP. campaign ads
+The three Saint-Valentin ads built from tiktok-fiches-production.json
+(projecteur, body sculptant, compilation 3 cadeaux), described by
+specs.campaign_specs().
+"""
+
+import json
+from pathlib import Path
+
+from .config import DATA_FILE, OUTPUT_DIR
+from .imaging import ensure_dirs
+from .scenes import build_ad, export_ad
+from .scheduler import planned_peak_mb, render_slot
+from .specs import projecteur_spec, body_spec, compilation_spec, spec_frames
+from .timeline import print_memory_report
+
+
+def generate_ad(spec: dict, music: Path = None, music_start: float = 0.0,
+                captions: str = None, encoding: dict = None) -> str:
+    """
+    Render one ad spec into OUTPUT_DIR
+    With `music` (a file, or a directory searched with the fiche's
+    musique_suggestions) the cuts are moved onto the beats and the track is
+    muxed in without re-encoding the video. `captions` ('line' or 'word')
+    burns the fiche's script_voix_off in. `encoding` sets the rate control
+    of the export (encoding.py).
+    """
+    if captions:
+        spec = {**spec, 'captions': captions}
+    if encoding:
+        spec = {**spec, 'encoding': encoding}
+
+    track = None
+    if music:
+        from .audio import beat_align
+        spec, track = beat_align(spec, music, music_start)
+
+    # Built and exported inside a slot of the machine-wide scheduler
+    memory = {}
+    with render_slot(planned_peak_mb(spec), spec_frames(spec)) as slot:
+        final_with_badge = build_ad(spec, memory)
+
+        if final_with_badge is None:
+            print("  ERROR: No scenes created!")
+            return None
+
+        # Export
+        output_path = OUTPUT_DIR / spec['output']
+        print(f"  Exporting to: {output_path}")
+
+        export_ad(final_with_badge, output_path, slot['threads'],
+                  encoding=spec.get('encoding'), music=track)
+    print_memory_report(memory)
+
+    return str(output_path)
+
+
+def generate_projecteur_video(data: dict, music: Path = None, music_start: float = 0.0,
+                              captions: str = None, encoding: dict = None) -> str:
+    """Generate the projector ad video"""
+    print("\n[1/3] Generating: Projecteur (89 Euro)")
+    return generate_ad(projecteur_spec(data), music, music_start, captions, encoding)
+
+
+def generate_body_video(data: dict, music: Path = None, music_start: float = 0.0,
+                        captions: str = None, encoding: dict = None) -> str:
+    """Generate the body sculptant ad video"""
+    print("\n[2/3] Generating: Body Sculptant (35 Euro)")
+    return generate_ad(body_spec(data), music, music_start, captions, encoding)
+
+
+def generate_compilation_video(data: dict, music: Path = None, music_start: float = 0.0,
+                               captions: str = None, encoding: dict = None) -> str:
+    """Generate the compilation ad video (3 gadgets)"""
+    print("\n[3/3] Generating: Compilation 3 Cadeaux")
+    return generate_ad(compilation_spec(data), music, music_start, captions, encoding)
+
+
+def generate_campaign_ads(music: Path = None, music_start: float = 0.0,
+                          captions: str = None, encoding: dict = None):
+    """Generate the three campaign ads, reporting per-ad failures"""
+    print("=" * 60)
+    print("DRIP. TikTok Ads Generator")
+    print("Saint-Valentin 2026 Campaign")
+    print("=" * 60)
+
+    # Setup
+    ensure_dirs()
+
+    # Load data
+    print("\nLoading production data...")
+    with open(DATA_FILE, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    print(f"Campaign: {data['campagne']}")
+    print(f"Countdown: {data['countdown']}")
+    print(f"Deadline: {data['date_limite_livraison']}")
+
+    # Generate videos
+    results = []
+
+    try:
+        video1 = generate_projecteur_video(data, music, music_start, captions, encoding)
+        if video1:
+            results.append(("Projecteur 89 Euro", video1))
+    except Exception as e:
+        print(f"  ERROR generating projecteur video: {e}")
+
+    try:
+        video2 = generate_body_video(data, music, music_start, captions, encoding)
+        if video2:
+            results.append(("Body Sculptant 35 Euro", video2))
+    except Exception as e:
+        print(f"  ERROR generating body video: {e}")
+
+    try:
+        video3 = generate_compilation_video(data, music, music_start, captions, encoding)
+        if video3:
+            results.append(("Compilation 3 Cadeaux", video3))
+    except Exception as e:
+        print(f"  ERROR generating compilation video: {e}")
+
+    # Summary
+    print("\n" + "=" * 60)
+    print("GENERATION COMPLETE!")
+    print("=" * 60)
+
+    if results:
+        print(f"\nGenerated {len(results)} videos:")
+        for name, path in results:
+            print(f"  - {name}: {path}")
+
+        print(f"\nOutput directory: {OUTPUT_DIR}")
+        print("\nNext steps:")
+        if music and captions:
+            print("  1. Record the voiceover over the burned-in captions")
+        elif music:
+            print("  1. Add voiceover in CapCut or TikTok (music is already in)")
+        else:
+            print("  1. Add music/voiceover in CapCut or TikTok")
+        print("  2. Upload to TikTok following the calendar")
+        print("  3. Use provided hashtags and captions")
+    else:
+        print("\nNo videos were generated. Check errors above.")
+
+    return results
@@ -0,0 +1,148 @@
+"""
+DRIP. animation curves
+Keyframes, easings and oscillations of the animated effects, evaluated once
+per clip into per-frame parameter tables.
+
+- A curve is a vectorized function of time: curve(times) -> values.
+  keyframes() interpolates between (time, value) points with an easing
+  per segment and holds the last value; oscillation() is a sine or cosine
+  around an offset.
+- frame_table() evaluates a curve at every frame time of a clip and snaps
+  the values to a grid (SCALE_STEP for zooms and scales, whole pixels
+  for offsets), so frames with the same parameters are recognized:
+  frames.py renders each distinct row of a table once.
+
+Only numpy is used here.
+"""
+
+import math
+
+import numpy as np
+
+from .config import FPS
+
+SCALE_STEP = 1 / 2048      # zoom/scale grid: half a pixel at the frame edge
+PIXEL_STEP = 1
+PULSE_AMOUNT = 0.05        # neon pulse: scale 0.95 to 1.05...
+PULSE_HZ = 2.0             # ...twice a second
+
+
+# =============================================================================
+# EASINGS
+# =============================================================================
+
+def linear(p):
+    return p
+
+
+def ease_in_cubic(p):
+    return p ** 3
+
+
+def ease_out_cubic(p):
+    return 1 - (1 - p) ** 3
+
+
+def ease_in_out_cubic(p):
+    return np.where(p < 0.5, 4 * p ** 3, 1 - (-2 * p + 2) ** 3 / 2)
+
+
+def ease_in_out_sine(p):
+    return -(np.cos(np.pi * p) - 1) / 2
+
+
+EASINGS = {
+    'linear': linear,
+    'ease_in_cubic': ease_in_cubic,
+    'ease_out_cubic': ease_out_cubic,
+    'ease_in_out_cubic': ease_in_out_cubic,
+    'ease_in_out_sine': ease_in_out_sine,
+}
+
+
+# =============================================================================
+# CURVES
+# =============================================================================
+
+def keyframes(points: list, easing: str = 'linear'):
+    """
+    Curve through (time, value) points, or (time, value, easing) where the
+    easing applies to the segment ending at that point. Holds the first
+    value before the first point and the last value after the last one.
+    """
+    times = np.array([point[0] for point in points], dtype=float)
+    values = np.array([point[1] for point in points], dtype=float)
+    easings = [EASINGS[point[2] if len(point) > 2 else easing] for point in points[1:]]
+    if len(points) > 1 and np.any(np.diff(times) <= 0):
+        raise ValueError("keyframe times must increase")
+
+    def curve(t):
+        t = np.asarray(t, dtype=float)
+        if len(points) == 1:
+            return np.full(t.shape, values[0])
+        segment = np.clip(np.searchsorted(times, t, side='right') - 1, 0, len(easings) - 1)
+        span = times[segment + 1] - times[segment]
+        progress = np.clip((t - times[segment]) / span, 0.0, 1.0)
+        eased = np.empty_like(progress)
+        for index, ease in enumerate(easings):
+            mask = segment == index
+            eased[mask] = ease(progress[mask])
+        return values[segment] + (values[segment + 1] - values[segment]) * eased
+
+    return curve
+
+
+def oscillation(amplitude: float, frequency: float, offset: float = 0.0,
+                wave: str = 'sin'):
+    """offset + amplitude * wave(2 pi frequency t)"""
+    function = {'sin': np.sin, 'cos': np.cos}[wave]
+
+    def curve(t):
+        return offset + amplitude * function(np.asarray(t, dtype=float) * frequency * 2 * np.pi)
+
+    return curve
+
+
+def pulse_curve():
+    """Scale of the neon pulse"""
+    return oscillation(PULSE_AMOUNT, PULSE_HZ, offset=1.0)
+
+
+# =============================================================================
+# TABLES
+# =============================================================================
+
+def snap(values: np.ndarray, step: float = None, mode: str = 'round') -> np.ndarray:
+    """Values on a grid of `step` (rounded, or truncated toward zero)"""
+    if not step:
+        return np.asarray(values, dtype=float)
+    scaled = np.asarray(values, dtype=float) / step
+    return (np.trunc(scaled) if mode == 'trunc' else np.rint(scaled)) * step
+
+
+def frame_count(duration: float) -> int:
+    return max(int(math.ceil(duration * FPS - 1e-9)), 1)
+
+
+def frame_table(curves: list, duration: float, steps: list = None, modes: list = None):
+    """
+    (frames, len(curves)) table of snapped parameters at every frame time
+    steps/modes give the grid of each curve (None: not snapped).
+    """
+    times = np.arange(frame_count(duration)) / FPS
+    steps = steps or [None] * len(curves)
+    modes = modes or ['round'] * len(curves)
+    return np.stack([snap(curve(times), step, mode)
+                     for curve, step, mode in zip(curves, steps, modes)], axis=1)
+
+
+def frame_index(t: float, frames: int) -> int:
+    """Row of a frame table for time t (nearest frame, clamped)"""
+    return min(max(int(round(t * FPS)), 0), frames - 1)
+
+
+def sprite_sizes(scales: np.ndarray, shape: tuple) -> np.ndarray:
+    """(h, w) of a sprite of `shape` at each scale, on the pixel grid"""
+    h, w = shape[:2]
+    scales = np.asarray(scales, dtype=float).reshape(-1)
+    return np.stack([(h * scales).astype(int), (w * scales).astype(int)], axis=1)
@@ -0,0 +1,316 @@
+"""
+DRIP. music
+Beat detection on a local music file, beat-aligned cut timing for ad specs
+and audio muxing that stream-copies the rendered video.
+
+- The track is decoded once to mono PCM through the ffmpeg binary moviepy
+  already uses (imageio-ffmpeg), then analysed with numpy: spectral-flux
+  onset envelope, tempo from its autocorrelation, beat phase from a comb
+  over the envelope.
+- snap_spec_to_beats() moves every scene cut (including the cuts into the
+  flash transitions) to the nearest beat, on the frame grid.
+- mux_audio() copies the H.264 stream as is and only encodes the audio
+  (AAC, faded out at the end), so adding music costs about a second.
+
+The fiche's `musique_suggestions` pick the track when --music is a
+directory and are written into the MP4 metadata.
+"""
+
+import copy
+import os
+import re
+import subprocess
+from pathlib import Path
+
+import numpy as np
+from imageio_ffmpeg import get_ffmpeg_exe
+
+from .config import FPS, RENDER_TMP_DIR
+from .delivery import staging_path
+from .scenes import export_clip
+
+AUDIO_RATE = 22050
+ONSET_WINDOW = 2048
+ONSET_HOP = 512
+TEMPO_RANGE = (60, 180)        # BPM searched
+TEMPO_PRIOR = 120              # BPM favoured between octave candidates
+MIN_SCENE = 0.4                # seconds, shortest scene after snapping
+AUDIO_FADE = 0.5               # seconds of fade-out at the end
+AUDIO_BITRATE = '192k'
+MUSIC_EXTENSIONS = {'.mp3', '.m4a', '.aac', '.wav', '.flac', '.ogg'}
+
+
+# =============================================================================
+# BEAT DETECTION
+# =============================================================================
+
+def load_audio(path: Path, rate: int = AUDIO_RATE, start: float = 0.0,
+               duration: float = None) -> np.ndarray:
+    """Mono float32 samples of an audio file, decoded by ffmpeg"""
+    cmd = [get_ffmpeg_exe(), '-v', 'error', '-ss', f"{start:.3f}"]
+    if duration:
+        cmd += ['-t', f"{duration:.3f}"]
+    cmd += ['-i', str(path), '-vn', '-ac', '1', '-ar', str(rate), '-f', 'f32le', '-']
+    result = subprocess.run(cmd, capture_output=True, check=True)
+    return np.frombuffer(result.stdout, dtype=np.float32)
+
+
+def onset_envelope(samples: np.ndarray, rate: int = AUDIO_RATE) -> tuple:
+    """
+    Spectral-flux onset strength, one value per hop
+    Returns (envelope, envelope frames per second).
+    """
+    if len(samples) < ONSET_WINDOW:
+        samples = np.pad(samples, (0, ONSET_WINDOW - len(samples)))
+    frames = np.lib.stride_tricks.sliding_window_view(samples, ONSET_WINDOW)[::ONSET_HOP]
+    spectrum = np.abs(np.fft.rfft(frames * np.hanning(ONSET_WINDOW), axis=1))
+    log_spectrum = np.log1p(1000 * spectrum)
+
+    flux = np.maximum(np.diff(log_spectrum, axis=0), 0).sum(axis=1)
+    flux = np.concatenate([[0.0], flux])
+
+    # Remove the slowly varying loudness so only the attacks remain
+    local_mean = np.convolve(flux, np.ones(16) / 16, mode='same')
+    envelope = np.maximum(flux - local_mean, 0)
+    peak = envelope.max()
+    if peak > 0:
+        envelope /= peak
+    return envelope, rate / ONSET_HOP
+
+
+def estimate_period(envelope: np.ndarray, env_rate: float) -> float:
+    """Beat period in envelope frames, from the envelope autocorrelation"""
+    n = len(envelope)
+    centered = envelope - envelope.mean()
+    spectrum = np.fft.rfft(centered, 2 * n)
+    autocorr = np.fft.irfft(spectrum * np.conj(spectrum))[:n]
+
+    min_lag = max(1, int(env_rate * 60 / TEMPO_RANGE[1]))
+    max_lag = min(n - 1, int(env_rate * 60 / TEMPO_RANGE[0]))
+    if max_lag <= min_lag:
+        return env_rate * 60 / TEMPO_PRIOR
+
+    lags = np.arange(min_lag, max_lag + 1)
+    bpm = env_rate * 60 / lags
+    # Log-gaussian prior around TEMPO_PRIOR settles half/double tempo ambiguity
+    weights = np.exp(-0.5 * (np.log2(bpm / TEMPO_PRIOR) / 0.9) ** 2)
+    best = lags[np.argmax(autocorr[lags] * weights)]
+
+    # Parabolic interpolation for a sub-frame period
+    if min_lag < best < max_lag:
+        a, b, c = autocorr[best - 1], autocorr[best], autocorr[best + 1]
+        denom = a - 2 * b + c
+        if denom != 0:
+            return best + 0.5 * (a - c) / denom
+    return float(best)
+
+
+def detect_beats(path: Path, start: float = 0.0, duration: float = None) -> dict:
+    """
+    Tempo and beat times (seconds from `start`) of a music file
+    Beats follow a regular grid whose phase maximizes the onset energy,
+    which keeps cuts evenly spaced even on quiet bars, each one then moved
+    onto its nearby onset peak.
+    """
+    samples = load_audio(path, start=start, duration=duration)
+    envelope, env_rate = onset_envelope(samples)
+    period = estimate_period(envelope, env_rate)
+
+    # Comb score of every phase, computed for all phases at once
+    steps = np.arange(0, len(envelope) - 1, period)
+    phases = np.arange(int(np.ceil(period)))
+    positions = np.rint(phases[:, None] + steps[None, :]).astype(int)
+    valid = positions < len(envelope)
+    scores = np.where(valid, envelope[np.minimum(positions, len(envelope) - 1)], 0).sum(axis=1)
+    phase = phases[np.argmax(scores)]
+
+    # Pull every grid beat to the strongest onset within 10% of a period,
+    # then refit the grid to those onsets, so a slightly off period does
+    # not drift over the track
+    reach = max(1, int(period * 0.1))
+    padded = np.pad(envelope, reach)
+    origin = float(phase)
+    for _ in range(3):
+        grid = np.rint(origin + np.arange(0, len(envelope) - origin, period)).astype(int)
+        grid = grid[grid < len(envelope)]
+        windows = np.lib.stride_tricks.sliding_window_view(padded, 2 * reach + 1)[grid]
+        strong = windows.max(axis=1) > 0.1
+        refined = np.where(strong, grid + windows.argmax(axis=1) - reach, grid)
+        if strong.sum() < 4:
+            break
+        index = np.rint((grid - origin) / period)
+        period, origin = np.polyfit(index[strong], refined[strong], 1)
+
+    # Envelope frames are stamped at the start of their window; an attack
+    # registers once it reaches the centre of the Hann window
+    beats = (refined + ONSET_WINDOW / 2 / ONSET_HOP) / env_rate
+    beats = beats[beats < len(samples) / AUDIO_RATE]
+    return {
+        'tempo': round(60 * env_rate / period, 1),
+        'beats': beats,
+        'duration': len(samples) / AUDIO_RATE,
+    }
+
+
+# =============================================================================
+# BEAT-ALIGNED TIMING
+# =============================================================================
+
+def snap_spec_to_beats(spec: dict, beats: np.ndarray, min_scene: float = MIN_SCENE) -> dict:
+    """
+    Copy of an ad spec whose scene cuts fall on beats
+    Every cut moves to the beat nearest to its original time (at most half
+    a beat away), snapped to the frame grid. Flash transitions keep their
+    length so the cut into the flash lands on the beat. Overlay timings of
+    image scenes are stretched with their scene.
+    """
+    spec = copy.deepcopy(spec)
+    beats = np.rint(np.asarray(beats) * FPS) / FPS
+    max_shift = np.median(np.diff(beats)) / 2 if len(beats) > 1 else 0.0
+
+    planned_end = 0.0
+    start = 0.0
+    for scene in spec['scenes']:
+        old_duration = scene['duration']
+        planned_end += old_duration
+
+        if scene['type'] == 'flash':
+            end = start + old_duration
+        else:
+            shortest = start + min(min_scene, old_duration)
+            candidates = beats[beats >= shortest - 1e-6]
+            end = round(max(planned_end, shortest) * FPS) / FPS
+            if len(candidates):
+                nearest = candidates[np.argmin(np.abs(candidates - planned_end))]
+                if abs(nearest - planned_end) <= max_shift:
+                    end = float(nearest)
+
+        new_duration = round(end - start, 6)
+        if scene['type'] == 'image_text' and new_duration != old_duration:
+            scale = new_duration / old_duration
+            for overlay in scene.get('overlays', []):
+                overlay['start'] = round(overlay['start'] * scale, 3)
+                overlay['end'] = round(overlay['end'] * scale, 3)
+        scene['duration'] = new_duration
+        start = end
+
+    return spec
+
+
+# =============================================================================
+# TRACK SELECTION AND MUXING
+# =============================================================================
+
+def slug(text: str) -> str:
+    return re.sub(r'[^a-z0-9]+', '', text.lower())
+
+
+def find_music(music: Path, suggestions: list) -> tuple:
+    """
+    (audio file, matching suggestion) for an ad
+    `music` is a file, or a directory searched for the first of the fiche's
+    musique_suggestions whose title appears in a file name.
+    """
+    music = Path(music)
+    if not music.is_dir():
+        stem = slug(music.stem)
+        for suggestion in suggestions or []:
+            title = slug(suggestion.split(' - ')[0])
+            if title and title in stem:
+                return music, suggestion
+        return music, None
+
+    files = sorted(p for p in music.iterdir() if p.suffix.lower() in MUSIC_EXTENSIONS)
+    for suggestion in suggestions or []:
+        title = slug(suggestion.split(' - ')[0])
+        for path in files:
+            if title and title in slug(path.stem):
+                return path, suggestion
+    return None, None
+
+
+def music_metadata(path: Path, suggestion: str, suggestions: list) -> dict:
+    metadata = {'comment': f"Music: {suggestion or Path(path).stem}"}
+    if suggestions:
+        metadata['description'] = "Suggested sounds: " + " | ".join(suggestions)
+    return metadata
+
+
+def mux_audio(video_path: Path, audio_path: Path, output_path: Path,
+              duration: float, start: float = 0.0, metadata: dict = None):
+    """
+    Adds a music track to a rendered video without re-encoding the video
+    The audio starts at `start` in the track, is cut to the video length and
+    fades out over the last AUDIO_FADE seconds. Written to its
+    delivery.staging_path() (outside public/) and renamed once complete.
+    """
+    output_path = Path(output_path)
+    part_path = staging_path(output_path)
+    fade_start = max(duration - AUDIO_FADE, 0)
+
+    cmd = [
+        get_ffmpeg_exe(), '-y', '-v', 'error',
+        '-i', str(video_path),
+        '-ss', f"{start:.3f}", '-i', str(audio_path),
+        '-map', '0:v:0', '-map', '1:a:0',
+        '-c:v', 'copy',
+        '-c:a', 'aac', '-b:a', AUDIO_BITRATE,
+        '-af', f"afade=t=out:st={fade_start:.3f}:d={AUDIO_FADE}",
+        '-t', f"{duration:.3f}",
+        '-movflags', '+faststart',
+    ]
+    for key, value in (metadata or {}).items():
+        cmd += ['-metadata', f"{key}={value}"]
+    cmd.append(str(part_path))
+
+    try:
+        subprocess.run(cmd, check=True)
+        os.replace(part_path, output_path)
+    finally:
+        if part_path.exists():
+            part_path.unlink()
+
+
+def beat_align(spec: dict, music: Path, start: float = 0.0) -> tuple:
+    """
+    (beat-aligned spec, music options for export_with_music), or the spec
+    unchanged and None when no track matches the fiche
+    """
+    suggestions = spec.get('music', [])
+    path, suggestion = find_music(music, suggestions)
+    if path is None:
+        print(f"  WARNING: no track in {music} matches {suggestions}, exporting without music")
+        return spec, None
+
+    analysis = detect_beats(path, start=start)
+    aligned = snap_spec_to_beats(spec, analysis['beats'])
+    print(f"  Music: {path.name} ({analysis['tempo']} BPM, "
+          f"{len(analysis['beats'])} beats)")
+    return aligned, {
+        'path': path,
+        'start': start,
+        'metadata': music_metadata(path, suggestion, suggestions),
+    }
+
+
+def export_with_music(clip, output_path: Path, music: dict, threads: int,
+                      encoding: dict = None) -> dict:
+    """
+    Exports a clip without audio with `threads` x264 threads, then muxes the
+    music of beat_align() in
+    A target size of `encoding` keeps room for the AAC track; its delivery
+    outputs are named after output_path and stay silent.
+    """
+    output_path = Path(output_path)
+    RENDER_TMP_DIR.mkdir(parents=True, exist_ok=True)
+    silent_path = RENDER_TMP_DIR / f"{output_path.stem}.{os.getpid()}.silent.mp4"
+    try:
+        encoded = export_clip(clip, silent_path, threads=threads, encoding=encoding,
+                              audio_kbps=int(AUDIO_BITRATE.rstrip('k')),
+                              delivery_base=output_path)
+        mux_audio(silent_path, music['path'], output_path, clip.duration,
+                  start=music['start'], metadata=music['metadata'])
+    finally:
+        if silent_path.exists():
+            silent_path.unlink()
+    return encoded
@@ -0,0 +1,149 @@
+"""
+DRIP. procedural backgrounds
+Backgrounds drawn as arrays in memory: no file, no decoding, no resampling.
+Scene sources describe them (specs.source_background, BACKGROUND_KINDS):
+
+    {'kind': 'solid', 'color': [r, g, b]}
+    {'kind': 'linear', 'colors': [[r, g, b], ...], 'angle': 90}
+        colors spread evenly along `angle` (degrees, 0 = left to right,
+        90 = top to bottom)
+    {'kind': 'radial', 'colors': [...], 'center': [0.5, 0.5], 'radius': 1.0}
+        from `center` (fractions of the frame) out to `radius` (fraction of
+        the half diagonal)
+    {'kind': 'noise', 'color': [r, g, b], 'amount': 12, 'seed': 0}
+        monochrome grain around a color, the same for a given seed
+    {'kind': 'animated', 'colors': [...], 'angle': 90, 'period': 4.0}
+        a looping linear gradient scrolling along `angle`, one loop per period
+
+Gradients are GRADIENT_STEPS-entry palettes indexed by a per-pixel position
+computed once, so a gradient frame is a single gather. Static backgrounds
+are cached read-only; an animated one snaps its phase to the palette and
+is produced in batches by frames.table_clip.
+"""
+
+import json
+from functools import lru_cache
+
+import numpy as np
+from PIL import Image
+from moviepy import ImageClip, VideoClip
+
+from .animation import frame_table
+from .config import VIDEO_WIDTH, VIDEO_HEIGHT
+from .frames import table_clip, zoom_clip
+
+GRADIENT_STEPS = 1024
+# A 1080x1920 RGB background is ~6 MB
+BACKGROUND_CACHE_SIZE = 8
+
+
+def palette(colors: list, steps: int = GRADIENT_STEPS, loop: bool = False) -> np.ndarray:
+    """(steps, 3) uint8 ramp through colors (back to the first one when loop)"""
+    stops = np.array(colors, dtype=float).reshape(-1, 3)
+    if loop:
+        stops = np.vstack([stops, stops[:1]])
+    positions = np.linspace(0.0, 1.0, len(stops))
+    x = np.arange(steps) / (steps if loop else max(steps - 1, 1))
+    ramp = np.stack([np.interp(x, positions, stops[:, c]) for c in range(3)], axis=1)
+    return np.rint(ramp).astype(np.uint8)
+
+
+def pixel_grid() -> tuple:
+    """x (1, W) and y (H, 1) pixel coordinates relative to the frame centre"""
+    x = np.arange(VIDEO_WIDTH, dtype=np.float32) - (VIDEO_WIDTH - 1) / 2
+    y = np.arange(VIDEO_HEIGHT, dtype=np.float32) - (VIDEO_HEIGHT - 1) / 2
+    return x[None, :], y[:, None]
+
+
+def linear_position(angle: float) -> np.ndarray:
+    """(H, W) position 0..1 of every pixel along the direction of angle"""
+    radians = np.deg2rad(angle)
+    dx, dy = np.float32(np.cos(radians)), np.float32(np.sin(radians))
+    x, y = pixel_grid()
+    extent = abs(dx) * (VIDEO_WIDTH - 1) / 2 + abs(dy) * (VIDEO_HEIGHT - 1) / 2
+    return (x * dx + y * dy) / (2 * extent) + 0.5
+
+
+def radial_position(center: list, radius: float) -> np.ndarray:
+    """(H, W) distance 0..1 of every pixel from center, 1 at radius and beyond"""
+    x, y = pixel_grid()
+    cx = (center[0] - 0.5) * VIDEO_WIDTH
+    cy = (center[1] - 0.5) * VIDEO_HEIGHT
+    half_diagonal = np.hypot(VIDEO_WIDTH, VIDEO_HEIGHT) / 2
+    distance = np.sqrt((x - cx) ** 2 + (y - cy) ** 2) / (radius * half_diagonal)
+    return np.minimum(distance, 1.0)
+
+
+def gradient(colors: list, position: np.ndarray) -> np.ndarray:
+    """Frame of the palette of colors looked up at every pixel position"""
+    indices = np.rint(position * (GRADIENT_STEPS - 1)).astype(np.int16)
+    return np.take(palette(colors), indices, axis=0)
+
+
+def noise(color: list, amount: float, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    grain = rng.standard_normal((VIDEO_HEIGHT, VIDEO_WIDTH, 1), dtype=np.float32) * amount
+    return np.clip(grain + np.array(color, dtype=np.float32), 0, 255).astype(np.uint8)
+
+
+@lru_cache(maxsize=BACKGROUND_CACHE_SIZE)
+def _static_background(key: str) -> np.ndarray:
+    background = json.loads(key)
+    kind = background['kind']
+    if kind == 'solid':
+        # One pixel seen as a whole frame: no frame-sized allocation
+        return np.broadcast_to(np.array(background['color'], dtype=np.uint8),
+                               (VIDEO_HEIGHT, VIDEO_WIDTH, 3))
+    elif kind == 'linear':
+        frame = gradient(background['colors'], linear_position(background.get('angle', 90)))
+    elif kind == 'radial':
+        frame = gradient(background['colors'], radial_position(
+            background.get('center', [0.5, 0.5]), background.get('radius', 1.0)))
+    elif kind == 'noise':
+        frame = noise(background['color'], background.get('amount', 12),
+                      background.get('seed', 0))
+    else:
+        raise ValueError(f"Unknown static background '{kind}'")
+    frame.setflags(write=False)
+    return frame
+
+
+def background_array(background: dict) -> np.ndarray:
+    """
+    Read-only (H, W, 3) frame of a static background
+    Cached per description: scenes sharing a background share the array.
+    """
+    return _static_background(json.dumps(background, sort_keys=True))
+
+
+def animated_clip(background: dict, duration: float, batch_size: int = None) -> VideoClip:
+    """Looping gradient scrolling one palette length per period"""
+    steps = GRADIENT_STEPS
+    colors = palette(background['colors'], steps, loop=True)
+    position = linear_position(background.get('angle', 90))
+    # Pixel -> palette entry at phase 0; a phase of s entries adds s
+    base = ((position * steps).astype(np.int32) % steps).astype(np.int16)
+    period = background.get('period', 4.0)
+    shifts = frame_table([lambda t: (t / period) % 1.0 * steps], duration, [1]).astype(int)
+
+    def render(rows):
+        frames = np.empty((len(rows), VIDEO_HEIGHT, VIDEO_WIDTH, 3), dtype=np.uint8)
+        for frame, (shift,) in zip(frames, rows):
+            # A shifted lookup is a lookup in the rolled palette
+            np.take(np.roll(colors, -shift, axis=0), base, axis=0, out=frame)
+        return frames
+
+    return table_clip(shifts, render, duration, batch_size)
+
+
+def background_clip(background: dict, duration: float, curve=None) -> VideoClip:
+    """
+    Full-frame clip of a background, zoomed along curve when given (solid
+    backgrounds look the same at every zoom and are never zoomed)
+    """
+    if background['kind'] == 'animated':
+        return animated_clip(background, duration)
+    array = background_array(background)
+    if curve is not None and background['kind'] != 'solid':
+        return zoom_clip(Image.fromarray(array), duration, curve)
+    return ImageClip(array).with_duration(duration)
@@ -0,0 +1,214 @@
+"""
+DRIP. micro-benchmarks
+Times the rendering primitives in-process (source preparation, text
+sprites, frame production of representative scenes) so optimizations can
+be compared before/after on the same box.
+"""
+
+import subprocess
+import sys
+import time
+
+from .config import PUBLIC_DIR, FPS, ROSE_NEON
+
+BENCH_IMAGE = PUBLIC_DIR / "images" / "projector-1.jpg"
+BENCH_BACKGROUND = {'kind': 'animated', 'colors': [[255, 77, 109], [26, 26, 46]],
+                    'angle': 60, 'period': 2.0}
+
+
+def best_of(fn, repeat: int) -> float:
+    """Best wall time of fn() over repeat runs, in seconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def frames_per_second(clip, frames: int, repeat: int) -> float:
+    """Frame production rate of a clip over its first frames"""
+    times = [i / FPS for i in range(frames)]
+
+    def run():
+        for t in times:
+            clip.get_frame(t)
+
+    return frames / best_of(run, repeat)
+
+
+def bench_imports(frames: int, repeat: int) -> list:
+    """Cold import cost of the heavy dependencies (fresh interpreters)"""
+    def cold(statement):
+        return best_of(lambda: subprocess.run(
+            [sys.executable, '-c', statement], check=True), repeat)
+
+    baseline = cold('pass')
+    return [
+        ('import numpy', (cold('import numpy') - baseline) * 1000, 'ms'),
+        ('import PIL.Image', (cold('import PIL.Image') - baseline) * 1000, 'ms'),
+        ('import moviepy', (cold('import moviepy') - baseline) * 1000, 'ms'),
+    ]
+
+
+def bench_prepare(frames: int, repeat: int) -> list:
+    """resize_for_tiktok, cold and from the in-process cache"""
+    from .imaging import resize_for_tiktok, _prepare_for_tiktok
+
+    def cold():
+        _prepare_for_tiktok.cache_clear()
+        resize_for_tiktok(BENCH_IMAGE)
+
+    return [
+        ('prepare source (cold)', best_of(cold, repeat) * 1000, 'ms'),
+        ('prepare source (cached)',
+         best_of(lambda: resize_for_tiktok(BENCH_IMAGE), repeat) * 1000, 'ms'),
+    ]
+
+
+def bench_text(frames: int, repeat: int) -> list:
+    """Neon sprite rendering, cold and cached"""
+    from .text import create_neon_text_image
+
+    def cold():
+        create_neon_text_image.cache_clear()
+        create_neon_text_image("J-9", 200, ROSE_NEON, ROSE_NEON)
+
+    return [
+        ('neon sprite (cold)', best_of(cold, repeat) * 1000, 'ms'),
+        ('neon sprite (cached)', best_of(
+            lambda: create_neon_text_image("J-9", 200, ROSE_NEON, ROSE_NEON),
+            repeat) * 1000, 'ms'),
+    ]
+
+
+def bench_scene(frames: int, repeat: int) -> list:
+    """Campaign scene: Ken Burns zoom + text overlay"""
+    from .effects import create_scene_with_text
+
+    scene = create_scene_with_text(BENCH_IMAGE, duration=frames / FPS + 1, overlays=[
+        {'text': "89 Euro", 'start': 0, 'end': frames / FPS + 1,
+         'position': ('center', 1400), 'font_size': 70, 'color': 'gold'}
+    ])
+    return [('campaign scene', frames_per_second(scene, frames, repeat), 'fps')]
+
+
+def bench_viral(frames: int, repeat: int) -> list:
+    """Viral quick cut: zoom punch + neon text"""
+    from .effects import create_neon_text_clip
+    from .scenes import build_quick_cut_scene
+
+    scene = build_quick_cut_scene(BENCH_IMAGE, "EFFET WOW", duration=frames / FPS + 1)
+    pulse = create_neon_text_clip("J-9", duration=frames / FPS + 1, font_size=200,
+                                  text_color=ROSE_NEON, glow_color=ROSE_NEON,
+                                  pulse=True)
+    return [
+        ('viral quick cut', frames_per_second(scene, frames, repeat), 'fps'),
+        ('neon pulse sprite', frames_per_second(pulse, frames, repeat), 'fps'),
+    ]
+
+
+def bench_batch(frames: int, repeat: int) -> list:
+    """Batched effects: one frame per batch against FRAME_BATCH frames"""
+    from .config import FRAME_BATCH
+    from .frames import zoom_clip, ken_burns_curve
+    from .imaging import resize_for_tiktok
+
+    image = resize_for_tiktok(BENCH_IMAGE)
+    seconds = frames / FPS + 1
+    results = []
+    for batch_size in sorted({1, FRAME_BATCH}):
+        clip = zoom_clip(image, seconds, ken_burns_curve(seconds), batch_size=batch_size)
+        results.append((f'ken burns (batch {batch_size})',
+                        frames_per_second(clip, frames, repeat), 'fps'))
+    return results
+
+
+def bench_background(frames: int, repeat: int) -> list:
+    """Procedural backgrounds against a solid color saved and prepared as a JPEG"""
+    import tempfile
+    from pathlib import Path
+
+    from PIL import Image
+
+    from .backgrounds import animated_clip, background_array, _static_background
+    from .config import VIDEO_WIDTH, VIDEO_HEIGHT
+    from .imaging import resize_for_tiktok
+
+    linear = dict(BENCH_BACKGROUND, kind='linear')
+
+    def cold(background):
+        _static_background.cache_clear()
+        background_array(background)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        def jpeg_round_trip():
+            path = Path(tmp) / "solid.jpg"
+            Image.new('RGB', (VIDEO_WIDTH, VIDEO_HEIGHT), (30, 30, 40)).save(path)
+            resize_for_tiktok(path)
+
+        jpeg_ms = best_of(jpeg_round_trip, repeat) * 1000
+
+    clip = animated_clip(BENCH_BACKGROUND, frames / FPS + 1)
+    return [
+        ('solid via JPEG', jpeg_ms, 'ms'),
+        ('solid (cold)', best_of(lambda: cold({'kind': 'solid', 'color': [30, 30, 40]}),
+                                 repeat) * 1000, 'ms'),
+        ('linear gradient (cold)', best_of(lambda: cold(linear), repeat) * 1000, 'ms'),
+        ('gradient (cached)', best_of(lambda: background_array(linear), repeat) * 1000, 'ms'),
+        ('animated gradient', frames_per_second(clip, frames, repeat), 'fps'),
+    ]
+
+
+def bench_transitions(frames: int, repeat: int) -> list:
+    """Transition kernels blending two full frames, then a transition in a timeline"""
+    import numpy as np
+
+    from .backgrounds import background_array
+    from .imaging import resize_for_tiktok
+    from .timeline import timeline_clip
+    from .transitions import TRANSITIONS, apply_transition, transition_buffers
+
+    outgoing = np.asarray(resize_for_tiktok(BENCH_IMAGE))
+    incoming = background_array(dict(BENCH_BACKGROUND, kind='linear'))
+    out = np.empty_like(outgoing)
+    buffers = transition_buffers(out.shape)
+
+    def kernel_fps(transition):
+        def run():
+            for i in range(frames):
+                apply_transition(out, outgoing, incoming, i / frames, transition, buffers)
+        return frames / best_of(run, repeat)
+
+    results = [(f'{kind} kernel', kernel_fps({'kind': kind}), 'fps') for kind in TRANSITIONS]
+    results.append(('whip (up) kernel', kernel_fps({'kind': 'whip', 'direction': 'up'}), 'fps'))
+    seconds = frames / FPS
+    clip = timeline_clip([
+        (0, seconds, {'type': 'flash', 'duration': seconds}),
+        (seconds, 2 * seconds, {'type': 'flash', 'duration': seconds,
+                                'transition': {'kind': 'crossfade', 'duration': 2 * seconds}}),
+    ])
+    results.append(('timeline crossfade', frames_per_second(clip, frames, repeat), 'fps'))
+    return results
+
+
+BENCHMARKS = {
+    'imports': bench_imports,
+    'prepare': bench_prepare,
+    'text': bench_text,
+    'scene': bench_scene,
+    'viral': bench_viral,
+    'batch': bench_batch,
+    'background': bench_background,
+    'transitions': bench_transitions,
+}
+
+
+def run_benchmarks(names: list = None, frames: int = 30, repeat: int = 3) -> list:
+    """Runs the selected benchmarks (all by default) and prints a table"""
+    results = []
+    for name in names or list(BENCHMARKS):
+        for label, value, unit in BENCHMARKS[name](frames, repeat):
+            results.append((label, value, unit))
+            print(f"  {label:<28} {value:>10.1f} {unit}")
+    return results
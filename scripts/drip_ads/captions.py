@@ -0,0 +1,245 @@
+"""
+DRIP. captions
+Burned-in captions for the fiche's script_voix_off, drawn from a glyph
+atlas instead of one TextClip per caption.
+
+- glyph_atlas() rasterizes every glyph of ATLAS_CHARSET once per font size,
+  as a fill mask and a stroked outline mask side by side in one sheet.
+- caption_sprite() lays a caption out by copying glyph cells out of the
+  atlas (no FreeType call), cached per caption text.
+- caption_layer() blends the active caption sprite into each frame buffer
+  in place, so a few hundred cues cost one lookup and one blend per frame;
+  ads draw it in the timeline's pass (timeline.py), add_captions() applies
+  it to any clip.
+
+Cue timing comes from the script itself: its lines share the ad duration in
+proportion to their length (a steady speaking rate), and in word mode
+each word gets its share of its line.
+"""
+
+import math
+import re
+from functools import lru_cache
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from .config import VIDEO_WIDTH, WHITE, BLACK
+from .fonts import get_font
+from .imaging import blend_rgba, hex_to_rgb
+
+CAPTION_MODES = ['line', 'word']
+CAPTION_FONT_SIZE = {'line': 56, 'word': 96}
+CAPTION_Y = 1150               # centre of the caption block
+CAPTION_STROKE = 4
+CAPTION_MARGIN = 80
+CAPTION_MAX_CHARS = 42         # longer script lines are split into several cues
+CAPTION_PAUSE = 4              # pause between script lines, in characters
+CAPTION_CACHE_SIZE = 512
+
+ATLAS_CHARSET = (
+    ''.join(chr(c) for c in range(32, 127))
+    + "àâäçéèêëîïôöùûüÿœæÀÂÄÇÉÈÊËÎÏÔÖÙÛÜŸŒÆ€’«»…"
+)
+
+
+# =============================================================================
+# GLYPH ATLAS
+# =============================================================================
+
+@lru_cache(maxsize=8)
+def glyph_atlas(size: int, family: str = 'sans-bold', stroke: int = CAPTION_STROKE) -> dict:
+    """
+    Every glyph of ATLAS_CHARSET rendered once, in a single row
+    Returns {'fill', 'outline'} (H, W) uint8 masks, the cell height and
+    {char: (x, cell width, advance)}.
+    """
+    font = get_font(size, family)
+    ascent, descent = font.getmetrics()
+    height = ascent + descent + 2 * stroke
+
+    glyphs = {}
+    x = 0
+    for char in ATLAS_CHARSET:
+        right = font.getbbox(char)[2]
+        cell = max(int(math.ceil(right)), 1) + 2 * stroke
+        glyphs[char] = (x, cell, font.getlength(char))
+        x += cell
+
+    fill = Image.new('L', (x, height), 0)
+    outline = Image.new('L', (x, height), 0)
+    fill_draw = ImageDraw.Draw(fill)
+    outline_draw = ImageDraw.Draw(outline)
+    for char, (cell_x, _, _) in glyphs.items():
+        if char == ' ':
+            continue
+        position = (cell_x + stroke, stroke)
+        fill_draw.text(position, char, font=font, fill=255)
+        outline_draw.text(position, char, font=font, fill=255,
+                          stroke_width=stroke, stroke_fill=255)
+
+    return {
+        'fill': np.asarray(fill),
+        'outline': np.asarray(outline),
+        'height': height,
+        'stroke': stroke,
+        'glyphs': glyphs,
+    }
+
+
+def atlas_glyph(atlas: dict, char: str) -> tuple:
+    return atlas['glyphs'].get(char) or atlas['glyphs']['?']
+
+
+def text_width(text: str, atlas: dict) -> float:
+    return sum(atlas_glyph(atlas, char)[2] for char in text)
+
+
+def wrap_caption(text: str, atlas: dict, max_width: float) -> list:
+    """Greedy word wrap on atlas advances"""
+    lines = []
+    current = ''
+    for word in text.split():
+        candidate = f"{current} {word}" if current else word
+        if current and text_width(candidate, atlas) > max_width:
+            lines.append(current)
+            current = word
+        else:
+            current = candidate
+    if current:
+        lines.append(current)
+    return lines
+
+
+@lru_cache(maxsize=CAPTION_CACHE_SIZE)
+def caption_sprite(text: str, size: int, color: str = WHITE,
+                   stroke_color: str = BLACK) -> np.ndarray:
+    """
+    RGBA sprite of a centred, wrapped caption, assembled from atlas cells
+    Shared between callers: read-only.
+    """
+    atlas = glyph_atlas(size)
+    stroke = atlas['stroke']
+    cell_height = atlas['height']
+    line_step = int(cell_height * 1.05)
+
+    lines = wrap_caption(text, atlas, VIDEO_WIDTH - 2 * CAPTION_MARGIN)
+    widths = [text_width(line, atlas) for line in lines]
+    width = int(math.ceil(max(widths, default=0))) + 2 * stroke
+    height = line_step * (len(lines) - 1) + cell_height if lines else 1
+    # Room for glyphs drawn past their advance, cropped below
+    overhang = max(cell for _, cell, _ in atlas['glyphs'].values())
+
+    fill = np.zeros((height, width + overhang), dtype=np.uint8)
+    outline = np.zeros((height, width + overhang), dtype=np.uint8)
+    for row, (line, line_width) in enumerate(zip(lines, widths)):
+        top = row * line_step
+        pen = (width - line_width) / 2 - stroke
+        for char in line:
+            cell_x, cell, advance = atlas_glyph(atlas, char)
+            left = max(int(round(pen)), 0)
+            # Neighbouring cells overlap by the stroke: keep the strongest pixel
+            np.maximum(fill[top:top + cell_height, left:left + cell],
+                       atlas['fill'][:, cell_x:cell_x + cell],
+                       out=fill[top:top + cell_height, left:left + cell])
+            np.maximum(outline[top:top + cell_height, left:left + cell],
+                       atlas['outline'][:, cell_x:cell_x + cell],
+                       out=outline[top:top + cell_height, left:left + cell])
+            pen += advance
+
+    used = np.flatnonzero(outline.any(axis=0))
+    right = max(width, used[-1] + 1) if len(used) else width
+    fill, outline = fill[:, :right], outline[:, :right]
+    height, width = outline.shape
+
+    fill_rgb = np.array(hex_to_rgb(color), dtype=np.float32)
+    stroke_rgb = np.array(hex_to_rgb(stroke_color), dtype=np.float32)
+    mix = fill[..., None].astype(np.float32) / 255
+    sprite = np.empty((height, width, 4), dtype=np.uint8)
+    sprite[..., :3] = np.rint(stroke_rgb + (fill_rgb - stroke_rgb) * mix)
+    sprite[..., 3] = outline
+    sprite.setflags(write=False)
+    return sprite
+
+
+# =============================================================================
+# CUES
+# =============================================================================
+
+def split_line(line: str, max_chars: int = CAPTION_MAX_CHARS) -> list:
+    """Splits a long script line at sentence ends, then between words"""
+    chunks = []
+    for sentence in re.split(r'(?<=[.?!:])\s+', line):
+        current = ''
+        for word in sentence.split():
+            candidate = f"{current} {word}" if current else word
+            if current and len(candidate) > max_chars:
+                chunks.append(current)
+                current = word
+            else:
+                current = candidate
+        if current:
+            chunks.append(current)
+    return chunks
+
+
+def caption_cues(lines: list, start: float, end: float, mode: str = 'line') -> list:
+    """
+    Timed captions for script lines spoken between start and end
+    Time is shared in proportion to characters, with a short pause after
+    each line; word mode gives every word its own cue.
+    """
+    if mode not in CAPTION_MODES:
+        raise ValueError(f"Unknown caption mode '{mode}' (available: {', '.join(CAPTION_MODES)})")
+
+    units = []
+    for line in lines:
+        chunks = split_line(line) if mode == 'line' else line.split()
+        units += [(chunk, len(chunk) + 1) for chunk in chunks]
+        units.append((None, CAPTION_PAUSE))
+
+    total = sum(weight for _, weight in units)
+    if not total or end <= start:
+        return []
+
+    cues = []
+    t = start
+    for text, weight in units:
+        duration = (end - start) * weight / total
+        if text:
+            cues.append({'text': text, 'start': round(t, 3), 'end': round(t + duration, 3)})
+        t += duration
+    return cues
+
+
+def caption_layer(cues: list, mode: str = 'line', y: int = CAPTION_Y):
+    """Timeline layer blending the active cue's cached sprite into the frame"""
+    size = CAPTION_FONT_SIZE[mode]
+    starts = np.array([cue['start'] for cue in cues])
+    # Build the atlas and the sprites up front, not on the first frames
+    for cue in cues:
+        caption_sprite(cue['text'], size)
+
+    def draw(frame, t):
+        index = int(np.searchsorted(starts, t, side='right')) - 1
+        if index < 0 or t >= cues[index]['end']:
+            return
+        sprite = caption_sprite(cues[index]['text'], size)
+        blend_rgba(frame, sprite, (frame.shape[1] - sprite.shape[1]) // 2,
+                   y - sprite.shape[0] // 2)
+
+    return draw
+
+
+def add_captions(clip, cues: list, mode: str = 'line', y: int = CAPTION_Y):
+    """Burns the cues into a clip, blending one cached sprite per frame"""
+    if not cues:
+        return clip
+    draw = caption_layer(cues, mode, y)
+
+    def burn(get_frame, t):
+        frame = np.array(get_frame(t), dtype=np.uint8)
+        draw(frame, t)
+        return frame
+
+    return clip.transform(burn)
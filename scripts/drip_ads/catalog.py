@@ -0,0 +1,207 @@
+"""
+DRIP. catalog ads
+Applies a scene template to every product of src/data/products.json and
+renders them through a bounded process pool, with a resumable manifest.
+"""
+
+import json
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from pathlib import Path
+
+from .config import (
+    PROJECT_ROOT, CATALOG_FILE, CATALOG_OUTPUT_DIR, CATALOG_MANIFEST,
+    OUTPUT_DIR, VIDEO_WIDTH, VIDEO_HEIGHT, FPS
+)
+from .imaging import ensure_dirs
+from .scenes import render_spec
+from .scheduler import max_jobs, planned_peak_mb
+from .specs import CATALOG_TEMPLATES, catalog_spec, spec_hash
+
+MIN_FREE_DISK_MB = 500
+
+
+def load_catalog(category: str = None, ids: list = None,
+                 valentine_only: bool = False) -> list:
+    """Load products.json and keep the products matching the filters"""
+    with open(CATALOG_FILE, 'r', encoding='utf-8') as f:
+        products = json.load(f)
+
+    selected = []
+    for product in products:
+        if category and product.get('category') != category:
+            continue
+        if ids and product['id'] not in ids:
+            continue
+        if valentine_only and not product.get('valentineGift'):
+            continue
+        if not (product.get('images') or product.get('image')):
+            print(f"  Skipping {product['id']}: no images")
+            continue
+        selected.append(product)
+
+    return selected
+
+
+def catalog_output_path(product: dict, template: str) -> Path:
+    return OUTPUT_DIR / catalog_spec(product, template)['output']
+
+
+def catalog_spec_hash(product: dict, template: str, encoding: dict = None) -> str:
+    """Hash of everything that affects the rendered file, used for resume"""
+    spec = {
+        'ad': catalog_spec(product, template),
+        'size': [VIDEO_WIDTH, VIDEO_HEIGHT, FPS]
+    }
+    if encoding:
+        spec['encoding'] = encoding
+    return spec_hash(spec)
+
+
+def load_manifest() -> dict:
+    if not CATALOG_MANIFEST.exists():
+        return {}
+    try:
+        with open(CATALOG_MANIFEST, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"  WARNING: unreadable manifest, starting fresh: {e}")
+        return {}
+
+
+def save_manifest(manifest: dict):
+    """Write the manifest atomically so an interrupted run never corrupts it"""
+    tmp_path = CATALOG_MANIFEST.with_suffix('.json.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, CATALOG_MANIFEST)
+
+
+def is_catalog_done(manifest: dict, key: str, spec_hash: str) -> bool:
+    entry = manifest.get(key)
+    return bool(
+        entry
+        and entry.get('status') == 'done'
+        and entry.get('spec_hash') == spec_hash
+        and (PROJECT_ROOT / entry['output']).exists()
+    )
+
+
+def has_free_disk(path: Path, min_free_mb: int = MIN_FREE_DISK_MB) -> bool:
+    return shutil.disk_usage(path).free >= min_free_mb * 1024 * 1024
+
+
+def render_catalog_product(product: dict, template: str, encoding: dict = None) -> dict:
+    """Render one catalog ad (runs inside a worker process)"""
+    spec = catalog_spec(product, template)
+    if encoding:
+        spec['encoding'] = encoding
+    return render_spec(spec)
+
+
+def generate_catalog_videos(template: str = 'showcase', category: str = None,
+                            ids: list = None, valentine_only: bool = False,
+                            workers: int = None,
+                            force: bool = False, encoding: dict = None) -> dict:
+    """
+    Render one ad per catalog product through a bounded process pool
+    - Already rendered products (same spec hash, file present) are skipped
+    - The manifest is rewritten after every finished product
+    - At most `workers` renders run and are queued at any time, and each
+      worker process is recycled after one product to release its memory.
+      By default there are as many workers as the machine can hold; the
+      scheduler (scheduler.py) then admits renders and sizes their threads
+      from the throughput it measures
+    - New renders stop being scheduled when free disk drops below
+      MIN_FREE_DISK_MB
+    """
+    if template not in CATALOG_TEMPLATES:
+        raise ValueError(f"Unknown template '{template}' "
+                         f"(available: {', '.join(CATALOG_TEMPLATES)})")
+
+    print("=" * 60)
+    print("DRIP. Catalog Ads Generator")
+    print(f"Template: {template} - Workers: {workers or 'auto'}")
+    print("=" * 60)
+
+    ensure_dirs()
+    CATALOG_OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+
+    products = load_catalog(category, ids, valentine_only)
+    manifest = load_manifest()
+    if workers is None:
+        peak_mb = max((planned_peak_mb(catalog_spec(p, template)) for p in products), default=0)
+        workers = max_jobs(peak_mb)
+        print(f"  {workers} workers for renders of up to {peak_mb:.0f} MB")
+
+    pending = []
+    for product in products:
+        key = f"{product['id']}:{template}"
+        spec_hash = catalog_spec_hash(product, template, encoding)
+        if not force and is_catalog_done(manifest, key, spec_hash):
+            print(f"  [SKIP] {product['id']}: already rendered")
+            continue
+        pending.append((key, spec_hash, product))
+
+    print(f"\n{len(products)} products selected, {len(pending)} to render")
+
+    rendered = 0
+    failed = 0
+    in_flight = {}
+    queue = iter(pending)
+
+    with ProcessPoolExecutor(max_workers=workers, max_tasks_per_child=1) as pool:
+        while True:
+            # Keep the pool fed without queueing the whole catalog up front
+            while len(in_flight) < workers:
+                job = next(queue, None)
+                if job is None:
+                    break
+                if not has_free_disk(CATALOG_OUTPUT_DIR):
+                    print(f"  ERROR: less than {MIN_FREE_DISK_MB} MB free, "
+                          "stopping (rerun to resume)")
+                    queue = iter(())
+                    break
+                key, spec_hash, product = job
+                print(f"  [RENDER] {product['id']}")
+                future = pool.submit(render_catalog_product, product, template, encoding)
+                in_flight[future] = (key, spec_hash, product)
+
+            if not in_flight:
+                break
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                key, spec_hash, product = in_flight.pop(future)
+                try:
+                    result = future.result()
+                    manifest[key] = {
+                        'product_id': product['id'],
+                        'template': template,
+                        'spec_hash': spec_hash,
+                        'status': 'done',
+                        **result
+                    }
+                    rendered += 1
+                    print(f"  [OK] {product['id']}: {result['output']} "
+                          f"({result['render_seconds']}s)")
+                except Exception as e:
+                    manifest[key] = {
+                        'product_id': product['id'],
+                        'template': template,
+                        'spec_hash': spec_hash,
+                        'status': 'error',
+                        'error': str(e)
+                    }
+                    failed += 1
+                    print(f"  [ERROR] {product['id']}: {e}")
+                save_manifest(manifest)
+
+    print("\n" + "=" * 60)
+    print(f"CATALOG DONE: {rendered} rendered, {failed} failed, "
+          f"{len(products) - len(pending)} skipped")
+    print(f"Manifest: {CATALOG_MANIFEST}")
+    print("=" * 60)
+
+    return manifest
@@ -0,0 +1,475 @@
+"""
+DRIP. ads command line
+
+    python3 scripts/drip-ads.py plan [--json] [--catalog] [--calibrate]
+    python3 scripts/drip-ads.py validate
+    python3 scripts/drip-ads.py preflight [--catalog] [--audit audit.json]
+    python3 scripts/drip-ads.py render {campaign,viral,countdown,catalog} [...]
+                                       [--target-mb MB | --max-kbps KBPS [--crf N]]
+                                       [--ladder 720,540] [--webm] [--hls]
+    python3 scripts/drip-ads.py bench [imports prepare text scene viral batch background
+                                       transitions]
+    python3 scripts/drip-ads.py golden {record,check} [--ads NAME ...] [--no-probe]
+    python3 scripts/drip-ads.py watch [--ads NAME ...] [--once]
+    python3 scripts/drip-ads.py scrub [--port 8766] [--reduce 3]
+    python3 scripts/drip-ads.py serve [--port 8765 | --socket PATH] [--workers 2]
+    python3 scripts/drip-ads.py queue {add,work,status,retry} [...]
+    python3 scripts/drip-ads.py cluster {work,coordinate} --dir SHARED [...]
+
+Only the standard library and the light modules (config, specs, planner
+with the encoding and delivery settings, validate) are imported at startup:
+moviepy, PIL, numpy and imageio_ffmpeg are imported inside the commands
+that render, so plan and validate start in a few tens of milliseconds.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from .config import DATA_FILE, CATALOG_FILE, CATALOG_MANIFEST, OUTPUT_DIR, PROJECT_ROOT
+from .planner import plan_ads, print_plan
+from .specs import (CATALOG_TEMPLATES, DELIVERY_RUNGS, campaign_specs, catalog_spec,
+                    viral_spec)
+from .validate import validate_all
+
+
+def output_status(path) -> dict:
+    if not path.exists():
+        return {'exists': False}
+    stat = path.stat()
+    return {'exists': True, 'bytes': stat.st_size, 'mtime': int(stat.st_mtime)}
+
+
+def planned_specs(data: dict, products: list, catalog_template: str = None) -> list:
+    """(render command, ad spec) of every ad the render commands produce"""
+    specs = [('campaign', spec) for spec in campaign_specs(data)]
+    specs.append(('viral', viral_spec("J-9")))
+    if catalog_template:
+        specs += [('catalog', catalog_spec(product, catalog_template))
+                  for product in products
+                  if product.get('images') or product.get('image')]
+    return specs
+
+
+def build_plan(catalog_template: str = None) -> dict:
+    """Campaign summary, the ads the render commands produce and their estimates"""
+    with open(DATA_FILE, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    with open(CATALOG_FILE, 'r', encoding='utf-8') as f:
+        products = json.load(f)
+
+    manifest = {}
+    if CATALOG_MANIFEST.exists():
+        with open(CATALOG_MANIFEST, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+
+    specs = planned_specs(data, products, catalog_template)
+    ads = []
+    for command, spec in specs:
+        path = OUTPUT_DIR / spec['output']
+        ads.append({
+            'command': command,
+            'name': spec['title'],
+            'output': str(path.relative_to(PROJECT_ROOT)),
+            **output_status(path)
+        })
+
+    return {
+        'campagne': data['campagne'],
+        'countdown': data['countdown'],
+        'date_limite_livraison': data['date_limite_livraison'],
+        'calendrier': data.get('calendrier_publication', {}),
+        'ads': ads,
+        'render': plan_ads([spec for _, spec in specs]),
+        'catalog': {
+            'products': len(products),
+            'rendered': sum(1 for e in manifest.values() if e.get('status') == 'done'),
+            'errors': sum(1 for e in manifest.values() if e.get('status') == 'error'),
+        }
+    }
+
+
+def cmd_plan(args) -> int:
+    if args.calibrate:
+        from .planner import calibrate_cost_model
+        calibrate_cost_model()
+
+    plan = build_plan(args.template if args.catalog else None)
+    missing_inputs = plan['render']['total']['errors']
+    if args.json:
+        print(json.dumps(plan, indent=2, ensure_ascii=False))
+        return 1 if missing_inputs else 0
+
+    print(f"Campaign: {plan['campagne']}")
+    print(f"Countdown: {plan['countdown']}")
+    print(f"Deadline: {plan['date_limite_livraison']}")
+
+    print("\nAds:")
+    for ad in plan['ads']:
+        status = f"{ad['bytes'] / 1e6:.1f} MB" if ad['exists'] else "missing"
+        print(f"  {'[' + ad['command'] + ']':<11} {ad['name']:<24} {ad['output']} ({status})")
+
+    print_plan(plan['render'])
+
+    catalog = plan['catalog']
+    print(f"\nCatalog: {catalog['products']} products, "
+          f"{catalog['rendered']} rendered, {catalog['errors']} errors")
+
+    if plan['calendrier']:
+        print("\nPublication calendar:")
+        for entry in plan['calendrier'].values():
+            print(f"  {entry['date']:<12} {entry['heure']:<22} "
+                  f"{entry['urgence']:<22} {entry['video']}")
+    return 1 if missing_inputs else 0
+
+
+def cmd_validate(args) -> int:
+    errors, warnings = validate_all()
+    for warning in warnings:
+        print(f"  [WARN] {warning}")
+    for error in errors:
+        print(f"  [ERROR] {error}")
+    print(f"{len(errors)} errors, {len(warnings)} warnings")
+    return 1 if errors else 0
+
+
+def cmd_preflight(args) -> int:
+    from .preflight import preflight, preflight_specs, print_report, write_report
+
+    audit = None
+    if args.audit:
+        with open(args.audit, 'r', encoding='utf-8') as f:
+            audit = json.load(f)
+    report = preflight(preflight_specs(catalog=args.catalog), audit, workers=args.workers)
+    write_report(report)
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+    else:
+        print_report(report)
+    return 1 if report['summary']['errors'] else 0
+
+
+def encoding_args(args) -> dict:
+    """
+    Rate control of --target-mb / --max-kbps / --crf (encoding.py) and
+    delivery outputs of --ladder / --webm / --hls (delivery.py), None for
+    the default
+    """
+    encoding = {field: getattr(args, field) for field in ('target_mb', 'max_kbps', 'crf')
+                if getattr(args, field) is not None}
+    if getattr(args, 'ladder', None):
+        encoding['ladder'] = args.ladder
+    encoding.update({field: True for field in ('webm', 'hls') if getattr(args, field, False)})
+    return encoding or None
+
+
+def ladder_widths(value: str) -> list:
+    try:
+        widths = [int(width) for width in value.split(',')]
+    except ValueError:
+        widths = None
+    if not widths or not set(widths) <= set(DELIVERY_RUNGS):
+        raise argparse.ArgumentTypeError(
+            f"comma-separated widths among {', '.join(map(str, DELIVERY_RUNGS))}")
+    return widths
+
+
+def add_encoding_arguments(parser, prefix: str = "", delivery: bool = True):
+    parser.add_argument('--target-mb', type=float, metavar='MB',
+                        help=f"{prefix}two-pass encode to this file size per ad, in MB")
+    parser.add_argument('--max-kbps', type=float, metavar='KBPS',
+                        help=f"{prefix}cap the video bitrate (capped CRF, or caps --target-mb)")
+    parser.add_argument('--crf', type=float, metavar='N',
+                        help=f"{prefix}CRF of a capped encode (default 23)")
+    if not delivery:
+        return
+    parser.add_argument('--ladder', type=ladder_widths, metavar='WIDTHS',
+                        help=f"{prefix}also write H.264 renditions of these widths "
+                             "(720,540,360)")
+    parser.add_argument('--webm', action='store_true', help=f"{prefix}also write a VP9 WebM")
+    parser.add_argument('--hls', action='store_true',
+                        help=f"{prefix}also write fragmented MP4 HLS of the MP4 and renditions")
+
+
+def cmd_render(args) -> int:
+    encoding = encoding_args(args)
+    if args.target == 'campaign':
+        from .ads import generate_campaign_ads
+        return 0 if generate_campaign_ads(args.music, args.music_start, args.captions,
+                                          encoding) else 1
+
+    if args.target == 'viral':
+        from .viral import generate_viral_banger, print_generation_report
+        print_generation_report(generate_viral_banger(args.music, args.music_start, encoding))
+        return 0
+
+    if args.target == 'countdown':
+        from .layered import generate_countdown_campaign
+        generate_countdown_campaign(args.from_day, args.to_day, args.ads)
+        return 0
+
+    from .catalog import generate_catalog_videos
+    manifest = generate_catalog_videos(
+        template=args.template,
+        category=args.category,
+        ids=args.ids.split(',') if args.ids else None,
+        valentine_only=args.valentine_only,
+        workers=max(1, args.workers) if args.workers else None,
+        force=args.force,
+        encoding=encoding
+    )
+    return 1 if any(e.get('status') == 'error' for e in manifest.values()) else 0
+
+
+def cmd_bench(args) -> int:
+    from .bench import BENCHMARKS, run_benchmarks
+    unknown = [name for name in args.names if name not in BENCHMARKS]
+    if unknown:
+        print(f"Unknown benchmarks: {', '.join(unknown)} "
+              f"(available: {', '.join(BENCHMARKS)})")
+        return 2
+    run_benchmarks(args.names, frames=args.frames, repeat=args.repeat)
+    return 0
+
+
+def cmd_golden(args) -> int:
+    from .golden import check, golden_specs, record
+
+    specs = golden_specs(args.ads)
+    if not specs:
+        print(f"No ad named {', '.join(args.ads)}")
+        return 2
+    if args.action == 'record':
+        counts = record(specs)
+        print(f"{sum(counts.values())} golden frames recorded for {len(counts)} ads")
+        return 0
+    passed = check(specs, psnr_min=args.psnr, ssim_min=args.ssim, media=not args.no_probe)
+    print("Golden check passed" if passed else "Golden check FAILED")
+    return 0 if passed else 1
+
+
+def cmd_watch(args) -> int:
+    from .watch import watch
+    watch(args.ads, interval=args.interval, once=args.once)
+    return 0
+
+
+def cmd_scrub(args) -> int:
+    from .scrub import serve_frames
+    serve_frames(port=args.port, reduce=args.reduce, cache_mb=args.cache_mb)
+    return 0
+
+
+def cmd_serve(args) -> int:
+    from .server import serve
+    serve(port=args.port, socket_path=args.socket, workers=max(1, args.workers))
+    return 0
+
+
+def queued_specs(args) -> list:
+    """Specs of `queue add` and `cluster coordinate`"""
+    encoding = encoding_args(args)
+    if encoding:
+        return [dict(spec, encoding=encoding) for spec in target_specs(args)]
+    return target_specs(args)
+
+
+def target_specs(args) -> list:
+    if args.target == 'catalog':
+        with open(CATALOG_FILE, 'r', encoding='utf-8') as f:
+            products = json.load(f)
+        ids = args.ids.split(',') if args.ids else None
+        return [catalog_spec(product, args.template) for product in products
+                if (product.get('images') or product.get('image'))
+                and (not args.category or product.get('category') == args.category)
+                and (not ids or product['id'] in ids)]
+
+    with open(DATA_FILE, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if args.target == 'viral':
+        return [viral_spec("J-9")]
+    return [dict(spec, captions=args.captions) for spec in campaign_specs(data)]
+
+
+def cmd_queue(args) -> int:
+    from . import jobs
+
+    conn = jobs.connect()
+    if args.action == 'add':
+        for spec in queued_specs(args):
+            key = jobs.enqueue(conn, spec, max_attempts=args.attempts, force=args.force)
+            print(f"  [QUEUED] {key[:12]} {spec['output']}")
+        args.action = 'status'
+
+    if args.action == 'retry':
+        print(f"{jobs.retry_failed(conn)} failed jobs back in the queue")
+        args.action = 'status'
+
+    if args.action == 'work':
+        conn.close()
+        jobs.work(lease_seconds=args.lease, once=args.once)
+        conn = jobs.connect()
+
+    status = jobs.queue_status(conn)
+    counts = ', '.join(f"{n} {state}" for state, n in sorted(status['counts'].items()))
+    print(f"Queue {jobs.JOBS_DB.name}: {counts or 'empty'}")
+    for job in status['failed']:
+        print(f"  [FAILED] {job['output']} after {job['attempts']} attempts: {job['error']}")
+    conn.close()
+    return 1 if status['failed'] else 0
+
+
+def cmd_cluster(args) -> int:
+    from . import cluster
+
+    if args.action == 'work':
+        counts = cluster.work(args.dir, heartbeat_seconds=args.heartbeat,
+                              idle_exit=args.idle_exit, threads=args.threads)
+        print(f"{counts['done']} segments rendered, {counts['failed']} failed")
+        return 0
+
+    results = cluster.coordinate(queued_specs(args), args.dir,
+                                 segment_seconds=args.segment_seconds,
+                                 dead_after=args.dead_after,
+                                 stop_workers=not args.keep_workers)
+    return 1 if any(status != 'done' for status in results.values()) else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="drip-ads", description="DRIP. ads toolkit")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    plan = commands.add_parser('plan', help="dry run: planned ads, input checks and estimates")
+    plan.add_argument('--json', action='store_true', help="machine-readable output")
+    plan.add_argument('--catalog', action='store_true', help="also plan the catalog ads")
+    plan.add_argument('--template', default='showcase', choices=sorted(CATALOG_TEMPLATES),
+                      help="catalog scene template")
+    plan.add_argument('--calibrate', action='store_true',
+                      help="measure the cost model on this machine first")
+    plan.set_defaults(func=cmd_plan)
+
+    validate = commands.add_parser('validate', help="check the data files")
+    validate.set_defaults(func=cmd_validate)
+
+    preflight = commands.add_parser('preflight', help="check every source image before rendering")
+    preflight.add_argument('--catalog', action='store_true', help="also check the catalog ads")
+    preflight.add_argument('--audit', type=Path,
+                           help="JSON of GET /api/audit-images: also check its CJ images")
+    preflight.add_argument('--workers', type=int, default=8, help="checking threads")
+    preflight.add_argument('--json', action='store_true', help="print the report as JSON")
+    preflight.set_defaults(func=cmd_preflight)
+
+    render = commands.add_parser('render', help="render ads")
+    render.add_argument('target', choices=['campaign', 'viral', 'countdown', 'catalog'])
+    render.add_argument('--music', type=Path,
+                        help="campaign/viral: music file, or a directory matched against "
+                             "the fiche's musique_suggestions; cuts snap to its beats")
+    render.add_argument('--music-start', type=float, default=0.0,
+                        help="campaign/viral: offset into the track, in seconds")
+    render.add_argument('--captions', choices=['line', 'word'],
+                        help="campaign: burn in the script_voix_off captions")
+    render.add_argument('--from-day', type=int, default=14, help="countdown: first J-N")
+    render.add_argument('--to-day', type=int, default=1, help="countdown: last J-N")
+    render.add_argument('--ads', nargs='+', choices=['viral', 'compilation'],
+                        help="countdown: only these ads (default: both)")
+    render.add_argument('--template', default='showcase', choices=sorted(CATALOG_TEMPLATES),
+                        help="catalog scene template")
+    render.add_argument('--category', help="catalog: only this category")
+    render.add_argument('--ids', help="catalog: comma-separated product ids")
+    render.add_argument('--valentine-only', action='store_true',
+                        help="catalog: only valentineGift products")
+    render.add_argument('--workers', type=int,
+                        help="catalog: render processes (default: what the machine holds)")
+    render.add_argument('--force', action='store_true',
+                        help="catalog: re-render products already in the manifest")
+    add_encoding_arguments(render, "campaign/viral/catalog: ")
+    render.set_defaults(func=cmd_render)
+
+    bench = commands.add_parser('bench', help="time the rendering primitives")
+    bench.add_argument('names', nargs='*', help="benchmarks to run (default: all)")
+    bench.add_argument('--frames', type=int, default=30, help="frames per fps benchmark")
+    bench.add_argument('--repeat', type=int, default=3, help="runs per benchmark (best kept)")
+    bench.set_defaults(func=cmd_bench)
+
+    golden = commands.add_parser('golden', help="golden-frame regression check of the ads")
+    golden.add_argument('action', choices=['record', 'check'])
+    golden.add_argument('--ads', nargs='+', help="ad names (default: campaign + viral)")
+    golden.add_argument('--psnr', type=float, default=40.0, help="minimum PSNR, dB")
+    golden.add_argument('--ssim', type=float, default=0.98, help="minimum SSIM")
+    golden.add_argument('--no-probe', action='store_true',
+                        help="skip the media probe of public/ads")
+    golden.set_defaults(func=cmd_golden)
+
+    watch = commands.add_parser('watch', help="low-res previews re-rendered on every edit")
+    watch.add_argument('--ads', nargs='+', help="ad names (default: campaign + viral)")
+    watch.add_argument('--interval', type=float, default=0.5, help="polling interval, seconds")
+    watch.add_argument('--once', action='store_true', help="refresh the previews and exit")
+    watch.set_defaults(func=cmd_watch)
+
+    scrub = commands.add_parser('scrub', help="frame server to scrub the ads without encoding")
+    scrub.add_argument('--port', type=int, default=8766, help="HTTP port on 127.0.0.1")
+    scrub.add_argument('--reduce', type=int, default=3, help="resolution divisor (1: full)")
+    scrub.add_argument('--cache-mb', type=float, default=64, help="JPEG frame cache size")
+    scrub.set_defaults(func=cmd_scrub)
+
+    serve = commands.add_parser('serve', help="local render daemon with warm workers")
+    serve.add_argument('--port', type=int, default=8765, help="HTTP port on 127.0.0.1")
+    serve.add_argument('--socket', help="listen on this Unix socket instead")
+    serve.add_argument('--workers', type=int, default=2, help="render processes")
+    serve.set_defaults(func=cmd_serve)
+
+    queue = commands.add_parser('queue', help="durable SQLite render queue")
+    queue.add_argument('action', choices=['add', 'work', 'status', 'retry'])
+    queue.add_argument('target', nargs='?', default='campaign',
+                       choices=['campaign', 'viral', 'catalog'], help="add: ads to queue")
+    queue.add_argument('--captions', choices=['line', 'word'], help="add campaign: captions")
+    queue.add_argument('--template', default='showcase', choices=sorted(CATALOG_TEMPLATES),
+                       help="add catalog: scene template")
+    queue.add_argument('--category', help="add catalog: only this category")
+    queue.add_argument('--ids', help="add catalog: comma-separated product ids")
+    queue.add_argument('--attempts', type=int, default=3, help="add: attempts per job")
+    queue.add_argument('--force', action='store_true', help="add: re-render finished jobs")
+    queue.add_argument('--lease', type=float, default=300, help="work: lease in seconds")
+    queue.add_argument('--once', action='store_true',
+                       help="work: stop when nothing is ready instead of waiting for retries")
+    add_encoding_arguments(queue, "add: ")
+    queue.set_defaults(func=cmd_queue)
+
+    cluster = commands.add_parser('cluster', help="render across machines sharing a directory")
+    cluster.add_argument('action', choices=['work', 'coordinate'])
+    cluster.add_argument('target', nargs='?', default='campaign',
+                         choices=['campaign', 'viral', 'catalog'], help="coordinate: ads")
+    cluster.add_argument('--dir', type=Path, required=True, help="shared queue directory")
+    cluster.add_argument('--captions', choices=['line', 'word'], help="campaign: captions")
+    cluster.add_argument('--template', default='showcase', choices=sorted(CATALOG_TEMPLATES),
+                         help="catalog: scene template")
+    cluster.add_argument('--category', help="catalog: only this category")
+    cluster.add_argument('--ids', help="catalog: comma-separated product ids")
+    cluster.add_argument('--segment-seconds', type=float, default=0,
+                         help="coordinate: split ads into segments of whole scenes "
+                              "lasting at least this long (0: whole ads)")
+    cluster.add_argument('--dead-after', type=float, default=60,
+                         help="coordinate: seconds without heartbeat before a worker's "
+                              "segments are reassigned")
+    cluster.add_argument('--keep-workers', action='store_true',
+                         help="coordinate: do not stop the workers when finished")
+    cluster.add_argument('--heartbeat', type=float, default=5, help="work: heartbeat interval")
+    cluster.add_argument('--idle-exit', type=float,
+                         help="work: exit after this many seconds without work")
+    cluster.add_argument('--threads', type=int,
+                         help="work: ffmpeg threads (default: picked by the scheduler)")
+    # Delivery outputs need whole ads, cluster segments are parts of ads
+    add_encoding_arguments(cluster, "coordinate: ", delivery=False)
+    cluster.set_defaults(func=cmd_cluster)
+
+    return parser
+
+
+def main(argv: list = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,401 @@
+"""
+DRIP. distributed rendering
+Coordinator and workers on several machines, talking only through a shared
+directory (NFS, SMB, a synced volume...). Ads are sharded into segments of
+whole scenes; workers render segments, the coordinator stream-copies them
+into the final MP4.
+
+    python3 scripts/drip-ads.py cluster work --dir /mnt/drip            (each machine)
+    python3 scripts/drip-ads.py cluster coordinate campaign --dir /mnt/drip
+                                [--segment-seconds 10] [--dead-after 60]
+
+Testing on one machine: start a few `cluster work --dir /tmp/drip` in
+separate shells, then the coordinator on the same directory.
+
+Shared directory:
+    pending/<task>.json           segments waiting for a worker
+    running/<worker>/<task>.json  claimed by os.rename(), atomic: one winner
+    done/<task>.json              finished; video in segments/<task>.mp4
+    failed/<task>.json            render errors, retried by the coordinator
+    workers/<worker>.json         heartbeat, rewritten every few seconds
+    STOP                          written by the coordinator when finished
+
+A worker whose heartbeat stops changing for --dead-after seconds (measured
+on the coordinator's clock, so machine clocks do not need to agree) is
+dead: its claimed segments go back to pending/. Segments already in done/
+are reused when a coordinator is restarted.
+
+Each segment is cut from the full ad timeline, so the badge and captions
+stay continuous across segments; every segment starts on a keyframe with
+the same encoding settings, which lets ffmpeg's concat demuxer join them
+without re-encoding.
+"""
+
+import json
+import os
+import socket
+import subprocess
+import threading
+import time
+from pathlib import Path
+
+from .config import FPS, OUTPUT_DIR, PROJECT_ROOT, RENDER_TMP_DIR
+from .specs import scene_windows, spec_duration, spec_hash
+
+HEARTBEAT_SECONDS = 5
+DEAD_AFTER_SECONDS = 60
+POLL_SECONDS = 1
+MAX_ATTEMPTS = 3
+QUEUE_DIRS = ['pending', 'running', 'done', 'failed', 'segments', 'workers']
+
+
+def queue_dirs(root: Path) -> dict:
+    root = Path(root)
+    dirs = {name: root / name for name in QUEUE_DIRS}
+    for path in dirs.values():
+        path.mkdir(parents=True, exist_ok=True)
+    return dirs
+
+
+def write_json(path: Path, payload: dict):
+    """Writes a file other machines can read at any time (temp then rename)"""
+    part_path = path.with_name(f".{path.name}.{socket.gethostname()}.{os.getpid()}.part")
+    with open(part_path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f)
+    os.replace(part_path, path)
+
+
+def read_json(path: Path):
+    """Contents of a queue file, or None when it was moved meanwhile"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+# =============================================================================
+# SEGMENTS
+# =============================================================================
+
+def segment_windows(spec: dict, seconds: float = 0) -> list:
+    """
+    (start, end) of the segments of an ad: consecutive whole scenes grouped
+    until they last at least `seconds` (0: one segment for the whole ad),
+    on the frame grid
+    """
+    duration = spec_duration(spec)
+    if seconds <= 0:
+        return [(0.0, round(duration * FPS) / FPS)]
+
+    cuts = [0.0]
+    for _, end in scene_windows(spec):
+        if end - cuts[-1] >= seconds and duration - end >= seconds / 2:
+            cuts.append(end)
+    cuts.append(duration)
+    cuts = [round(t * FPS) / FPS for t in cuts]
+    return list(zip(cuts[:-1], cuts[1:]))
+
+
+def segment_tasks(spec: dict, seconds: float = 0) -> list:
+    ad = spec_hash(spec)[:16]
+    windows = segment_windows(spec, seconds)
+    return [{
+        'id': f"{ad}-{round(start * FPS):05d}-{round(end * FPS):05d}",
+        'ad': ad,
+        'name': spec.get('name', ''),
+        'index': index,
+        'count': len(windows),
+        'start': start,
+        'end': end,
+        'spec': spec,
+        'attempts': 0,
+    } for index, (start, end) in enumerate(windows)]
+
+
+def render_segment(task: dict, output_path: Path, threads: int = None):
+    """
+    Renders the [start, end) window of an ad's timeline (runs on workers),
+    in a slot of the machine's scheduler (scheduler.py)
+    """
+    from .imaging import ensure_dirs
+    from .encoding import split_delivery
+    from .scenes import build_ad, export_clip
+    from .scheduler import planned_peak_mb, render_slot
+
+    ensure_dirs()
+    frames = int(round((task['end'] - task['start']) * FPS))
+    with render_slot(planned_peak_mb(task['spec']), frames, threads) as slot:
+        final = build_ad(task['spec'])
+        if final is None:
+            raise RuntimeError(f"no usable images for {task['name']}")
+        try:
+            clip = final.subclipped(task['start'], min(task['end'], final.duration))
+            # A target size is spread over the whole ad, not the segment;
+            # delivery outputs need the whole ad: only the MP4 is sharded
+            encoding, _ = split_delivery(task['spec'].get('encoding'))
+            export_clip(clip, output_path, threads=slot['threads'], logger=None,
+                        encoding=encoding, duration=spec_duration(task['spec']))
+        finally:
+            final.close()
+
+
+def concat_segments(paths: list, output_path: Path):
+    """Joins segments without re-encoding, atomically replacing output_path"""
+    from imageio_ffmpeg import get_ffmpeg_exe
+
+    from .delivery import staging_path
+
+    RENDER_TMP_DIR.mkdir(parents=True, exist_ok=True)
+    part_path = staging_path(output_path)
+    list_path = RENDER_TMP_DIR / f"{output_path.stem}.{os.getpid()}.concat.txt"
+    with open(list_path, 'w', encoding='utf-8') as f:
+        for path in paths:
+            f.write(f"file '{Path(path).resolve()}'\n")
+
+    try:
+        subprocess.run([
+            get_ffmpeg_exe(), '-y', '-v', 'error',
+            '-f', 'concat', '-safe', '0', '-i', str(list_path),
+            '-c', 'copy', '-movflags', '+faststart', str(part_path)
+        ], check=True)
+        os.replace(part_path, output_path)
+    finally:
+        list_path.unlink(missing_ok=True)
+        part_path.unlink(missing_ok=True)
+
+
+# =============================================================================
+# WORKER
+# =============================================================================
+
+def heartbeat(path: Path, state: dict, stop: threading.Event,
+              interval: float = HEARTBEAT_SECONDS):
+    """Rewrites the worker file until stopped; `seq` changes on every beat"""
+    seq = 0
+    while True:
+        seq += 1
+        write_json(path, dict(state, seq=seq, time=time.time()))
+        if stop.wait(interval):
+            return
+
+
+def claim_task(dirs: dict, owner_dir: Path):
+    """Moves the first pending task into owner_dir; None when nothing is pending"""
+    for path in sorted(dirs['pending'].glob('*.json')):
+        target = owner_dir / path.name
+        try:
+            os.rename(path, target)
+        except FileNotFoundError:
+            continue            # another worker was faster
+        task = read_json(target)
+        if task is None:
+            continue
+        if (dirs['done'] / path.name).exists():
+            target.unlink(missing_ok=True)
+            continue
+        return task, target
+    return None, None
+
+
+def work(root: Path, heartbeat_seconds: float = HEARTBEAT_SECONDS,
+         idle_exit: float = None, threads: int = None) -> dict:
+    """
+    Renders pending segments until the coordinator writes STOP (or nothing
+    was pending for idle_exit seconds)
+    """
+    root = Path(root)
+    dirs = queue_dirs(root)
+    owner = worker_id()
+    owner_dir = dirs['running'] / owner
+    owner_dir.mkdir(exist_ok=True)
+    worker_file = dirs['workers'] / f"{owner}.json"
+
+    state = {'worker': owner, 'host': socket.gethostname(), 'pid': os.getpid()}
+    stop = threading.Event()
+    beat = threading.Thread(target=heartbeat, daemon=True,
+                            args=(worker_file, state, stop, heartbeat_seconds))
+    beat.start()
+    print(f"Worker {owner} on {root}")
+
+    counts = {'done': 0, 'failed': 0}
+    idle_since = time.monotonic()
+    stop_path = root / 'STOP'
+    stale_stop = stop_path.exists()     # left by the previous coordinator
+    try:
+        while True:
+            if not stop_path.exists():
+                stale_stop = False
+            elif not stale_stop:
+                break
+            task, claimed = claim_task(dirs, owner_dir)
+            if task is None:
+                if idle_exit is not None and time.monotonic() - idle_since > idle_exit:
+                    break
+                time.sleep(POLL_SECONDS)
+                continue
+
+            state['task'] = task['id']
+            print(f"  [RENDER] {task['id']} {task['name']} "
+                  f"{task['start']:.2f}-{task['end']:.2f}s ({task['index'] + 1}/{task['count']})")
+            segment = dirs['segments'] / f"{task['id']}.mp4"
+            part = dirs['segments'] / f".{task['id']}.{owner}.part.mp4"
+            started = time.time()
+            try:
+                render_segment(task, part, threads=threads)
+                os.replace(part, segment)
+                write_json(dirs['done'] / f"{task['id']}.json", {
+                    'id': task['id'], 'worker': owner,
+                    'render_seconds': round(time.time() - started, 1),
+                })
+                counts['done'] += 1
+                print(f"  [OK] {task['id']} ({time.time() - started:.1f}s)")
+            except Exception as e:
+                write_json(dirs['failed'] / f"{task['id']}.json",
+                           dict(task, worker=owner, error=f"{type(e).__name__}: {e}"))
+                counts['failed'] += 1
+                print(f"  [ERROR] {task['id']}: {e}")
+            finally:
+                part.unlink(missing_ok=True)
+                claimed.unlink(missing_ok=True)
+                state.pop('task', None)
+            idle_since = time.monotonic()
+    finally:
+        stop.set()
+        beat.join()
+        worker_file.unlink(missing_ok=True)
+        try:
+            owner_dir.rmdir()
+        except OSError:
+            pass
+    return counts
+
+
+# =============================================================================
+# COORDINATOR
+# =============================================================================
+
+def requeue(dirs: dict, task: dict, reason: str) -> bool:
+    """Puts a task back in pending/; False when it is out of attempts"""
+    task = dict(task, attempts=task.get('attempts', 0) + 1)
+    task.pop('worker', None)
+    if task['attempts'] >= MAX_ATTEMPTS:
+        task['error'] = reason
+        write_json(dirs['failed'] / f"{task['id']}.json", dict(task, final=True))
+        return False
+    task.pop('error', None)
+    write_json(dirs['pending'] / f"{task['id']}.json", task)
+    return True
+
+
+def reap_dead_workers(dirs: dict, seen: dict, dead_after: float) -> list:
+    """
+    Requeues the segments of workers whose heartbeat stopped changing
+    `seen` maps a worker to (last seq, coordinator time it changed).
+    """
+    now = time.monotonic()
+    dead = []
+    for path in dirs['workers'].glob('*.json'):
+        beat = read_json(path)
+        if beat is None:
+            continue
+        last = seen.get(beat['worker'])
+        if last is None or last[0] != beat['seq']:
+            seen[beat['worker']] = (beat['seq'], now)
+        elif now - last[1] > dead_after:
+            dead.append(beat['worker'])
+            path.unlink(missing_ok=True)
+
+    # Claims of workers without a heartbeat file at all (killed before the
+    # first beat, or reaped above)
+    for owner_dir in dirs['running'].iterdir():
+        owner = owner_dir.name
+        if (dirs['workers'] / f"{owner}.json").exists():
+            continue
+        if owner not in dead:
+            first = seen.setdefault(owner, (None, now))
+            if now - first[1] <= dead_after:
+                continue
+        for claimed in owner_dir.glob('*.json'):
+            task = read_json(claimed)
+            claimed.unlink(missing_ok=True)
+            if task and not (dirs['done'] / claimed.name).exists():
+                requeue(dirs, task, f"worker {owner} lost")
+                print(f"  [REASSIGN] {task['id']} from dead worker {owner}")
+        try:
+            owner_dir.rmdir()
+        except OSError:
+            pass
+        seen.pop(owner, None)
+    return dead
+
+
+def coordinate(specs: list, root: Path, segment_seconds: float = 0,
+               dead_after: float = DEAD_AFTER_SECONDS, stop_workers: bool = True) -> dict:
+    """
+    Queues the segments of every spec, watches the workers and concatenates
+    each ad once all its segments are done. Returns {output: status}.
+    """
+    root = Path(root)
+    dirs = queue_dirs(root)
+    (root / 'STOP').unlink(missing_ok=True)
+
+    ads = {}
+    for spec in specs:
+        tasks = segment_tasks(spec, segment_seconds)
+        ads[tasks[0]['ad']] = {'spec': spec, 'tasks': [task['id'] for task in tasks]}
+        for task in tasks:
+            name = f"{task['id']}.json"
+            if (dirs['done'] / name).exists() and (dirs['segments'] / f"{task['id']}.mp4").exists():
+                continue
+            (dirs['failed'] / name).unlink(missing_ok=True)
+            if not (dirs['pending'] / name).exists() and not any(dirs['running'].glob(f"*/{name}")):
+                write_json(dirs['pending'] / name, task)
+
+    total = sum(len(ad['tasks']) for ad in ads.values())
+    print(f"Coordinator on {root}: {len(ads)} ads, {total} segments")
+
+    results = {}
+    seen = {}
+    started = time.time()
+    while len(results) < len(ads):
+        reap_dead_workers(dirs, seen, dead_after)
+
+        for path in dirs['failed'].glob('*.json'):
+            task = read_json(path)
+            if task is None or task.get('final'):
+                continue
+            path.unlink(missing_ok=True)
+            if requeue(dirs, task, task.get('error', '')):
+                print(f"  [RETRY] {task['id']} after error: {task.get('error')}")
+
+        for ad in ads.values():
+            output = ad['spec']['output']
+            if output in results:
+                continue
+            failed = [read_json(dirs['failed'] / f"{task_id}.json") for task_id in ad['tasks']]
+            failed = [task for task in failed if task and task.get('final')]
+            if failed:
+                results[output] = 'error'
+                print(f"  [ERROR] {output}: {failed[0]['error']}")
+                continue
+            if all((dirs['done'] / f"{task_id}.json").exists() for task_id in ad['tasks']):
+                output_path = OUTPUT_DIR / output
+                concat_segments([dirs['segments'] / f"{task_id}.mp4" for task_id in ad['tasks']],
+                                output_path)
+                results[output] = 'done'
+                print(f"  [OK] {output_path.relative_to(PROJECT_ROOT)} "
+                      f"({len(ad['tasks'])} segments)")
+
+        if len(results) < len(ads):
+            time.sleep(POLL_SECONDS)
+
+    if stop_workers:
+        (root / 'STOP').touch()
+    done = sum(1 for status in results.values() if status == 'done')
+    print(f"{done}/{len(ads)} ads in {time.time() - started:.0f}s")
+    return results
@@ -0,0 +1,58 @@
+"""
+DRIP. ads configuration
+Paths, video geometry and brand colors shared by every generator
+"""
+
+import os
+from pathlib import Path
+
+# Paths
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+DATA_FILE = PROJECT_ROOT / "src" / "data" / "tiktok-fiches-production.json"
+CATALOG_FILE = PROJECT_ROOT / "src" / "data" / "products.json"
+PUBLIC_DIR = PROJECT_ROOT / "public"
+OUTPUT_DIR = PUBLIC_DIR / "ads"
+CATALOG_OUTPUT_DIR = OUTPUT_DIR / "catalog"
+CATALOG_MANIFEST = CATALOG_OUTPUT_DIR / "manifest.json"
+TEMP_DIR = PROJECT_ROOT / "scripts" / ".temp_images"
+COST_MODEL_FILE = PROJECT_ROOT / "scripts" / ".cost_model.json"
+RENDER_TMP_DIR = PROJECT_ROOT / "scripts" / ".render_tmp"
+JOBS_DB = PROJECT_ROOT / "scripts" / ".render_jobs.sqlite"
+# Machine-wide render slots and measured throughput (see scheduler.py)
+SCHEDULER_DIR = RENDER_TMP_DIR / "scheduler"
+# Golden frames of the regression harness (see golden.py), machine-specific
+GOLDEN_DIR = PROJECT_ROOT / "scripts" / ".golden"
+# Low-res previews of the watch mode (see watch.py)
+PREVIEW_DIR = PROJECT_ROOT / "scripts" / ".preview"
+# Source image preflight, read by src/app/api/audit-images
+PREFLIGHT_REPORT = PROJECT_ROOT / "src" / "data" / "image-preflight.json"
+
+# TikTok dimensions (9:16)
+VIDEO_WIDTH = 1080
+VIDEO_HEIGHT = 1920
+FPS = 30
+
+# Frames produced per batch by time-parametric effects (see frames.py)
+FRAME_BATCH = max(1, int(os.environ.get('DRIP_FRAME_BATCH', 8)))
+
+# RSS under which finished scenes stay alive, in MB (see timeline.py; 0:
+# only the active scene is kept)
+MEMORY_BUDGET_MB = max(0.0, float(os.environ.get('DRIP_MEMORY_BUDGET_MB', 0)))
+
+# DRIP Colors
+ROSE_PRIMARY = "#FF4D6D"
+ROSE_SECONDARY = "#FF6B8A"
+ROSE_NEON = ROSE_PRIMARY
+ROSE_GLOW = ROSE_SECONDARY
+GOLD = "#FFD700"
+WHITE = "#FFFFFF"
+BLACK = "#000000"
+DARK_BG = "#1A1A2E"
+
+URGENCY_TEXT = "LIVRAISON GARANTIE AVANT LE 14/02"
+
+# Countdown layers (date-dependent, see layered.py)
+COUNTDOWN_FONT_SIZE = 200
+COUNTDOWN_Y = 700
+BADGE_Y = VIDEO_HEIGHT - 120
+BADGE_TEMPLATE = "{countdown} | Livraison Garantie"
@@ -0,0 +1,183 @@
+"""
+DRIP. web delivery outputs
+Versions of an ad for the storefront pages that embed public/ads, written
+in the encode session of its MP4 (encoding.py). The 'encoding' of an ad
+spec (or --ladder, --webm and --hls) asks for them:
+
+    {'ladder': [720, 540], 'webm': True, 'hls': True}
+
+- ladder: H.264 renditions by width (720x1280, 540x960, 360x640), capped
+  CRF at RUNG_KBPS, next to the ad as <name>_720p.mp4...
+- webm: VP9 at full size (constrained quality), <name>.webm
+- hls: the ad and its renditions cut into HLS_SEGMENT_SECONDS fragmented
+  MP4 segments by stream copy, with a master playlist, in <name>_hls/
+
+The frames are produced once into the lossless intermediate of the
+export; one ffmpeg process decodes it once and splits it into every
+output (the main MP4 included, unless it is two-pass: then its second
+pass). Every MP4 is faststart. With HLS the H.264 outputs share a fixed
+GOP of HLS_SEGMENT_SECONDS, so the variants switch on the same frames.
+The renditions have no audio: the pages autoplay them muted.
+"""
+
+import os
+import re
+import shutil
+import subprocess
+from pathlib import Path
+
+from .config import FPS, RENDER_TMP_DIR, VIDEO_WIDTH, VIDEO_HEIGHT
+
+RUNG_KBPS = {720: 2000, 540: 1100, 360: 600}
+WEBM_CRF = 33
+WEBM_SHARE = 0.7            # VP9 bitrate cap, as a share of the H.264 one
+HLS_SEGMENT_SECONDS = 2
+FASTSTART = ['-movflags', '+faststart']
+
+
+def rung_size(width: int) -> tuple:
+    return width, width * VIDEO_HEIGHT // VIDEO_WIDTH // 2 * 2
+
+
+def delivery_paths(base: Path, delivery: dict) -> dict:
+    """Output name -> path of the delivery outputs of an ad written to `base`"""
+    base = Path(base)
+    paths = {f"{width}p": base.with_name(f"{base.stem}_{width}p.mp4")
+             for width in delivery.get('ladder', [])}
+    if delivery.get('webm'):
+        paths['webm'] = base.with_suffix('.webm')
+    if delivery.get('hls'):
+        paths['hls'] = base.with_name(f"{base.stem}_hls")
+    return paths
+
+
+def gop_params() -> list:
+    gop = str(HLS_SEGMENT_SECONDS * FPS)
+    return ['-g', gop, '-keyint_min', gop, '-sc_threshold', '0']
+
+
+def delivery_outputs(base: Path, delivery: dict, kbps: float, threads: int) -> list:
+    """(size or None, ffmpeg output options, path) of the ladder and WebM"""
+    from .encoding import x264_params
+
+    paths = delivery_paths(base, delivery)
+    outputs = []
+    for width in delivery.get('ladder', []):
+        params = x264_params(threads, kbps=RUNG_KBPS[width], gop=delivery.get('hls'))
+        outputs.append((rung_size(width), params + FASTSTART, paths[f"{width}p"]))
+    if delivery.get('webm'):
+        params = ['-c:v', 'libvpx-vp9', '-crf', str(WEBM_CRF),
+                  '-b:v', f"{kbps * WEBM_SHARE:.0f}k" if kbps else '0',
+                  '-deadline', 'good', '-cpu-used', '5', '-row-mt', '1',
+                  '-tile-columns', '2', '-pix_fmt', 'yuv420p', '-threads', str(threads)]
+        outputs.append((None, params, paths['webm']))
+    return outputs
+
+
+def staging_path(path: Path) -> Path:
+    """
+    <stem>.<pid>.part<suffix> file (or directory) where `path` is written
+    before being moved into place: in RENDER_TMP_DIR, outside public/, when
+    it is on the same filesystem (os.replace cannot cross filesystems),
+    else a dot-prefixed sibling (a shared mount, such as cluster segments)
+    Both are removed by jobs.remove_stale_parts() once their process is gone.
+    """
+    path = Path(path)
+    name = f"{path.stem}.{os.getpid()}.part{path.suffix}"
+    RENDER_TMP_DIR.mkdir(parents=True, exist_ok=True)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if os.stat(RENDER_TMP_DIR).st_dev == os.stat(path.parent).st_dev:
+        return RENDER_TMP_DIR / name
+    return path.with_name(f".{name}")
+
+
+def run_session(source: Path, outputs: list, before: list = ()):
+    """
+    One ffmpeg process decoding `source` once into every output
+    (size or None, options, path); each is written to its staging_path()
+    and moved into place once all of them are complete
+    """
+    from imageio_ffmpeg import get_ffmpeg_exe
+
+    graph = [f"[0:v]split={len(outputs)}" + "".join(f"[v{i}]" for i in range(len(outputs)))]
+    maps = []
+    parts = []
+    for i, (size, params, path) in enumerate(outputs):
+        label = f"[v{i}]"
+        if size:
+            graph.append(f"[v{i}]scale={size[0]}:{size[1]}:flags=bicubic[s{i}]")
+            label = f"[s{i}]"
+        path = Path(path)
+        part_path = staging_path(path)
+        parts.append((part_path, path))
+        maps += ['-map', label, *params, '-an', str(part_path)]
+
+    try:
+        subprocess.run([get_ffmpeg_exe(), '-y', '-v', 'error', *before, '-i', str(source),
+                        '-filter_complex', ";".join(graph), *maps], check=True)
+        for part_path, path in parts:
+            os.replace(part_path, path)
+    finally:
+        for part_path, _ in parts:
+            part_path.unlink(missing_ok=True)
+
+
+# =============================================================================
+# HLS
+# =============================================================================
+
+def segment_peak_kbps(playlist: Path) -> float:
+    """Highest segment bitrate of a media playlist (the BANDWIDTH of HLS)"""
+    peak = 0.0
+    duration = None
+    for line in playlist.read_text().splitlines():
+        match = re.match(r'#EXTINF:([\d.]+)', line)
+        if match:
+            duration = float(match.group(1))
+        elif line and not line.startswith('#') and duration:
+            peak = max(peak, (playlist.parent / line).stat().st_size * 8 / 1000 / duration)
+            duration = None
+    return peak
+
+
+def write_hls(variants: list, hls_dir: Path):
+    """
+    Fragmented MP4 HLS of H.264 MP4s (size, path) with aligned keyframes,
+    without re-encoding; replaces hls_dir
+    """
+    from imageio_ffmpeg import get_ffmpeg_exe
+
+    tmp_dir = staging_path(hls_dir)
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+    master = ["#EXTM3U", "#EXT-X-VERSION:7", "#EXT-X-INDEPENDENT-SEGMENTS"]
+    try:
+        for (width, height), path in sorted(variants, reverse=True):
+            name = f"{width}p"
+            subprocess.run([
+                get_ffmpeg_exe(), '-y', '-v', 'error', '-i', str(path), '-c', 'copy',
+                '-f', 'hls', '-hls_time', str(HLS_SEGMENT_SECONDS),
+                '-hls_playlist_type', 'vod', '-hls_segment_type', 'fmp4',
+                '-hls_fmp4_init_filename', f"{name}_init.mp4",
+                '-hls_segment_filename', str(tmp_dir / f"{name}_%03d.m4s"),
+                str(tmp_dir / f"{name}.m3u8")
+            ], check=True)
+            bandwidth = int(segment_peak_kbps(tmp_dir / f"{name}.m3u8") * 1000)
+            master += [f"#EXT-X-STREAM-INF:BANDWIDTH={bandwidth},RESOLUTION={width}x{height},"
+                       f"FRAME-RATE={FPS:.3f}", f"{name}.m3u8"]
+        (tmp_dir / "master.m3u8").write_text("\n".join(master) + "\n")
+        shutil.rmtree(hls_dir, ignore_errors=True)
+        os.replace(tmp_dir, hls_dir)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def rendition_report(paths: dict, duration: float) -> list:
+    """[{'name', 'path', 'bytes', 'kbps'}] of the written delivery outputs"""
+    report = []
+    for name, path in paths.items():
+        size = (sum(p.stat().st_size for p in path.iterdir()) if path.is_dir()
+                else path.stat().st_size)
+        report.append({'name': name, 'path': str(path), 'bytes': size,
+                       'kbps': round(size * 8 / 1000 / duration)})
+    return report
@@ -0,0 +1,200 @@
+"""
+DRIP. moviepy effects
+Scene and clip builders (Ken Burns, zoom punch, blur-in, shake, neon text,
+flash transitions, urgency badges) shared by every generator.
+"""
+
+from pathlib import Path
+
+import numpy as np
+from PIL import ImageFilter
+from moviepy import (
+    ImageClip,
+    TextClip,
+    CompositeVideoClip,
+    ColorClip,
+    VideoClip
+)
+
+from .config import VIDEO_WIDTH, VIDEO_HEIGHT, ROSE_NEON, WHITE
+from .backgrounds import background_clip
+from .fonts import font_path
+from .imaging import prepared_image
+from .frames import zoom_clip, ken_burns_curve, punch_curve, shake_clip, pulse_clip
+from .text import create_neon_text_image, create_urgency_badge_image
+
+
+def create_scene_with_text(
+    image_path: Path,
+    duration: float,
+    overlays: list,
+    zoom_effect: bool = True,
+    background: dict = None
+) -> CompositeVideoClip:
+    """
+    Create a video scene from image with text overlays
+    A procedural `background` (backgrounds.py) replaces the image.
+    """
+
+    if background is not None:
+        # Drawn in memory at the frame size: no file and no resize
+        img_clip = background_clip(background, duration,
+                                   ken_burns_curve(duration) if zoom_effect else None)
+    else:
+        # Load and resize image
+        pil_img = prepared_image(image_path)
+
+        # Create base image clip
+        if zoom_effect:
+            # Ken Burns effect - slight zoom in (10% over duration), in batches
+            img_clip = zoom_clip(pil_img, duration, ken_burns_curve(duration))
+        else:
+            img_clip = ImageClip(np.array(pil_img)).with_duration(duration)
+
+    clips = [img_clip]
+
+    # Resolved outside the try below: a missing font must fail the render
+    font = font_path()
+
+    # Add text overlays
+    for overlay in overlays:
+        text = overlay.get('text', '')
+        start = overlay.get('start', 0)
+        end = overlay.get('end', duration)
+        position = overlay.get('position', 'center')
+        font_size = overlay.get('font_size', 50)
+        color = overlay.get('color', 'white')
+
+        if not text:
+            continue
+
+        try:
+            txt_clip = (TextClip(
+                text=text,
+                font_size=font_size,
+                color=color,
+                font=font,
+                stroke_color='black',
+                stroke_width=2
+            )
+            .with_position(position)
+            .with_start(start)
+            .with_duration(end - start))
+
+            clips.append(txt_clip)
+        except Exception as e:
+            print(f"  Warning: Could not create text '{text}': {e}")
+
+    return CompositeVideoClip(clips, size=(VIDEO_WIDTH, VIDEO_HEIGHT))
+
+
+def flash_transition(duration=0.1):
+    """
+    Creates a white flash transition clip
+    Used between scenes for impact
+    """
+    return ColorClip(
+        size=(VIDEO_WIDTH, VIDEO_HEIGHT),
+        color=(255, 255, 255)
+    ).with_duration(duration)
+
+
+def create_zoom_punch_clip(image_path: Path, duration: float = 1.5,
+                           zoom_start: float = 1.0, zoom_peak: float = 1.2,
+                           punch_time: float = 0.3):
+    """
+    Creates a clip with rapid zoom punch effect
+    Zooms quickly from zoom_start to zoom_peak in punch_time
+    Then holds at zoom_peak
+    """
+    pil_img = prepared_image(image_path)
+
+    # Ease out cubic for punchy feel, evaluated for a whole batch of frames
+    return zoom_clip(pil_img, duration, punch_curve(zoom_start, zoom_peak, punch_time))
+
+
+def create_simple_image_clip(image_path: Path, duration: float = 1.5):
+    """
+    Creates a simple image clip without complex effects
+    """
+    pil_img = prepared_image(image_path)
+    img_array = np.array(pil_img)
+
+    clip = (ImageClip(img_array)
+            .with_duration(duration)
+            .with_position('center'))
+
+    return clip
+
+
+def create_blur_in_clip(image_path: Path, duration: float = 1.5, blur_time: float = 0.5):
+    """
+    Creates a clip that starts blurred and becomes sharp
+    Uses frame-by-frame approach with VideoClip
+    """
+    pil_img = prepared_image(image_path)
+
+    # Pre-compute blur levels
+    blur_frames = []
+    sharp_array = np.array(pil_img)
+
+    # Create blurred versions
+    blur_radii = [20, 15, 10, 5, 2, 0]
+    for blur_radius in blur_radii:
+        if blur_radius > 0:
+            blurred = pil_img.filter(ImageFilter.GaussianBlur(blur_radius))
+            blur_frames.append(np.array(blurred))
+        else:
+            blur_frames.append(sharp_array)
+
+    def make_frame(t):
+        if t < blur_time:
+            progress = t / blur_time
+            frame_idx = min(int(progress * (len(blur_frames) - 1)), len(blur_frames) - 1)
+            return blur_frames[frame_idx]
+        return sharp_array
+
+    clip = VideoClip(make_frame, duration=duration)
+    return clip
+
+
+def create_shake_clip_frames(base_frames: np.ndarray, duration: float,
+                             intensity: int = 5, frequency: int = 20):
+    """
+    Creates a clip with shake effect, produced in batches of frames
+    """
+    return shake_clip(base_frames, duration, intensity, frequency)
+
+
+def create_neon_text_clip(text: str, duration: float,
+                          font_size: int = 70,
+                          text_color: str = WHITE,
+                          glow_color: str = ROSE_NEON,
+                          position: tuple = ('center', 'center'),
+                          pulse: bool = False):
+    """
+    Creates an animated neon text clip with optional pulse
+    """
+    neon_img = create_neon_text_image(text, font_size, text_color, glow_color)
+    neon_array = np.array(neon_img)
+
+    if pulse:
+        # Pulsing clip, produced in batches from one sprite per scaled size
+        clip = pulse_clip(neon_array, duration).with_position(position)
+    else:
+        clip = ImageClip(neon_array).with_duration(duration).with_position(position)
+
+    return clip
+
+
+def create_urgency_badge_animated(text: str = "J-9", duration: float = 2.0):
+    """
+    Creates an animated urgency badge with pulsing effect
+    """
+    badge_array = np.array(create_urgency_badge_image(text))
+
+    clip = (ImageClip(badge_array)
+            .with_duration(duration)
+            .with_position(('center', VIDEO_HEIGHT - 150)))
+
+    return clip
@@ -0,0 +1,164 @@
+"""
+DRIP. encoding
+Rate control of the exported ads. By default libx264 'medium' at its
+default CRF: constant quality, unpredictable size. An ad spec (or the
+render commands) can ask for a size instead:
+
+    {'max_kbps': 2500}      capped CRF: one pass at CRF `crf` (default 23)
+                            whose bitrate never goes over max_kbps
+                            (VBV buffer of 2 s)
+    {'target_mb': 4.0}      two-pass ABR hitting the file size: the frames
+                            are produced once into a lossless intermediate
+                            (x264 qp 0, ultrafast) in RENDER_TMP_DIR, then
+                            encoded twice from it; max_kbps, when also
+                            given, caps the computed bitrate
+
+The video bitrate of a target size leaves room for the container
+(MUX_OVERHEAD) and for an audio track muxed in afterwards. Every export
+is faststart (moov atom first: browsers play it while it downloads) and
+reports its achieved bitrate. The same dict can ask for web delivery
+outputs written in the same session ('ladder', 'webm', 'hls', see
+delivery.py).
+"""
+
+import os
+import subprocess
+from pathlib import Path
+
+from .config import FPS, RENDER_TMP_DIR
+
+PRESET = 'medium'
+DEFAULT_CRF = 23
+MUX_OVERHEAD = 0.02         # MP4 container share of a file
+VBV_SECONDS = 2.0           # rate-control buffer of capped encodes
+MIN_VIDEO_KBPS = 100
+DELIVERY_FIELDS = ('ladder', 'webm', 'hls')
+
+
+def target_kbps(encoding: dict, duration: float, audio_kbps: float = 0) -> float:
+    """Video bitrate of an encoding for a clip of `duration` seconds"""
+    kbps = None
+    if encoding.get('target_mb'):
+        total_kbps = encoding['target_mb'] * 8000 * (1 - MUX_OVERHEAD) / duration
+        kbps = total_kbps - audio_kbps
+    if encoding.get('max_kbps'):
+        kbps = min(kbps, encoding['max_kbps']) if kbps else encoding['max_kbps']
+    return max(MIN_VIDEO_KBPS, kbps) if kbps else None
+
+
+def rate_params(kbps: float) -> list:
+    return ['-maxrate', f"{kbps:.0f}k", '-bufsize', f"{kbps * VBV_SECONDS:.0f}k"]
+
+
+def x264_params(threads: int, crf: float = DEFAULT_CRF, kbps: float = None,
+                gop: bool = False) -> list:
+    """Output options of an ffmpeg x264 encode, capped at kbps when given"""
+    from .delivery import gop_params
+
+    params = ['-c:v', 'libx264', '-preset', PRESET, '-crf', str(crf),
+              '-pix_fmt', 'yuv420p', '-threads', str(threads)]
+    if kbps:
+        params += rate_params(kbps)
+    return params + (gop_params() if gop else [])
+
+
+def two_pass(source: Path, output_path: Path, kbps: float, threads: int,
+             gop: bool = False, outputs: list = ()):
+    """
+    Two x264 passes at kbps from an intermediate file; the second pass
+    also writes `outputs` (delivery.run_session)
+    """
+    from imageio_ffmpeg import get_ffmpeg_exe
+
+    from .delivery import FASTSTART, gop_params, run_session
+
+    log = RENDER_TMP_DIR / f"{output_path.stem}.{os.getpid()}.x264"
+    params = ['-c:v', 'libx264', '-preset', PRESET, '-b:v', f"{kbps:.0f}k",
+              *rate_params(kbps * 1.5), '-pix_fmt', 'yuv420p', '-threads', str(threads),
+              '-passlogfile', str(log), *(gop_params() if gop else [])]
+    try:
+        subprocess.run([get_ffmpeg_exe(), '-y', '-v', 'error', '-i', str(source), *params,
+                        '-pass', '1', '-an', '-f', 'null', os.devnull], check=True)
+        run_session(source, [(None, params + ['-pass', '2'] + FASTSTART, output_path),
+                             *outputs])
+    finally:
+        for path in log.parent.glob(f"{log.name}*"):
+            path.unlink()
+
+
+def split_delivery(encoding: dict) -> tuple:
+    """(rate control, delivery outputs or None) of an encoding spec"""
+    encoding = encoding or {}
+    rate = {k: v for k, v in encoding.items() if k not in DELIVERY_FIELDS}
+    delivery = {k: v for k, v in encoding.items() if k in DELIVERY_FIELDS and v}
+    return rate, delivery or None
+
+
+def encode_clip(clip, output_path: Path, threads: int, logger='bar',
+                encoding: dict = None, audio_kbps: float = 0,
+                duration: float = None, delivery_base: Path = None) -> dict:
+    """
+    Writes a clip with the given rate control and returns what it achieved
+    ({'mode', 'bytes', 'kbps', 'target_kbps'}). `threads` comes from the
+    render slot the caller holds (scheduler.py). `duration` is the length
+    the bitrate of a target size is computed over (a segment of an ad
+    takes the bitrate of the whole ad).
+    The delivery outputs of the encoding (delivery.py) are named after
+    `delivery_base` (default: output_path) and reported under 'renditions'.
+    """
+    from .delivery import (FASTSTART, delivery_outputs, delivery_paths, rendition_report,
+                           rung_size, run_session, write_hls)
+
+    encoding, delivery = split_delivery(encoding)
+    output_path = Path(output_path)
+    kbps = target_kbps(encoding, duration or clip.duration, audio_kbps)
+    crf = encoding.get('crf', DEFAULT_CRF)
+    gop = bool(delivery and delivery.get('hls'))
+    settings = dict(fps=FPS, codec='libx264', audio=False, preset=PRESET,
+                    threads=threads, logger=logger)
+
+    if encoding.get('target_mb') or delivery:
+        # Frames produced once, encoded from a lossless file as often as needed
+        extra = delivery_outputs(delivery_base or output_path, delivery, kbps, threads) \
+            if delivery else []
+        RENDER_TMP_DIR.mkdir(parents=True, exist_ok=True)
+        lossless = RENDER_TMP_DIR / f"{output_path.stem}.{os.getpid()}.lossless.mkv"
+        try:
+            clip.write_videofile(str(lossless), **dict(settings, preset='ultrafast'),
+                                 ffmpeg_params=['-qp', '0'])
+            if encoding.get('target_mb'):
+                mode = 'two-pass'
+                two_pass(lossless, output_path, kbps, threads, gop, extra)
+            else:
+                mode = 'capped CRF' if kbps else 'CRF'
+                run_session(lossless, [(None, x264_params(threads, crf, kbps, gop) + FASTSTART,
+                                        output_path), *extra])
+            if gop:
+                paths = delivery_paths(delivery_base or output_path, delivery)
+                variants = [((clip.w, clip.h), output_path)] + [
+                    (rung_size(width), paths[f"{width}p"]) for width in delivery.get('ladder', [])]
+                write_hls(variants, paths['hls'])
+        finally:
+            if lossless.exists():
+                lossless.unlink()
+    elif kbps:
+        mode = 'capped CRF'
+        clip.write_videofile(str(output_path), **settings, ffmpeg_params=[
+            '-crf', str(crf), *rate_params(kbps), *FASTSTART])
+    else:
+        mode = 'CRF'
+        clip.write_videofile(str(output_path), **settings, ffmpeg_params=FASTSTART)
+
+    size = output_path.stat().st_size
+    achieved = size * 8 / 1000 / clip.duration
+    report = {'mode': mode, 'bytes': size, 'kbps': round(achieved),
+              'target_kbps': round(kbps) if kbps else None}
+    target = f", target {report['target_kbps']} kbps" if kbps else ""
+    print(f"  [ENCODED] {size / 1e6:.2f} MB, {report['kbps']} kbps ({mode}{target})")
+    if delivery:
+        report['renditions'] = rendition_report(
+            delivery_paths(delivery_base or output_path, delivery), clip.duration)
+        for rendition in report['renditions']:
+            print(f"  [ENCODED] {Path(rendition['path']).name}: "
+                  f"{rendition['bytes'] / 1e6:.2f} MB, {rendition['kbps']} kbps")
+    return report
@@ -0,0 +1,116 @@
+"""
+DRIP. font registry
+
+Finds font files the way fontconfig does (system, local and user font
+directories, searched recursively) and caches loaded FreeType faces per
+(family, size), so text helpers never reopen a font file.
+
+A missing font raises FontNotFoundError instead of silently falling back
+to PIL's tiny bitmap font.
+
+Extra directories can be added with DRIP_FONT_DIRS (os.pathsep separated).
+"""
+
+import os
+from pathlib import Path
+from PIL import ImageFont
+
+# Search paths, in priority order (macOS, Linux/fontconfig, Windows)
+FONT_DIRS = [
+    Path("/System/Library/Fonts"),
+    Path("/Library/Fonts"),
+    Path.home() / "Library" / "Fonts",
+    Path("/usr/share/fonts"),
+    Path("/usr/local/share/fonts"),
+    Path.home() / ".local" / "share" / "fonts",
+    Path.home() / ".fonts",
+    Path("C:/Windows/Fonts"),
+]
+
+FONT_EXTENSIONS = ('.ttf', '.ttc', '.otf')
+
+# Logical families used by the generators -> candidate font file names
+# (without extension), first match wins
+FONT_FAMILIES = {
+    'sans': [
+        'Helvetica', 'HelveticaNeue', 'Arial', 'LiberationSans-Regular',
+        'DejaVuSans', 'NotoSans-Regular', 'Roboto-Regular', 'FreeSans'
+    ],
+    'sans-bold': [
+        'Helvetica-Bold', 'Arial Bold', 'LiberationSans-Bold',
+        'DejaVuSans-Bold', 'NotoSans-Bold', 'Roboto-Bold', 'FreeSansBold'
+    ],
+}
+
+DEFAULT_FAMILY = 'sans'
+
+
+class FontNotFoundError(RuntimeError):
+    """No font file matches the requested family"""
+
+
+_font_index = None
+_face_cache = {}
+
+
+def font_dirs() -> list:
+    """Font directories to scan, DRIP_FONT_DIRS first"""
+    extra = [Path(p) for p in os.environ.get('DRIP_FONT_DIRS', '').split(os.pathsep) if p]
+    xdg = [Path(p) / "fonts" for p in os.environ.get('XDG_DATA_DIRS', '').split(os.pathsep) if p]
+    return extra + FONT_DIRS + xdg
+
+
+def font_index() -> dict:
+    """Lower-cased font file name (no extension) -> path, built once"""
+    global _font_index
+    if _font_index is None:
+        index = {}
+        for directory in font_dirs():
+            if not directory.is_dir():
+                continue
+            for root, _, files in os.walk(directory):
+                for name in files:
+                    stem, ext = os.path.splitext(name)
+                    if ext.lower() in FONT_EXTENSIONS:
+                        index.setdefault(stem.lower(), Path(root) / name)
+        _font_index = index
+    return _font_index
+
+
+def find_font(family: str = DEFAULT_FAMILY) -> Path:
+    """
+    Resolves a family name, a font file name or a font path to a file
+    Raises FontNotFoundError with the searched locations when nothing matches
+    """
+    if os.sep in family or family.lower().endswith(FONT_EXTENSIONS):
+        path = Path(family)
+        if path.exists():
+            return path
+
+    candidates = FONT_FAMILIES.get(family, [Path(family).stem])
+    index = font_index()
+    for candidate in candidates:
+        path = index.get(candidate.lower())
+        if path:
+            return path
+
+    searched = ', '.join(str(d) for d in font_dirs() if d.is_dir()) or 'none found'
+    raise FontNotFoundError(
+        f"No font for '{family}' (tried {', '.join(candidates)}; "
+        f"searched {searched}). Install one of them or set DRIP_FONT_DIRS."
+    )
+
+
+def font_path(family: str = DEFAULT_FAMILY) -> str:
+    """Font file path, for APIs taking a path like moviepy's TextClip(font=)"""
+    return str(find_font(family))
+
+
+def get_font(size: int, family: str = DEFAULT_FAMILY) -> ImageFont.FreeTypeFont:
+    """Loaded FreeType face, cached per (family, size)"""
+    key = (family, size)
+    font = _face_cache.get(key)
+    if font is None:
+        font = ImageFont.truetype(str(find_font(family)), size)
+        _face_cache[key] = font
+    return font
@@ -0,0 +1,162 @@
+"""
+DRIP. batched frames
+Time-parametric effects (Ken Burns, zoom punch, shake, neon pulse) are
+driven by per-frame parameter tables (animation.py) and produce their
+frames FRAME_BATCH at a time as one (N, H, W, C) array instead of one
+Python callback per frame.
+
+- The parameters of the whole clip (zoom factors, shake offsets, pulse
+  sprite sizes) are computed up front, snapped to their grid; the render
+  loop only looks rows up.
+- Each distinct row of a batch is rendered once, and rows equal to the
+  previous batch reuse its frames: the hold of a zoom punch or the few
+  sizes of a pulse cost one frame each, not one per frame.
+- Pixels are written straight into the batch buffer: PIL box resampling
+  for the zooms (only the visible window of the source is resampled,
+  instead of resizing the whole image up and cropping it in a composite),
+  cached sprites for the pulse, one strided gather for a shake, and no
+  copy at all for a shake over a uniform background.
+- A strided read (a preview at a lower fps, see watch.py) batches the
+  frames it is going to read instead of the consecutive ones, and a seek
+  (scrubbing, see scrub.py) renders a single frame.
+
+Frames are shared between rows, so they are read-only. FRAME_BATCH bounds
+the memory: a full 1080x1920 RGB batch of 8 frames is about 50 MB. Set
+DRIP_FRAME_BATCH to change it (1 disables batching).
+"""
+
+import numpy as np
+from PIL import Image
+from moviepy import VideoClip
+
+from .animation import (
+    SCALE_STEP, PIXEL_STEP, keyframes, oscillation, pulse_curve,
+    frame_table, frame_index, sprite_sizes
+)
+from .config import VIDEO_WIDTH, VIDEO_HEIGHT, FRAME_BATCH
+from .text import pulse_sprite
+
+MAX_STRIDE = 4              # largest frame step batched as a strided read
+
+
+def table_clip(table: np.ndarray, render, duration: float, batch_size: int = None) -> VideoClip:
+    """
+    Clip whose frame i shows the parameters table[i]
+    render(rows) -> (len(rows), H, W, C) uint8 is called for the distinct
+    rows of each batch that the previous batch did not already render.
+    """
+    batch_size = max(1, batch_size or FRAME_BATCH)
+    current = {'last': None, 'frames': {}, 'rendered': {}}
+
+    def frame_function(t):
+        index = frame_index(t, len(table))
+        if index not in current['frames']:
+            # A strided read (a preview at a lower fps) batches the frames it
+            # will ask for next, not the ones it skips; a seek (backwards or
+            # far ahead) renders only the frame it lands on
+            step = index - current['last'] if current['last'] is not None else 0
+            if 0 < step <= MAX_STRIDE:
+                indices = range(index, min(index + batch_size * step, len(table)), step)
+            else:
+                indices = [index]
+            keys = [tuple(table[i]) for i in indices]
+            previous = current['rendered']
+            missing = [key for key in dict.fromkeys(keys) if key not in previous]
+            rendered = {key: previous[key] for key in keys if key in previous}
+            if missing:
+                frames = render(np.array(missing))
+                frames.setflags(write=False)
+                rendered.update(zip(missing, frames))
+            current.update(frames={i: rendered[key] for i, key in zip(indices, keys)},
+                           rendered=rendered)
+        current['last'] = index
+        return current['frames'][index]
+
+    return VideoClip(frame_function, duration=duration)
+
+
+# =============================================================================
+# EFFECTS
+# =============================================================================
+
+def zoom_batch(image: Image.Image, zooms: np.ndarray) -> np.ndarray:
+    """
+    Centre zooms (>= 1) of a full-frame image
+    Each frame resamples only the source window it shows.
+    """
+    width, height = image.size
+    frames = np.empty((len(zooms), height, width, 3), dtype=np.uint8)
+    window_w = width / zooms
+    window_h = height / zooms
+    lefts = (width - window_w) / 2
+    tops = (height - window_h) / 2
+    for i, (left, top, w, h) in enumerate(zip(lefts, tops, window_w, window_h)):
+        frames[i] = image.resize((width, height), Image.Resampling.BILINEAR,
+                                 box=(left, top, left + w, top + h))
+    return frames
+
+
+def ken_burns_curve(duration: float, amount: float = 0.1):
+    """Linear zoom in by `amount` over the clip"""
+    return keyframes([(0, 1.0), (duration, 1.0 + amount)])
+
+
+def punch_curve(zoom_start: float, zoom_peak: float, punch_time: float):
+    """Ease-out cubic zoom from zoom_start to zoom_peak in punch_time, then hold"""
+    return keyframes([(0, zoom_start), (punch_time, zoom_peak, 'ease_out_cubic')])
+
+
+def zoom_clip(image: Image.Image, duration: float, curve, batch_size: int = None) -> VideoClip:
+    """Full-frame clip of an image zoomed along curve"""
+    if image.size != (VIDEO_WIDTH, VIDEO_HEIGHT) or image.mode != 'RGB':
+        raise ValueError("zoom_clip expects a prepared full-frame RGB image")
+    table = frame_table([curve], duration, [SCALE_STEP])
+    return table_clip(table, lambda rows: zoom_batch(image, rows[:, 0]), duration, batch_size)
+
+
+def shake_table(duration: float, intensity: int, frequency: float) -> np.ndarray:
+    """(x, y) pixel shifts of the shake at every frame, truncated like int()"""
+    return frame_table([oscillation(intensity, frequency, wave='sin'),
+                        oscillation(intensity, frequency * 0.75, wave='cos')],
+                       duration, [PIXEL_STEP, PIXEL_STEP], ['trunc', 'trunc']).astype(int)
+
+
+def shake_batch(base: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """
+    Base frame rolled by (x, y) offsets, gathered in one indexing operation
+    The base is wrap-padded by the largest offset; every window of the
+    padded frame is a strided view, and the batch takes the windows its
+    offsets select.
+    """
+    if (base == base[:1, :1]).all():
+        # Rolling a uniform frame changes nothing: every frame is a
+        # read-only view of the base
+        return np.broadcast_to(base, (len(offsets),) + base.shape)
+    margin = int(np.abs(offsets).max())
+    padded = np.pad(base, ((margin, margin), (margin, margin), (0, 0)), mode='wrap')
+    rows, cols = padded.strides[:2]
+    windows = np.lib.stride_tricks.as_strided(
+        padded, (2 * margin + 1, 2 * margin + 1) + base.shape,
+        (rows, cols) + padded.strides, writeable=False)
+    return windows[margin - offsets[:, 1], margin - offsets[:, 0]]
+
+
+def shake_clip(base: np.ndarray, duration: float, intensity: int, frequency: float,
+               batch_size: int = None) -> VideoClip:
+    return table_clip(shake_table(duration, intensity, frequency),
+                      lambda rows: shake_batch(base, rows), duration, batch_size)
+
+
+def pulse_clip(sprite: np.ndarray, duration: float, batch_size: int = None) -> VideoClip:
+    """Neon pulse of an RGBA sprite: one resize per distinct size"""
+    sizes = sprite_sizes(frame_table([pulse_curve()], duration), sprite.shape)
+    # A pulse cycles through a few sizes: keep all their sprites
+    cache = {}
+
+    def render(rows):
+        for size in map(tuple, rows):
+            if size not in cache:
+                cache[size] = pulse_sprite(sprite, size)
+        return np.stack([cache[size] for size in map(tuple, rows)])
+
+    return table_clip(sizes, render, duration, batch_size)
@@ -0,0 +1,232 @@
+"""
+DRIP. golden frames
+Regression harness for render optimizations: `golden record` renders
+sampled timestamps of every ad (campaign + viral) and stores them as PNG
+golden frames in GOLDEN_DIR; `golden check` renders the same timestamps
+after a change and compares them to the goldens, then probes the exported
+files of public/ads.
+
+- Timestamps: a quarter and three quarters into every scene, plus the
+  middle of every transition, snapped to the frame grid
+- Comparison: PSNR over the RGB frame and SSIM over the luma at half
+  resolution with 8x8 box windows from integral images (~150 ms per
+  frame); a frame passes at PSNR >= PSNR_MIN and SSIM >= SSIM_MIN. A failing
+  frame is written next to its golden as <time>.actual.png
+- Probe: duration (frame count), resolution, fps and codec of the output
+  of every ad, from ffmpeg (imageio_ffmpeg)
+
+Goldens depend on the source images and fonts of the machine: they are
+recorded locally before an optimization and checked after it, never
+committed. The manifest of an ad keeps its spec hash, so goldens of a spec
+that changed since are reported as stale.
+"""
+
+import json
+import math
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from .config import DATA_FILE, FPS, GOLDEN_DIR, OUTPUT_DIR, VIDEO_WIDTH, VIDEO_HEIGHT
+from .specs import campaign_specs, scene_windows, spec_frames, spec_hash, viral_spec
+
+PSNR_MIN = 40.0             # dB
+SSIM_MIN = 0.98
+SSIM_WINDOW = 8
+SSIM_C1 = (0.01 * 255) ** 2
+SSIM_C2 = (0.03 * 255) ** 2
+
+
+def golden_specs(names: list = None) -> list:
+    """The ads in public/ads (campaign + viral), optionally filtered by name"""
+    with open(DATA_FILE, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    specs = campaign_specs(data) + [viral_spec("J-9")]
+    return [spec for spec in specs if not names or spec['name'] in names]
+
+
+def sample_times(spec: dict) -> list:
+    """Sampled timestamps of an ad, on the frame grid"""
+    times = set()
+    for scene, (start, end) in zip(spec['scenes'], scene_windows(spec)):
+        times.update((start + (end - start) / 4, start + 3 * (end - start) / 4))
+        if 'transition' in scene and start > 0:
+            times.add(start)
+    last = spec_frames(spec) - 1
+    return sorted({min(int(round(t * FPS)), last) / FPS for t in times})
+
+
+def frame_name(t: float) -> str:
+    return f"{t:07.3f}"
+
+
+# =============================================================================
+# METRICS
+# =============================================================================
+
+def psnr(a: np.ndarray, b: np.ndarray) -> float:
+    mse = np.mean((a.astype(np.float32) - b.astype(np.float32)) ** 2)
+    return math.inf if mse == 0 else float(10 * np.log10(255.0 ** 2 / mse))
+
+
+def luma(frame: np.ndarray) -> np.ndarray:
+    """BT.601 luma at half resolution (2x2 means)"""
+    h, w = frame.shape[0] // 2 * 2, frame.shape[1] // 2 * 2
+    y = frame[:h, :w].astype(np.float32) @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+    return y.reshape(h // 2, 2, w // 2, 2).mean(axis=(1, 3))
+
+
+def box_means(x: np.ndarray, k: int) -> np.ndarray:
+    """Means of every k x k window (valid positions), from an integral image"""
+    sums = np.zeros((x.shape[0] + 1, x.shape[1] + 1), dtype=np.float64)
+    np.cumsum(np.cumsum(x, axis=0), axis=1, out=sums[1:, 1:])
+    return (sums[k:, k:] - sums[:-k, k:] - sums[k:, :-k] + sums[:-k, :-k]) / (k * k)
+
+
+def ssim(a: np.ndarray, b: np.ndarray, window: int = SSIM_WINDOW) -> float:
+    """Mean SSIM of the luma of two frames, box windows instead of gaussian ones"""
+    x, y = luma(a), luma(b)
+    mx, my = box_means(x, window), box_means(y, window)
+    vx = box_means(x * x, window) - mx * mx
+    vy = box_means(y * y, window) - my * my
+    cov = box_means(x * y, window) - mx * my
+    index = ((2 * mx * my + SSIM_C1) * (2 * cov + SSIM_C2)
+             / ((mx * mx + my * my + SSIM_C1) * (vx + vy + SSIM_C2)))
+    return float(index.mean())
+
+
+# =============================================================================
+# RECORD / CHECK
+# =============================================================================
+
+def render_frames(spec: dict, times: list) -> dict:
+    """time -> copy of the frame of the ad at that time"""
+    from .scenes import build_ad
+
+    clip = build_ad(spec)
+    if clip is None:
+        return {}
+    # The timeline returns its reused buffer: copy every frame
+    frames = {t: np.array(clip.get_frame(t)) for t in times}
+    clip.close()
+    return frames
+
+
+def record(specs: list, golden_dir: Path = GOLDEN_DIR) -> dict:
+    """Renders and stores the golden frames of every spec, name -> frame count"""
+    counts = {}
+    for spec in specs:
+        ad_dir = golden_dir / spec['name']
+        ad_dir.mkdir(parents=True, exist_ok=True)
+        for old in ad_dir.glob('*.png'):
+            old.unlink()
+        times = sample_times(spec)
+        print(f"Recording {spec['name']}: {len(times)} frames")
+        frames = render_frames(spec, times)
+        for t, frame in frames.items():
+            Image.fromarray(frame).save(ad_dir / f"{frame_name(t)}.png", compress_level=1)
+        with open(ad_dir / 'manifest.json', 'w', encoding='utf-8') as f:
+            json.dump({'spec_hash': spec_hash(spec), 'times': sorted(frames)}, f, indent=2)
+        counts[spec['name']] = len(frames)
+    return counts
+
+
+def check_frames(spec: dict, golden_dir: Path = GOLDEN_DIR,
+                 psnr_min: float = PSNR_MIN, ssim_min: float = SSIM_MIN) -> dict:
+    """Compares fresh renders of an ad to its golden frames"""
+    ad_dir = golden_dir / spec['name']
+    manifest_path = ad_dir / 'manifest.json'
+    if not manifest_path.exists():
+        return {'status': 'missing', 'frames': []}
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    frames = render_frames(spec, manifest['times'])
+    results = []
+    for t in manifest['times']:
+        path = ad_dir / f"{frame_name(t)}.png"
+        actual = frames.get(t)
+        if actual is None or not path.exists():
+            results.append({'time': t, 'passed': False, 'detail': "not rendered"})
+            continue
+        golden = np.asarray(Image.open(path).convert('RGB'))
+        if golden.shape != actual.shape:
+            results.append({'time': t, 'passed': False,
+                            'detail': f"size {actual.shape[1]}x{actual.shape[0]}"})
+            continue
+        p, s = psnr(golden, actual), ssim(golden, actual)
+        passed = p >= psnr_min and s >= ssim_min
+        actual_path = ad_dir / f"{frame_name(t)}.actual.png"
+        if passed:
+            actual_path.unlink(missing_ok=True)
+        else:
+            Image.fromarray(actual).save(actual_path, compress_level=1)
+        results.append({'time': t, 'passed': passed, 'psnr': p, 'ssim': s})
+
+    stale = manifest.get('spec_hash') != spec_hash(spec)
+    failed = any(not r['passed'] for r in results)
+    return {'status': 'failed' if failed else 'stale' if stale else 'passed',
+            'frames': results}
+
+
+def probe(spec: dict) -> dict:
+    """Frame count, resolution, fps and codec of an ad's output against its spec"""
+    import imageio_ffmpeg
+
+    path = OUTPUT_DIR / spec['output']
+    if not path.exists():
+        return {'status': 'missing', 'errors': [f"{path.name}: not rendered"]}
+    reader = imageio_ffmpeg.read_frames(str(path))
+    meta = next(reader)
+    reader.close()
+    frames, _ = imageio_ffmpeg.count_frames_and_secs(str(path))
+
+    errors = []
+    expected = spec_frames(spec)
+    if abs(frames - expected) > 1:
+        errors.append(f"{frames} frames ({frames / FPS:.2f}s), expected {expected} "
+                      f"({expected / FPS:.2f}s)")
+    if tuple(meta['size']) != (VIDEO_WIDTH, VIDEO_HEIGHT):
+        errors.append(f"{meta['size'][0]}x{meta['size'][1]}, "
+                      f"expected {VIDEO_WIDTH}x{VIDEO_HEIGHT}")
+    if abs(meta['fps'] - FPS) > 0.01:
+        errors.append(f"{meta['fps']} fps, expected {FPS}")
+    if meta['codec'] != 'h264':
+        errors.append(f"codec {meta['codec']}, expected h264")
+    return {'status': 'failed' if errors else 'passed', 'errors': errors,
+            'frames': frames, 'size': list(meta['size']), 'fps': meta['fps']}
+
+
+def print_check(name: str, frames: dict, media: dict = None):
+    print(f"{name}: frames {frames['status']}")
+    if frames['status'] == 'missing':
+        print("  [WARN] no golden frames, run `golden record` first")
+    if frames['status'] == 'stale':
+        print("  [WARN] spec changed since the goldens were recorded")
+    for result in frames['frames']:
+        tag = "[OK]" if result['passed'] else "[ERROR]"
+        if 'psnr' in result:
+            print(f"  {tag:<7} t={result['time']:6.2f}s  PSNR {result['psnr']:6.2f} dB  "
+                  f"SSIM {result['ssim']:.4f}")
+        else:
+            print(f"  {tag:<7} t={result['time']:6.2f}s  {result['detail']}")
+    if media is not None:
+        if media['status'] == 'passed':
+            print(f"  [OK]    probe: {media['frames']} frames, "
+                  f"{media['size'][0]}x{media['size'][1]}, {media['fps']:g} fps")
+        for error in media['errors']:
+            print(f"  [ERROR] probe: {error}")
+
+
+def check(specs: list, golden_dir: Path = GOLDEN_DIR, psnr_min: float = PSNR_MIN,
+          ssim_min: float = SSIM_MIN, media: bool = True) -> bool:
+    """Checks every spec against its goldens (and its output); True when all pass"""
+    passed = True
+    for spec in specs:
+        frames = check_frames(spec, golden_dir, psnr_min, ssim_min)
+        probed = probe(spec) if media else None
+        print_check(spec['name'], frames, probed)
+        passed &= frames['status'] in ('passed', 'stale')
+        passed &= probed is None or probed['status'] == 'passed'
+    return passed
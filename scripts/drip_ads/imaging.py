@@ -0,0 +1,152 @@
+"""
+DRIP. image primitives
+Source image download and preparation (9:16 crop + resize), color and
+alpha-blending helpers shared by every generator.
+
+Sources are fetched at the size the video needs: image CDNs that resize on
+the fly (specs.RESIZING_HOSTS) are asked for the 1080x1920 cover crop instead of
+the w=800 thumbnails in the fiches. Preparation decodes JPEGs in draft mode
+(libjpeg's 1/2, 1/4, 1/8 DCT scaling) at the smallest scale that still
+covers the frame, then crops and resamples in a single resize.
+"""
+
+import math
+import os
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+import requests
+from PIL import Image
+
+from .config import OUTPUT_DIR, TEMP_DIR, VIDEO_WIDTH, VIDEO_HEIGHT
+from .specs import sized_url
+
+# Prepared (cropped + resized) source images kept in memory. A 1080x1920
+# RGB image is ~6 MB, so this bounds the cache to ~50 MB per process.
+PREPARED_CACHE_SIZE = 8
+
+UPSCALE_WARNING = 1.5       # warn when a source is enlarged more than this
+
+
+def ensure_dirs():
+    """Create necessary directories"""
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    TEMP_DIR.mkdir(parents=True, exist_ok=True)
+
+
+def hex_to_rgb(hex_color):
+    """Convert hex color to RGB tuple"""
+    hex_color = hex_color.lstrip('#')
+    return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
+
+
+def download_image(url: str, name: str) -> Path:
+    """
+    Download image from URL (at the video size where the CDN allows it)
+    and save locally
+    """
+    filepath = TEMP_DIR / f"{name}.jpg"
+    # The fetched URL is kept next to the image: an image fetched from
+    # another URL (or at another size) is fetched again
+    url_path = TEMP_DIR / f"{name}.url"
+    url = sized_url(url)
+
+    if filepath.exists() and url_path.exists() and url_path.read_text() == url:
+        print(f"  Using cached: {name}")
+        return filepath
+
+    print(f"  Downloading: {url[:50]}...")
+    try:
+        response = requests.get(url, timeout=30)
+        response.raise_for_status()
+
+        # Other render processes may read the file meanwhile: temp then rename
+        part_path = filepath.with_name(f".{filepath.name}.{os.getpid()}.part")
+        with open(part_path, 'wb') as f:
+            f.write(response.content)
+        os.replace(part_path, filepath)
+        url_path.write_text(url)
+
+        return filepath
+    except Exception as e:
+        print(f"  ERROR downloading {name}: {e}")
+        return None
+
+
+def cover_box(width: int, height: int) -> tuple:
+    """Centre crop box of a width x height image at the video aspect ratio"""
+    target_ratio = VIDEO_WIDTH / VIDEO_HEIGHT
+    if width / height > target_ratio:
+        # Image is wider - crop sides
+        new_width = int(height * target_ratio)
+        left = (width - new_width) // 2
+        return (left, 0, left + new_width, height)
+    # Image is taller - crop top/bottom
+    new_height = int(width / target_ratio)
+    top = (height - new_height) // 2
+    return (0, top, width, top + new_height)
+
+
+@lru_cache(maxsize=PREPARED_CACHE_SIZE)
+def _prepare_for_tiktok(path: str, mtime_ns: int) -> Image.Image:
+    img = Image.open(path)
+    full_width, full_height = img.size
+    left, top, right, bottom = cover_box(full_width, full_height)
+
+    # JPEG: let libjpeg decode at the smallest 1/2^n scale whose crop still
+    # covers the frame (a no-op for other formats)
+    scale = min((right - left) / VIDEO_WIDTH, (bottom - top) / VIDEO_HEIGHT)
+    if scale >= 2:
+        img.draft('RGB', (math.ceil(full_width / scale), math.ceil(full_height / scale)))
+    elif scale < 1 / UPSCALE_WARNING:
+        print(f"  WARNING: {Path(path).name} is {full_width}x{full_height}, "
+              f"upscaled x{1 / scale:.1f}")
+
+    # Convert to RGB if necessary
+    if img.mode != 'RGB':
+        img = img.convert('RGB')
+
+    # Crop and resample in one pass, in the (possibly reduced) decoded pixels
+    sx, sy = img.width / full_width, img.height / full_height
+    return img.resize((VIDEO_WIDTH, VIDEO_HEIGHT), Image.Resampling.LANCZOS,
+                      box=(left * sx, top * sy, right * sx, bottom * sy))
+
+
+def resize_for_tiktok(image_path: Path) -> Image.Image:
+    """
+    Resize and crop image to TikTok 9:16 RGB format
+    Prepared images are cached per (path, mtime): reusing a source image in
+    several scenes only decodes and resamples it once.
+    """
+    image_path = Path(image_path)
+    img = _prepare_for_tiktok(str(image_path), image_path.stat().st_mtime_ns)
+    return img.copy()
+
+
+def prepared_image(image) -> Image.Image:
+    """
+    9:16 RGB frame of a scene source: an image file (resize_for_tiktok) or
+    an Image that is already one (procedural backgrounds)
+    """
+    if isinstance(image, Image.Image):
+        return image
+    return resize_for_tiktok(image)
+
+
+def blend_rgba(frame: np.ndarray, sprite: np.ndarray, x: int, y: int) -> np.ndarray:
+    """
+    Alpha-blends an RGBA sprite into an RGB frame in place
+    Only the sprite rectangle (clipped to the frame) is touched
+    """
+    h, w = sprite.shape[:2]
+    x0, y0 = max(x, 0), max(y, 0)
+    x1, y1 = min(x + w, frame.shape[1]), min(y + h, frame.shape[0])
+    if x0 >= x1 or y0 >= y1:
+        return frame
+
+    src = sprite[y0 - y:y1 - y, x0 - x:x1 - x].astype(np.uint32)
+    region = frame[y0:y1, x0:x1]
+    alpha = src[..., 3:4]
+    region[...] = ((src[..., :3] * alpha + region * (255 - alpha) + 127) // 255)
+    return frame
@@ -0,0 +1,319 @@
+"""
+DRIP. render job queue
+Durable queue of ad renders in a local SQLite file (JOBS_DB), so batch
+renders survive crashes and interruptions.
+
+- Jobs are keyed by spec hash: queueing the same spec twice is a no-op,
+  and a spec already rendered (output still on disk) is not queued again.
+- Workers claim jobs under a lease that a heartbeat thread keeps
+  extending while the render runs. A worker that dies stops renewing it,
+  and once the lease expires the job goes back to the queue.
+- A failed render is retried with exponential backoff, up to
+  MAX_ATTEMPTS attempts, then stays 'failed' with its last error.
+- Outputs are written by scenes.render_spec(): temp file outside public/,
+  then an atomic rename into public/ads. The temp files of a worker killed
+  mid-render (delivery part files included) are deleted when a worker
+  starts or reclaims an expired lease.
+
+    python3 scripts/drip-ads.py queue add campaign|viral|catalog [...]
+    python3 scripts/drip-ads.py queue work [--lease 300] [--once]
+    python3 scripts/drip-ads.py queue status
+    python3 scripts/drip-ads.py queue retry
+
+Several `queue work` processes on the same host can drain the same queue.
+Only one host: SQLite's WAL mode needs memory shared between the
+processes and is not safe on a network share (cluster.py spreads renders
+over several machines).
+"""
+
+import json
+import os
+import random
+import re
+import shutil
+import socket
+import sqlite3
+import threading
+import time
+
+from .config import JOBS_DB, OUTPUT_DIR, RENDER_TMP_DIR
+from .specs import spec_hash
+
+MAX_ATTEMPTS = 3
+LEASE_SECONDS = 300
+RETRY_BASE_SECONDS = 30
+RETRY_MAX_SECONDS = 600
+IDLE_POLL_SECONDS = 5
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    key TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    output TEXT NOT NULL,
+    spec TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    next_attempt_at REAL NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires REAL,
+    error TEXT,
+    result TEXT,
+    created REAL NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, next_attempt_at);
+"""
+
+
+def connect(path=JOBS_DB) -> sqlite3.Connection:
+    """Autocommit connection; writers serialize through BEGIN IMMEDIATE"""
+    conn = sqlite3.connect(str(path), timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def remove_stale_parts(tmp_dir=RENDER_TMP_DIR, delivery_dir=OUTPUT_DIR) -> int:
+    """
+    Deletes the temp files of renders whose process is gone: part files,
+    lossless intermediates, x264 logs and HLS directories, all named
+    <stem>.<pid>.<kind> in tmp_dir, and the dot-prefixed .<stem>.<pid>.part
+    files and directories of delivery outputs staged on another filesystem
+    (delivery.staging_path) under delivery_dir
+    """
+    from .scheduler import process_rss_mb
+
+    stale = list(tmp_dir.glob('*.*')) if tmp_dir.exists() else []
+    if delivery_dir.exists():
+        stale += [path for path in delivery_dir.rglob('.*')
+                  if re.match(r'\.[^.]+\.\d+\.part', path.name)]
+    removed = 0
+    for path in stale:
+        pid = next((int(p) for p in path.name.lstrip('.').split('.')[1:] if p.isdigit()), None)
+        if pid is None or process_rss_mb(pid) is not None or not path.exists():
+            continue
+        if path.is_dir():
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            path.unlink(missing_ok=True)
+        removed += 1
+    return removed
+
+
+def retry_delay(attempts: int) -> float:
+    """Exponential backoff with jitter after the n-th failed attempt"""
+    delay = min(RETRY_BASE_SECONDS * 2 ** (attempts - 1), RETRY_MAX_SECONDS)
+    return delay * random.uniform(0.8, 1.2)
+
+
+# =============================================================================
+# QUEUE OPERATIONS
+# =============================================================================
+
+def enqueue(conn, spec: dict, max_attempts: int = MAX_ATTEMPTS, force: bool = False) -> str:
+    """
+    Queues a spec and returns its job key
+    An existing job is left alone unless it failed, its output disappeared,
+    or force is set (then it is reset to pending).
+    """
+    key = spec_hash(spec)
+    now = time.time()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        row = conn.execute("SELECT status FROM jobs WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            conn.execute(
+                "INSERT INTO jobs (key, name, output, spec, max_attempts, created, updated) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, spec.get('name', ''), spec['output'], json.dumps(spec),
+                 max_attempts, now, now))
+        elif (force or row['status'] == 'failed'
+              or (row['status'] == 'done' and not (OUTPUT_DIR / spec['output']).exists())):
+            conn.execute(
+                "UPDATE jobs SET status = 'pending', attempts = 0, next_attempt_at = 0, "
+                "max_attempts = ?, error = NULL, lease_owner = NULL, lease_expires = NULL, "
+                "updated = ? WHERE key = ?", (max_attempts, now, key))
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    return key
+
+
+def claim(conn, owner: str, lease_seconds: float = LEASE_SECONDS):
+    """
+    Takes the next ready job under a lease, or returns None
+    Ready means pending and past its backoff, or running under an expired
+    lease (its worker died). Expired jobs without attempts left fail.
+    """
+    now = time.time()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute(
+            "UPDATE jobs SET status = 'failed', lease_owner = NULL, updated = ?, "
+            "error = coalesce(error || '; ', '') || 'lease expired (worker lost)' "
+            "WHERE status = 'running' AND lease_expires < ? AND attempts >= max_attempts",
+            (now, now))
+        row = conn.execute(
+            "SELECT * FROM jobs "
+            "WHERE (status = 'pending' AND next_attempt_at <= ?) "
+            "   OR (status = 'running' AND lease_expires < ?) "
+            "ORDER BY created LIMIT 1", (now, now)).fetchone()
+        if row is not None:
+            conn.execute(
+                "UPDATE jobs SET status = 'running', attempts = attempts + 1, "
+                "lease_owner = ?, lease_expires = ?, updated = ? WHERE key = ?",
+                (owner, now + lease_seconds, now, row['key']))
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+
+    if row is None:
+        return None
+    job = dict(row)
+    job['attempts'] += 1
+    job['spec'] = json.loads(job['spec'])
+    return job
+
+
+def renew_lease(conn, key: str, owner: str, lease_seconds: float = LEASE_SECONDS) -> bool:
+    """Extends a lease; False when the job was taken over meanwhile"""
+    cursor = conn.execute(
+        "UPDATE jobs SET lease_expires = ?, updated = ? "
+        "WHERE key = ? AND lease_owner = ? AND status = 'running'",
+        (time.time() + lease_seconds, time.time(), key, owner))
+    return cursor.rowcount == 1
+
+
+def complete(conn, key: str, owner: str, result: dict):
+    conn.execute(
+        "UPDATE jobs SET status = 'done', result = ?, error = NULL, lease_owner = NULL, "
+        "lease_expires = NULL, updated = ? WHERE key = ? AND lease_owner = ?",
+        (json.dumps(result), time.time(), key, owner))
+
+
+def fail(conn, key: str, owner: str, error: str) -> str:
+    """
+    Schedules a retry (or gives up) and returns the new status, 'lost' when
+    the job was taken over meanwhile (its new owner decides)
+    """
+    row = conn.execute("SELECT attempts, max_attempts FROM jobs WHERE key = ? "
+                       "AND lease_owner = ? AND status = 'running'", (key, owner)).fetchone()
+    if row is None:
+        return 'lost'
+    if row['attempts'] < row['max_attempts']:
+        status, next_attempt = 'pending', time.time() + retry_delay(row['attempts'])
+    else:
+        status, next_attempt = 'failed', 0
+    cursor = conn.execute(
+        "UPDATE jobs SET status = ?, next_attempt_at = ?, error = ?, lease_owner = NULL, "
+        "lease_expires = NULL, updated = ? WHERE key = ? AND lease_owner = ?",
+        (status, next_attempt, error, time.time(), key, owner))
+    return status if cursor.rowcount == 1 else 'lost'
+
+
+def retry_failed(conn) -> int:
+    cursor = conn.execute(
+        "UPDATE jobs SET status = 'pending', attempts = 0, next_attempt_at = 0, "
+        "error = NULL, updated = ? WHERE status = 'failed'", (time.time(),))
+    return cursor.rowcount
+
+
+def queue_status(conn) -> dict:
+    counts = {row['status']: row['n'] for row in conn.execute(
+        "SELECT status, count(*) AS n FROM jobs GROUP BY status")}
+    failed = [dict(row) for row in conn.execute(
+        "SELECT key, name, output, attempts, error FROM jobs WHERE status = 'failed' "
+        "ORDER BY updated")]
+    waiting = conn.execute(
+        "SELECT min(next_attempt_at) FROM jobs WHERE status = 'pending'").fetchone()[0]
+    return {'counts': counts, 'failed': failed, 'next_attempt_at': waiting}
+
+
+# =============================================================================
+# WORKER
+# =============================================================================
+
+def keep_lease(db_path, key: str, owner: str, lease_seconds: float,
+               stop: threading.Event, lost: threading.Event):
+    """Heartbeat thread: renews the lease every third of its length"""
+    conn = connect(db_path)
+    try:
+        while not stop.wait(lease_seconds / 3):
+            if not renew_lease(conn, key, owner, lease_seconds):
+                lost.set()
+                return
+    finally:
+        conn.close()
+
+
+def run_job(conn, job: dict, owner: str, lease_seconds: float, db_path=JOBS_DB) -> str:
+    """Renders one claimed job under heartbeat; returns its new status"""
+    from .scenes import render_spec
+
+    stop = threading.Event()
+    lost = threading.Event()
+    heartbeat = threading.Thread(target=keep_lease, daemon=True,
+                                 args=(db_path, job['key'], owner, lease_seconds, stop, lost))
+    heartbeat.start()
+    try:
+        result = render_spec(job['spec'])
+    except Exception as e:
+        stop.set()
+        heartbeat.join()
+        return fail(conn, job['key'], owner, f"{type(e).__name__}: {e}")
+    stop.set()
+    heartbeat.join()
+
+    if lost.is_set():
+        # Another worker took the job over: its render wins
+        return 'lost'
+    complete(conn, job['key'], owner, result)
+    return 'done'
+
+
+def work(db_path=JOBS_DB, lease_seconds: float = LEASE_SECONDS, once: bool = False) -> dict:
+    """
+    Drains the queue: claims, renders and records jobs until nothing is
+    left to do (pending jobs in backoff are waited for unless `once`)
+    """
+    conn = connect(db_path)
+    owner = worker_id()
+    done = {}
+    print(f"Worker {owner} on {db_path}")
+    removed = remove_stale_parts()
+    if removed:
+        print(f"  Removed {removed} temp files of dead renders")
+
+    while True:
+        job = claim(conn, owner, lease_seconds)
+        if job is None:
+            status = queue_status(conn)
+            busy = status['counts'].get('running', 0) + status['counts'].get('pending', 0)
+            if once or not busy:
+                break
+            time.sleep(IDLE_POLL_SECONDS)
+            continue
+
+        if job['status'] == 'running':
+            # Reclaimed from a worker that died mid-render
+            remove_stale_parts()
+        print(f"  [RENDER] {job['name']} -> {job['output']} "
+              f"(attempt {job['attempts']}/{job['max_attempts']})")
+        status = run_job(conn, job, owner, lease_seconds, db_path)
+        done[status] = done.get(status, 0) + 1
+        if status == 'done':
+            print(f"  [OK] {job['output']}")
+        else:
+            row = conn.execute("SELECT error FROM jobs WHERE key = ?", (job['key'],)).fetchone()
+            print(f"  [{status.upper()}] {job['output']}: {row['error']}")
+
+    conn.close()
+    return done
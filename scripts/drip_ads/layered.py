@@ -0,0 +1,224 @@
+"""
+DRIP. layered countdown mode
+The countdown ads only change daily through their date-dependent content:
+the banger's big "J-9" (urgency scene) and animated badge, and the
+compilation's "PLUS QUE 9 JOURS" (CTA scene). A daily variant only
+encodes the stretches that show the date: the undated stretches between
+them are encoded once (cached across days and runs) and the pieces are
+joined without re-encoding (cluster.concat_segments), like the segments of
+a render cluster.
+
+- A dated stretch is the lifetime of the overlays that differ between the
+  base and the variant (image_text scenes), or the whole scene otherwise,
+  widened by the transitions on its cuts and snapped to the frame grid.
+- Every piece is a window of the full render's timeline (build_ad), encoded
+  with the x264 settings of every ad by cluster.render_segment(): each
+  starts on a keyframe and the concat demuxer joins them as they are.
+- A global layer that differs covers every frame: the banger's animated
+  badge shows the countdown, so its variants fall back to full renders.
+Captions are not layered: the ads of this mode have none.
+"""
+
+import hashlib
+import json
+import math
+import os
+from pathlib import Path
+
+from .cluster import concat_segments, render_segment
+from .config import DATA_FILE, OUTPUT_DIR, RENDER_TMP_DIR, TEMP_DIR, FPS
+from .delivery import staging_path
+from .imaging import ensure_dirs
+from .scenes import render_spec
+from .specs import compilation_spec, viral_spec, spec_duration, spec_sources, source_path
+from .timeline import cut_list
+
+LAYERED_ADS = ['viral', 'compilation']
+LAYERED_OUTPUTS = {
+    'viral': "viral_banger_j{days}.mp4",
+    'compilation': "ad_compilation_3cadeaux_j{days}.mp4",
+}
+
+
+def layered_spec(ad: str, countdown: str = None) -> dict:
+    """Spec of a countdown ad; countdown=None: its base, without the dated content"""
+    if ad == 'viral':
+        return viral_spec(countdown)
+    with open(DATA_FILE, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return compilation_spec(data, countdown)
+
+
+def dated_windows(base_spec: dict, spec: dict) -> list:
+    """
+    (start, end) of the stretches of a variant whose frames differ from its
+    base, on the frame grid
+    """
+    frames = round(spec_duration(spec) * FPS)
+    # Global layers are drawn over every frame
+    if any(spec.get(layer) != base_spec.get(layer) for layer in ('badge', 'captions')):
+        return [(0.0, frames / FPS)]
+
+    base_cuts, cuts = cut_list(base_spec), cut_list(spec)
+    if [(s, e) for s, e, _ in base_cuts] != [(s, e) for s, e, _ in cuts]:
+        raise ValueError("the variant and its base do not have the same cuts")
+
+    windows = []
+    for i, ((start, end, scene), (_, _, base_scene)) in enumerate(zip(cuts, base_cuts)):
+        if scene == base_scene:
+            continue
+        begin, finish = start, end
+        if scene['type'] == 'image_text' and dict(scene, overlays=None) == dict(base_scene, overlays=None):
+            # Overlays only show between their start and end
+            changed = ([o for o in scene['overlays'] if o not in base_scene['overlays']]
+                       + [o for o in base_scene['overlays'] if o not in scene['overlays']])
+            begin = start + min(o.get('start', 0) for o in changed)
+            finish = start + max(o.get('end', scene['duration']) for o in changed)
+        # A transition blends the frames on both sides of its cut
+        if begin == start and 'transition' in scene:
+            begin -= scene['transition']['duration'] / 2
+        if finish == end and i + 1 < len(cuts) and 'transition' in cuts[i + 1][2]:
+            finish += cuts[i + 1][2]['transition']['duration'] / 2
+        first = max(math.floor(round(begin * FPS, 6)), 0)
+        last = min(math.ceil(round(finish * FPS, 6)), frames)
+        if windows and first <= windows[-1][1]:
+            windows[-1][1] = max(windows[-1][1], last)
+        else:
+            windows.append([first, last])
+    return [(first / FPS, last / FPS) for first, last in windows]
+
+
+def layered_pieces(base_spec: dict, spec: dict) -> list:
+    """(start, end, dated) of the consecutive pieces of a variant"""
+    end = round(spec_duration(spec) * FPS) / FPS
+    pieces = []
+    position = 0.0
+    for start, finish in dated_windows(base_spec, spec):
+        if start > position:
+            pieces.append((position, start, False))
+        pieces.append((start, finish, True))
+        position = finish
+    if position < end:
+        pieces.append((position, end, False))
+    return pieces
+
+
+def layered_base_key(spec: dict, images: list) -> str:
+    """Cache key of a base render: the rendering library, its spec and source images"""
+    digest = hashlib.sha1()
+    for module in sorted(Path(__file__).parent.glob('*.py')):
+        digest.update(module.read_bytes())
+    digest.update(json.dumps(spec, sort_keys=True, default=str).encode('utf-8'))
+    for img in images:
+        digest.update(img.name.encode('utf-8'))
+        if img.exists():
+            digest.update(img.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def layered_base(ad: str) -> str:
+    """Cache key of the undated pieces of a countdown ad, once its sources are there"""
+    spec = layered_spec(ad)
+    images = [source_path(source) for source in spec_sources(spec)]
+    missing = [img for img in images if not img.exists()]
+    if missing:
+        raise FileNotFoundError(f"Missing source images: {', '.join(map(str, missing))}")
+    return layered_base_key(spec, images)
+
+
+def prune_layered_bases(ad: str, key: str) -> int:
+    """Deletes the cached pieces of an ad's other base renders"""
+    removed = 0
+    for path in TEMP_DIR.glob(f"{ad}_base_*"):
+        if not path.name.startswith(f"{ad}_base_{key}_"):
+            path.unlink(missing_ok=True)
+            removed += 1
+    return removed
+
+
+def undated_piece(ad: str, key: str, start: float, end: float) -> Path:
+    """
+    Undated [start, end) stretch of a countdown ad, rendered from its base
+    Reuses the cached piece when the rendering library, the spec and the
+    source images did not change.
+    """
+    piece_path = TEMP_DIR / f"{ad}_base_{key}_{round(start * FPS):05d}-{round(end * FPS):05d}.mp4"
+    if piece_path.exists():
+        print(f"  Using cached piece: {piece_path.name}")
+        return piece_path
+
+    print(f"  Rendering undated piece: {piece_path.name}")
+    part_path = staging_path(piece_path)
+    try:
+        render_segment({'spec': layered_spec(ad), 'name': ad, 'start': start, 'end': end},
+                       part_path)
+        os.replace(part_path, piece_path)
+    finally:
+        part_path.unlink(missing_ok=True)
+
+    removed = prune_layered_bases(ad, key)
+    if removed:
+        print(f"  Pruned {removed} cached pieces of older {ad} bases")
+    return piece_path
+
+
+def render_countdown_variant(ad: str, key: str, days: int) -> Path:
+    """
+    J-{days} variant of a countdown ad: its dated stretches encoded, joined
+    with the cached undated ones (full render when every frame is dated)
+    """
+    countdown = f"J-{days}"
+    spec = layered_spec(ad, countdown)
+    output_path = OUTPUT_DIR / LAYERED_OUTPUTS[ad].format(days=days)
+    pieces = layered_pieces(layered_spec(ad), spec)
+
+    if len(pieces) == 1 and pieces[0][2]:
+        print(f"  [{countdown}] Every frame is dated: full render to {output_path}")
+        render_spec(dict(spec, output=output_path.name))
+        return output_path
+
+    paths = [undated_piece(ad, key, start, end) if not dated else
+             RENDER_TMP_DIR / f"{output_path.stem}.{os.getpid()}.dated{i}.mp4"
+             for i, (start, end, dated) in enumerate(pieces)]
+    dated_paths = [path for path, (_, _, dated) in zip(paths, pieces) if dated]
+
+    print(f"  [{countdown}] Exporting to: {output_path}")
+    try:
+        for path, (start, end, dated) in zip(paths, pieces):
+            if dated:
+                render_segment({'spec': spec, 'name': ad, 'start': start, 'end': end}, path)
+        concat_segments(paths, output_path)
+    finally:
+        for path in dated_paths:
+            path.unlink(missing_ok=True)
+
+    return output_path
+
+
+def generate_countdown_campaign(from_day: int = 14, to_day: int = 1,
+                                ads: list = None) -> list:
+    """
+    Generates one variant per day of the countdown (J-14 ... J-1) of every
+    countdown ad (LAYERED_ADS by default)
+    Cost per ad: its undated stretches once (cached across runs) + the
+    dated ones once per day; the banger, dated on every frame, is rendered
+    in full every day
+    """
+    ads = ads or LAYERED_ADS
+    print("=" * 60)
+    print(f"DRIP. COUNTDOWN CAMPAIGN - {', '.join(ads)}")
+    print(f"J-{from_day} -> J-{to_day}")
+    print("=" * 60)
+
+    ensure_dirs()
+
+    step = -1 if from_day >= to_day else 1
+    outputs = []
+    for ad in ads:
+        key = layered_base(ad)
+        print(f"\nRendering daily variants of {ad}...")
+        for days in range(from_day, to_day + step, step):
+            outputs.append(render_countdown_variant(ad, key, days))
+
+    print(f"\n{len(outputs)} variants generated in {OUTPUT_DIR}")
+    return outputs
@@ -0,0 +1,523 @@
+"""
+DRIP. render planner
+Dry run of a render: resolves the timeline of each ad spec, counts frames
+per effect, checks that every input image is available and estimates
+render time, peak memory and disk usage from a per-effect cost model.
+No pixel is decoded and nothing is encoded.
+
+The cost model holds, for a 1080x1920 frame, the production cost of each
+effect layer (ms/frame), the one-off cost of each asset (ms), memory
+figures and the bitrates of the MP4 and of the lossless intermediate.
+Disk usage follows the 'encoding' of each spec: its target size or cap,
+its delivery renditions (ladder, WebM, HLS copies) and, as peak disk, the
+lossless intermediate of two-pass and delivery encodes (encoding.py). DEFAULT_COST_MODEL comes from a calibration run on a dev box;
+`drip-ads.py plan --calibrate` re-measures it on the current machine and
+stores it in COST_MODEL_FILE, which plans then use.
+"""
+
+import json
+import os
+from pathlib import Path
+
+from .config import (
+    PROJECT_ROOT, OUTPUT_DIR, COST_MODEL_FILE, VIDEO_WIDTH, VIDEO_HEIGHT, FPS
+)
+from .delivery import RUNG_KBPS, WEBM_SHARE, rung_size
+from .encoding import MUX_OVERHEAD, split_delivery, target_kbps
+from .specs import sized_url, source_background, source_path, spec_duration
+
+FRAME_MB = VIDEO_WIDTH * VIDEO_HEIGHT * 3 / 1e6
+# Assets kept in process-wide caches across scenes
+CACHED_ASSETS = ('prepare', 'background')
+TRANSITION_MB = 30.0  # kernel scratch buffers (transitions.transition_buffers)
+DOWNLOAD_MB = 0.5  # an Unsplash 1080x1920 q=90 crop (specs.sized_url)
+
+DEFAULT_COST_MODEL = {
+    # Frame production per effect layer on top of a composite pass, ms per frame
+    'frame_ms': {
+        'still': 1.0,
+        'ken_burns': 28.0,
+        'zoom_punch': 10.0,
+        'blur_in': 1.0,
+        'shake': 1.0,
+        'solid': 1.0,
+        'animated_background': 16.0,
+        'dim': 32.0,
+        'text': 8.0,
+        'neon': 5.0,
+        'neon_pulse': 1.0,
+        'badge': 12.0,
+        'captions': 3.0,
+        'transition': 12.0,
+        'compose': 74.0,
+        'encode': 54.0,
+    },
+    # One-off asset preparation, ms
+    'setup_ms': {
+        'prepare': 60.0,
+        'background': 30.0,
+        'blur_set': 500.0,
+        'neon_sprite': 13.0,
+        'text_clip': 4.0,
+    },
+    'memory_mb': {
+        'process': 75.0,
+        'encoder': 250.0,
+    },
+    # Average bitrate of the libx264 'medium' exports
+    'output_kbps': 820.0,
+    # x264 qp 0 ultrafast intermediate (encoding.py), photo scenes
+    'lossless_kbps': 54000.0,
+}
+
+
+def load_cost_model() -> dict:
+    """Calibrated model when available, defaults otherwise"""
+    model = json.loads(json.dumps(DEFAULT_COST_MODEL))
+    if COST_MODEL_FILE.exists():
+        with open(COST_MODEL_FILE, 'r', encoding='utf-8') as f:
+            calibrated = json.load(f)
+        for key, value in calibrated.items():
+            if isinstance(value, dict):
+                model.setdefault(key, {}).update(value)
+            else:
+                model[key] = value
+    return model
+
+
+def neon_sprite_mb(text: str, font_size: int) -> float:
+    """Approximate RGBA size of a neon sprite (text + 50px glow padding)"""
+    width = min(len(text) * font_size * 0.6 + 100, VIDEO_WIDTH * 2)
+    height = font_size * 1.2 + 100
+    return width * height * 4 / 1e6
+
+
+def scene_layers(scene: dict) -> list:
+    """
+    Effect layers of a scene as (effect, seconds), mirroring the builders of
+    scenes.py, plus its assets as (asset, megabytes)
+    """
+    d = scene['duration']
+    kind = scene['type']
+
+    if kind == 'image_text':
+        background = source_background(scene['source'])
+        if background is None:
+            layers = [('ken_burns' if scene.get('zoom', True) else 'still', d)]
+            assets = [('prepare', FRAME_MB)]
+        elif background['kind'] == 'animated':
+            layers = [('animated_background', d)]
+            assets = []
+        else:
+            zoomed = scene.get('zoom', True) and background['kind'] != 'solid'
+            layers = [('ken_burns' if zoomed else 'still', d)]
+            assets = [('background', FRAME_MB)]
+        for overlay in scene.get('overlays', []):
+            layers.append(('text', overlay['end'] - overlay['start']))
+            assets.append(('text_clip', neon_sprite_mb(overlay['text'],
+                                                       overlay.get('font_size', 50))))
+        return layers, assets
+
+    if kind == 'flash':
+        return [('solid', d)], []
+
+    if kind == 'hook':
+        return ([('blur_in', d), ('dim', d), ('neon_pulse', d - 0.3)],
+                [('prepare', FRAME_MB), ('blur_set', 6 * FRAME_MB),
+                 ('neon_sprite', neon_sprite_mb(scene['text'], 65))])
+
+    if kind == 'reveal':
+        return ([('zoom_punch', d), ('neon', d - 0.5), ('neon_pulse', d - 1.0)],
+                [('prepare', FRAME_MB),
+                 ('neon_sprite', neon_sprite_mb(scene['text'], 55)),
+                 ('neon_sprite', neon_sprite_mb(scene['price'], 80))])
+
+    if kind == 'quick_cut':
+        return ([('zoom_punch', d), ('neon', d - 0.2)],
+                [('prepare', FRAME_MB), ('neon_sprite', neon_sprite_mb(scene['text'], 60))])
+
+    if kind == 'urgency':
+        layers = [('shake', d)]
+        assets = [('neon_sprite', neon_sprite_mb("LIVRAISON GARANTIE", 45)),
+                  ('neon_sprite', neon_sprite_mb("avant le 14/02", 40))]
+        if scene.get('countdown'):
+            layers.append(('neon_pulse', d))
+            assets.append(('neon_sprite', neon_sprite_mb(scene['countdown'], 200)))
+        layers += [('neon', d - 0.5), ('neon', d - 1.0)]
+        return layers, assets
+
+    if kind == 'cta':
+        background = scene.get('background', {'kind': 'solid'})
+        layers, assets = [('solid', d)], []
+        if background['kind'] == 'animated':
+            layers = [('animated_background', d)]
+        elif background['kind'] != 'solid':
+            layers, assets = [('still', d)], [('background', FRAME_MB)]
+        return (layers + [('neon_pulse', d - 0.5), ('neon', d - 1.0), ('badge', d - 0.5)],
+                assets + [('neon_sprite', neon_sprite_mb("DRIP.", 120)),
+                          ('neon_sprite', neon_sprite_mb("Lien en bio", 50))])
+
+    raise ValueError(f"Unknown scene type '{kind}'")
+
+
+def check_source(source: dict, downloads: set = frozenset()) -> tuple:
+    """
+    (status, detail) of an image source without decoding it
+    `downloads` holds the files that ads planned before this one download.
+    """
+    background = source_background(source)
+    if background is not None:
+        return 'generated', f"{background['kind']} background"
+    path = source_path(source)
+    url = sized_url(source['url']) if 'url' in source else None
+    # download_image() fetches again an image cached from another URL
+    url_path = path.with_suffix('.url')
+    stale = url is not None and not (url_path.exists() and url_path.read_text() == url)
+    if path.exists() and not stale:
+        if path.stat().st_size == 0:
+            return 'error', f"empty file {path}"
+        return 'ok', str(path)
+    if url is not None:
+        return 'download', url
+    if str(path) in downloads:
+        return 'download', f"{path.name} (downloaded by an earlier ad)"
+    return 'error', f"missing {path}"
+
+
+def disk_estimate(encoding: dict, duration: float, model: dict) -> dict:
+    """
+    MB of the MP4 and of the delivery renditions an encoding spec writes,
+    and of the lossless intermediate it goes through (deleted afterwards)
+    """
+    rate, delivery = split_delivery(encoding)
+    delivery = delivery or {}
+    capped = target_kbps(rate, duration)
+    if rate.get('target_mb'):
+        kbps = capped / (1 - MUX_OVERHEAD)
+    else:
+        kbps = min(model['output_kbps'], capped or model['output_kbps'])
+
+    # Rungs take the bitrate of their share of the pixels, up to their cap
+    rungs = [min(RUNG_KBPS[width], kbps * width * rung_size(width)[1]
+                 / (VIDEO_WIDTH * VIDEO_HEIGHT))
+             for width in delivery.get('ladder', [])]
+    renditions = sum(rungs)
+    if delivery.get('webm'):
+        renditions += kbps * WEBM_SHARE
+    if delivery.get('hls'):
+        # Segments are stream copies of the MP4 and its rungs
+        renditions += kbps + sum(rungs)
+
+    megabytes = duration / 8 / 1000
+    lossless = rate.get('target_mb') or delivery
+    return {
+        'output_mb': kbps * megabytes,
+        'renditions_mb': renditions * megabytes,
+        'intermediate_mb': model['lossless_kbps'] * megabytes if lossless else 0.0,
+    }
+
+
+def plan_ad(spec: dict, model: dict, downloads: set = frozenset()) -> dict:
+    """Frames per effect, input checks and cost estimates of one ad spec"""
+    duration = spec_duration(spec)
+    frames = int(round(duration * FPS))
+
+    effect_frames = {}
+    setup_ms = 0.0
+    cached_mb = 0.0         # prepared images and backgrounds stay cached
+    peak_scene_mb = 0.0     # the other assets live as long as their scene
+    previous_mb = 0.0
+    seen_sources = []
+    inputs = []
+
+    for scene in spec['scenes']:
+        layers, assets = scene_layers(scene)
+        for effect, seconds in layers:
+            effect_frames[effect] = effect_frames.get(effect, 0) + int(round(max(seconds, 0) * FPS))
+
+        source = scene.get('source')
+        if source and source not in seen_sources:
+            seen_sources.append(source)
+            status, detail = check_source(source, downloads)
+            inputs.append({'status': status, 'detail': detail,
+                           'fetch': status == 'download' and 'url' in source,
+                           'path': str(source_path(source) or '')})
+        elif source:
+            # Reused source: served from the prepared-image/background caches
+            assets = [a for a in assets if a[0] not in ('prepare', 'background')]
+
+        scene_mb = 0.0
+        for asset, megabytes in assets:
+            setup_ms += model['setup_ms'][asset]
+            if asset in CACHED_ASSETS:
+                cached_mb += megabytes
+            else:
+                scene_mb += megabytes
+        # A transition keeps the previous scene alive through the window
+        if 'transition' in scene and scene is not spec['scenes'][0]:
+            window = int(round(scene['transition']['duration'] * FPS))
+            effect_frames['transition'] = effect_frames.get('transition', 0) + window
+            effect_frames['compose'] = effect_frames.get('compose', 0) + window
+            peak_scene_mb = max(peak_scene_mb, previous_mb + scene_mb + TRANSITION_MB)
+        peak_scene_mb = max(peak_scene_mb, scene_mb)
+        previous_mb = scene_mb
+
+    # Every scene but the flashes is a composite; the timeline then draws
+    # the badge and captions into its frame buffer (timeline.py)
+    effect_frames['compose'] = effect_frames.get('compose', 0) + sum(
+        int(round(scene['duration'] * FPS)) for scene in spec['scenes']
+        if scene['type'] != 'flash'
+    )
+    if spec.get('badge'):
+        effect_frames['badge'] = effect_frames.get('badge', 0) + frames
+    if spec.get('captions') and spec.get('script'):
+        effect_frames['captions'] = frames
+
+    frame_ms = model['frame_ms']
+    produce_ms = sum(frame_ms[e] * n for e, n in effect_frames.items())
+    encode_ms = frame_ms['encode'] * frames
+    effect_frames['encode'] = frames
+
+    # ffmpeg encodes in its own process while moviepy produces frames,
+    # which only overlaps when there is more than one core
+    if (os.cpu_count() or 1) > 1:
+        render_seconds = (setup_ms + max(produce_ms, encode_ms)) / 1000
+    else:
+        render_seconds = (setup_ms + produce_ms + encode_ms) / 1000
+
+    memory = model['memory_mb']
+    # Scenes are built and released one at a time (timeline.py)
+    peak_mb = memory['process'] + memory['encoder'] + cached_mb + peak_scene_mb + 4 * FRAME_MB
+
+    disk = disk_estimate(spec.get('encoding'), duration, model)
+    fetched = sum(1 for i in inputs if i['fetch'])
+
+    return {
+        'name': spec['name'],
+        'title': spec['title'],
+        'output': str(OUTPUT_DIR / spec['output']),
+        'duration': duration,
+        'frames': frames,
+        'effect_frames': effect_frames,
+        'inputs': inputs,
+        'errors': [i['detail'] for i in inputs if i['status'] == 'error'],
+        'estimate': {
+            'render_seconds': round(render_seconds, 1),
+            'peak_memory_mb': round(peak_mb),
+            'output_mb': round(disk['output_mb'], 1),
+            'renditions_mb': round(disk['renditions_mb'], 1),
+            'intermediate_mb': round(disk['intermediate_mb'], 1),
+            'download_mb': round(fetched * DOWNLOAD_MB, 1),
+        }
+    }
+
+
+def plan_ads(specs: list) -> dict:
+    """Plans of several ads rendered one after another, with totals"""
+    model = load_cost_model()
+    plans = []
+    downloads = set()
+    for spec in specs:
+        plan = plan_ad(spec, model, downloads)
+        downloads.update(i['path'] for i in plan['inputs'] if i['fetch'])
+        plans.append(plan)
+    disk_mb = sum(p['estimate'][key] for p in plans
+                  for key in ('output_mb', 'renditions_mb', 'download_mb'))
+    return {
+        'cost_model': 'calibrated' if COST_MODEL_FILE.exists() else 'default',
+        'ads': plans,
+        'total': {
+            'frames': sum(p['frames'] for p in plans),
+            'render_seconds': round(sum(p['estimate']['render_seconds'] for p in plans), 1),
+            'peak_memory_mb': max((p['estimate']['peak_memory_mb'] for p in plans), default=0),
+            'disk_mb': round(disk_mb, 1),
+            # Ads render one after another: one intermediate at a time
+            'peak_disk_mb': round(disk_mb + max(
+                (p['estimate']['intermediate_mb'] for p in plans), default=0), 1),
+            'errors': sum(len(p['errors']) for p in plans),
+        }
+    }
+
+
+def print_plan(plan: dict):
+    for ad in plan['ads']:
+        est = ad['estimate']
+        output = Path(ad['output']).relative_to(PROJECT_ROOT)
+        print(f"\n{ad['title']} -> {output}")
+        print(f"  {ad['duration']:.2f}s, {ad['frames']} frames | "
+              f"~{est['render_seconds']:.0f}s render, ~{est['peak_memory_mb']} MB peak, "
+              f"~{est['output_mb']} MB output")
+        if est['renditions_mb'] or est['intermediate_mb']:
+            print(f"  ~{est['renditions_mb']} MB delivery renditions, "
+                  f"~{est['intermediate_mb']} MB lossless intermediate while encoding")
+        effects = ', '.join(f"{e} {n}" for e, n in sorted(ad['effect_frames'].items()))
+        print(f"  frames per effect: {effects}")
+        for entry in ad['inputs']:
+            print(f"  [{entry['status'].upper()}] {entry['detail']}")
+
+    total = plan['total']
+    print(f"\nTotal ({plan['cost_model']} cost model): {total['frames']} frames, "
+          f"~{total['render_seconds'] / 60:.1f} min sequential, "
+          f"~{total['peak_memory_mb']} MB peak, ~{total['disk_mb']} MB disk "
+          f"(~{total['peak_disk_mb']} MB peak), "
+          f"{total['errors']} missing inputs")
+
+
+# =============================================================================
+# CALIBRATION (imports the render stack)
+# =============================================================================
+
+def calibrate_cost_model(frames: int = 15) -> dict:
+    """
+    Measures the cost model on this machine with the real builders at
+    full resolution, and saves it to COST_MODEL_FILE
+    """
+    import resource
+    import tempfile
+    import time
+
+    from moviepy import ColorClip, CompositeVideoClip, TextClip, VideoClip
+
+    from .backgrounds import animated_clip, background_array, _static_background
+    from .bench import BENCH_BACKGROUND, BENCH_IMAGE, best_of
+    from .captions import add_captions, caption_cues
+    from .effects import (
+        create_scene_with_text, create_blur_in_clip, create_zoom_punch_clip,
+        create_shake_clip_frames, create_neon_text_clip
+    )
+    from .fonts import font_path
+    from .scenes import badge_layer
+    from .timeline import timeline_clip
+    from .imaging import resize_for_tiktok, _prepare_for_tiktok
+    from .specs import spec_duration as duration_of, campaign_specs, viral_spec
+    from .text import create_neon_text_image
+    from .config import DATA_FILE, ROSE_NEON
+    import numpy as np
+
+    seconds = frames / FPS + 1
+    times = [i / FPS for i in range(frames)]
+
+    def ms_per_frame(clip):
+        def run():
+            for t in times:
+                clip.get_frame(t)
+        return best_of(run, 2) * 1000 / frames
+
+    def solid():
+        return ColorClip((VIDEO_WIDTH, VIDEO_HEIGHT), color=(26, 26, 46)).with_duration(seconds)
+
+    def over_solid(*layers):
+        return CompositeVideoClip([solid(), *layers], size=(VIDEO_WIDTH, VIDEO_HEIGHT))
+
+    process_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    print("Calibrating frame costs...")
+    solid_ms = ms_per_frame(solid())
+    compose = ms_per_frame(over_solid())
+    still = ms_per_frame(create_scene_with_text(BENCH_IMAGE, seconds, [], zoom_effect=False))
+    neon_clip = create_neon_text_clip("CINEMA PRIVE", seconds, font_size=60)
+    pulse_clip = create_neon_text_clip("J-9", seconds, font_size=200, pulse=True,
+                                       text_color=ROSE_NEON)
+    dim_clip = (ColorClip((VIDEO_WIDTH, VIDEO_HEIGHT), color=(0, 0, 0))
+                .with_duration(seconds).with_opacity(0.4))
+    text_scene = create_scene_with_text(BENCH_IMAGE, seconds, [
+        {'text': "89 Euro", 'start': 0, 'end': seconds, 'position': ('center', 1400),
+         'font_size': 70, 'color': 'gold'}
+    ], zoom_effect=False)
+    base_frame = np.full((VIDEO_HEIGHT, VIDEO_WIDTH, 3), 26, dtype=np.uint8)
+
+    # Layer costs are measured on top of one composite pass ('compose')
+    frame_ms = {
+        'still': still - compose,
+        'ken_burns': ms_per_frame(create_scene_with_text(BENCH_IMAGE, seconds, [])) - compose,
+        'zoom_punch': ms_per_frame(create_zoom_punch_clip(BENCH_IMAGE, seconds)),
+        'blur_in': ms_per_frame(create_blur_in_clip(BENCH_IMAGE, seconds)),
+        'shake': ms_per_frame(create_shake_clip_frames(base_frame, seconds, 3, 15)),
+        'solid': solid_ms,
+        'animated_background': ms_per_frame(animated_clip(BENCH_BACKGROUND, seconds)),
+        'dim': ms_per_frame(over_solid(dim_clip)) - compose,
+        'text': ms_per_frame(text_scene) - still,
+        'neon': ms_per_frame(over_solid(neon_clip)) - compose,
+        'neon_pulse': ms_per_frame(over_solid(pulse_clip)) - compose,
+        'badge': ms_per_frame(timeline_clip(
+            [(0, seconds, {'type': 'flash', 'duration': seconds})],
+            [badge_layer({'kind': 'animated', 'text': "J-9 | Livraison Garantie",
+                          'y': VIDEO_HEIGHT - 120})])) - solid_ms,
+        'captions': ms_per_frame(add_captions(solid(), caption_cues(
+            ["Le resto était complet. Encore. Alors j'ai fait mieux."], 0, seconds))) - solid_ms,
+        'compose': compose - solid_ms,
+        'transition': ms_per_frame(timeline_clip(
+            [(0, 1, {'type': 'flash', 'duration': 1}),
+             (1, seconds, {'type': 'flash', 'duration': seconds - 1,
+                           'transition': {'kind': 'crossfade', 'duration': 2}})]
+        )) - 2 * solid_ms,
+    }
+
+    print("Calibrating encoder...")
+    # Precomputed frames, so the wall time is the encoder's alone
+    photo = np.asarray(resize_for_tiktok(BENCH_IMAGE))
+    encode_frames = [np.roll(photo, 8 * i, axis=1) for i in range(frames * 2)]
+    encode_clip = VideoClip(lambda t: encode_frames[min(int(t * FPS), len(encode_frames) - 1)],
+                            duration=len(encode_frames) / FPS)
+    with tempfile.TemporaryDirectory() as tmp:
+        started = time.perf_counter()
+        encode_clip.write_videofile(f"{tmp}/calibrate.mp4", fps=FPS, codec='libx264',
+                                    audio=False, preset='medium', threads=4, logger=None)
+        frame_ms['encode'] = (time.perf_counter() - started) * 1000 / len(encode_frames)
+        # The lossless intermediate of two-pass and delivery encodes
+        encode_clip.write_videofile(f"{tmp}/lossless.mkv", fps=FPS, codec='libx264',
+                                    audio=False, preset='ultrafast', threads=4, logger=None,
+                                    ffmpeg_params=['-qp', '0'])
+        lossless_kbps = os.path.getsize(f"{tmp}/lossless.mkv") * 8 / 1000 / encode_clip.duration
+
+    print("Calibrating asset setup...")
+
+    def cold_prepare():
+        _prepare_for_tiktok.cache_clear()
+        resize_for_tiktok(BENCH_IMAGE)
+
+    def cold_background():
+        _static_background.cache_clear()
+        background_array(dict(BENCH_BACKGROUND, kind='linear'))
+
+    def cold_neon():
+        create_neon_text_image.cache_clear()
+        create_neon_text_image("CINEMA PRIVE", 60)
+
+    prepare_ms = best_of(cold_prepare, 2) * 1000
+    setup_ms = {
+        'prepare': prepare_ms,
+        'background': best_of(cold_background, 2) * 1000,
+        'blur_set': best_of(lambda: create_blur_in_clip(BENCH_IMAGE, seconds), 2) * 1000,
+        'neon_sprite': best_of(cold_neon, 2) * 1000,
+        'text_clip': best_of(lambda: TextClip(text="89 Euro", font_size=70, color='gold',
+                                              font=font_path(), stroke_color='black',
+                                              stroke_width=2), 2) * 1000,
+    }
+
+    # Output bitrate of the ads already in public/ads (sizes + spec durations)
+    with open(DATA_FILE, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    rates = []
+    for spec in campaign_specs(data) + [viral_spec("J-9")]:
+        path = OUTPUT_DIR / spec['output']
+        if path.exists():
+            rates.append(path.stat().st_size * 8 / 1000 / duration_of(spec))
+
+    model = {
+        'frame_ms': {k: round(max(v, 0.1), 2) for k, v in frame_ms.items()},
+        'setup_ms': {k: round(v, 1) for k, v in setup_ms.items()},
+        'memory_mb': {
+            'process': round(process_mb),
+            'encoder': DEFAULT_COST_MODEL['memory_mb']['encoder'],
+        },
+        'lossless_kbps': round(lossless_kbps),
+    }
+    if rates:
+        model['output_kbps'] = round(sum(rates) / len(rates))
+
+    COST_MODEL_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with open(COST_MODEL_FILE, 'w', encoding='utf-8') as f:
+        json.dump(model, f, indent=2)
+    print(f"Cost model saved to {COST_MODEL_FILE}")
+    return model
@@ -0,0 +1,264 @@
+"""
+DRIP. source image preflight
+Checks every source image of the ads before anything is rendered, in a
+thread pool (downloads and JPEG decoding release the GIL):
+
+- decode: the file is fetched and fully decoded (broken downloads, HTML
+  error pages, truncated JPEGs)
+- resolution: how much the 9:16 crop has to be enlarged to 1080x1920
+- crop loss: the share of the picture the 9:16 crop throws away
+- duplicates: a 64-bit difference hash (dHash) of each picture; two
+  scenes of one ad showing the same photo are flagged, even at different
+  sizes or URLs
+
+    python3 scripts/drip-ads.py preflight [--catalog] [--audit audit.json]
+
+The report (PREFLIGHT_REPORT) is keyed by image reference (URL or /images
+path), the way products.json and the audit-images route name images.
+`--audit` takes the JSON of GET /api/audit-images and also checks the CJ
+images it proposes; POST /api/audit-images then skips the ones the report
+rejects.
+"""
+
+import hashlib
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from PIL import Image
+
+from .config import (
+    CATALOG_FILE, DATA_FILE, PREFLIGHT_REPORT, PROJECT_ROOT, VIDEO_WIDTH, VIDEO_HEIGHT
+)
+from .imaging import cover_box, download_image, ensure_dirs
+from .specs import (
+    CATALOG_TEMPLATES, campaign_specs, catalog_source, catalog_spec, source_background,
+    source_path, viral_spec
+)
+
+PREFLIGHT_WORKERS = 8
+MAX_UPSCALE = 2.0           # error above: the picture would be visibly soft
+WARN_UPSCALE = 1.5
+WARN_CROP_LOSS = 0.6        # a 16:9 landscape loses 68% in a 9:16 crop
+DUPLICATE_DISTANCE = 6      # dHash bits that may differ between duplicates
+
+
+def source_key(source: dict) -> str:
+    """Reference of a source as products.json / the fiches name it"""
+    return source.get('url') or source.get('path') or f"temp:{source['name']}"
+
+
+def dhash(img: Image.Image) -> int:
+    """Difference hash: brightness gradients of a 9x8 thumbnail, 64 bits"""
+    pixels = list(img.convert('L').resize((9, 8), Image.Resampling.BOX).getdata())
+    bits = 0
+    for row in range(8):
+        for col in range(8):
+            left = pixels[row * 9 + col]
+            right = pixels[row * 9 + col + 1]
+            bits = (bits << 1) | (left > right)
+    return bits
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+
+def check_image(source: dict) -> dict:
+    """Preflight of one source (runs in the thread pool)"""
+    started = time.perf_counter()
+    result = {'status': 'ok', 'issues': []}
+
+    path = download_image(source['url'], source['name']) if 'url' in source \
+        else source_path(source)
+    if path is None or not path.exists():
+        result.update(status='error', issues=["not available (download failed or missing file)"])
+        return result
+
+    try:
+        with Image.open(path) as img:
+            img.load()
+            width, height = img.size
+            phash = dhash(img)
+    except Exception as e:
+        result.update(status='error', issues=[f"cannot decode: {type(e).__name__}: {e}"])
+        return result
+
+    left, top, right, bottom = cover_box(width, height)
+    upscale = max(VIDEO_WIDTH / (right - left), VIDEO_HEIGHT / (bottom - top))
+    crop_loss = 1 - (right - left) * (bottom - top) / (width * height)
+    result.update(width=width, height=height, upscale=round(upscale, 2),
+                  crop_loss=round(crop_loss, 2), dhash=f"{phash:016x}")
+
+    if upscale > MAX_UPSCALE:
+        result['status'] = 'error'
+        result['issues'].append(f"too small: {width}x{height} enlarged x{upscale:.1f}")
+    elif upscale > WARN_UPSCALE:
+        result['status'] = 'warning'
+        result['issues'].append(f"low resolution: {width}x{height} enlarged x{upscale:.1f}")
+    if crop_loss > WARN_CROP_LOSS:
+        if result['status'] == 'ok':
+            result['status'] = 'warning'
+        result['issues'].append(f"aspect ratio: the 9:16 crop loses {crop_loss:.0%}")
+
+    result['check_ms'] = round((time.perf_counter() - started) * 1000)
+    return result
+
+
+# =============================================================================
+# REPORT
+# =============================================================================
+
+def downloaded_sources(specs: list) -> dict:
+    """{name: source} of the sources the ads download"""
+    return {scene['source']['name']: scene['source']
+            for spec in specs for scene in spec['scenes'] if 'url' in scene.get('source', {})}
+
+
+def resolve_source(source: dict, downloaded: dict) -> dict:
+    """A {'name'} source is the file another ad downloads under that name"""
+    if set(source) == {'name'} and source['name'] in downloaded:
+        return downloaded[source['name']]
+    return source
+
+
+def collect_sources(specs: list, audit: dict = None) -> dict:
+    """{reference: {'source', 'used_by'}} of the ads' scenes and audit candidates"""
+    downloaded = downloaded_sources(specs)
+
+    sources = {}
+    for spec in specs:
+        for index, scene in enumerate(spec['scenes']):
+            source = scene.get('source')
+            if not source or source_background(source) is not None:
+                continue
+            source = resolve_source(source, downloaded)
+            entry = sources.setdefault(source_key(source), {'source': source, 'used_by': []})
+            entry['used_by'].append({'output': spec['output'], 'scene': index + 1})
+
+    for product in (audit or {}).get('details', []):
+        for url in product.get('cjImages', []):
+            name = f"cj_{hashlib.sha1(url.encode('utf-8')).hexdigest()[:12]}"
+            sources.setdefault(url, {'source': catalog_source(url, name), 'used_by': []})
+    return sources
+
+
+def find_duplicates(images: dict) -> list:
+    """Groups of references whose pictures have (nearly) the same dHash"""
+    hashed = [(key, int(entry['dhash'], 16)) for key, entry in images.items()
+              if entry.get('dhash')]
+    groups = []
+    grouped = set()
+    for i, (key, value) in enumerate(hashed):
+        if key in grouped:
+            continue
+        group = [key] + [other for other, other_value in hashed[i + 1:]
+                         if other not in grouped
+                         and hamming(value, other_value) <= DUPLICATE_DISTANCE]
+        if len(group) > 1:
+            grouped.update(group)
+            groups.append(group)
+    return groups
+
+
+def preflight(specs: list, audit: dict = None, workers: int = PREFLIGHT_WORKERS) -> dict:
+    """Checks every source of the specs (and the audit candidates) in parallel"""
+    ensure_dirs()
+    sources = collect_sources(specs, audit)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = dict(zip(sources, pool.map(check_image,
+                                             [entry['source'] for entry in sources.values()])))
+
+    images = {}
+    for key, entry in sources.items():
+        images[key] = dict(results[key], used_by=entry['used_by'])
+
+    duplicates = find_duplicates(images)
+    for group in duplicates:
+        for key in group[1:]:
+            images[key]['duplicate_of'] = group[0]
+
+    downloaded = downloaded_sources(specs)
+    ads = {}
+    for spec in specs:
+        issues = []
+        errors = False
+        pictures = {}           # picture -> (reference, scene number) of its first scene
+        for index, scene in enumerate(spec['scenes']):
+            source = scene.get('source')
+            if not source or source_background(source) is not None:
+                continue
+            key = source_key(resolve_source(source, downloaded))
+            image = images[key]
+            if image['status'] == 'error':
+                errors = True
+                # Unreadable sources are dropped from the timeline (timeline.available_scenes)
+                dropped = " (the scene would be dropped)" if 'width' not in image else ""
+                issues.append(f"scene {index + 1}: {key}: {'; '.join(image['issues'])}{dropped}")
+            picture = image.get('duplicate_of', key)
+            first = pictures.setdefault(picture, (key, index + 1))
+            if first[0] != key:
+                issues.append(f"scene {index + 1} shows the same picture as scene {first[1]} "
+                              f"({key})")
+        ads[spec['output']] = {
+            'status': 'error' if errors else ('warning' if issues else 'ok'),
+            'issues': issues,
+        }
+
+    statuses = [image['status'] for image in images.values()]
+    return {
+        'generated': datetime.now().isoformat(timespec='seconds'),
+        'thresholds': {
+            'max_upscale': MAX_UPSCALE, 'warn_upscale': WARN_UPSCALE,
+            'warn_crop_loss': WARN_CROP_LOSS, 'duplicate_distance': DUPLICATE_DISTANCE,
+        },
+        'summary': {
+            'images': len(images),
+            'ok': statuses.count('ok'),
+            'warnings': statuses.count('warning'),
+            'errors': statuses.count('error'),
+            'duplicates': sum(len(group) - 1 for group in duplicates),
+            'seconds': round(time.perf_counter() - started, 2),
+        },
+        'images': images,
+        'duplicates': duplicates,
+        'ads': ads,
+    }
+
+
+def preflight_specs(catalog: bool = True) -> list:
+    """Specs of every ad the render commands produce"""
+    with open(DATA_FILE, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    specs = campaign_specs(data) + [viral_spec("J-9")]
+    if catalog:
+        with open(CATALOG_FILE, 'r', encoding='utf-8') as f:
+            products = json.load(f)
+        specs += [catalog_spec(product, template)
+                  for product in products if product.get('images') or product.get('image')
+                  for template in CATALOG_TEMPLATES]
+    return specs
+
+
+def write_report(report: dict, path=PREFLIGHT_REPORT):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+
+def print_report(report: dict):
+    summary = report['summary']
+    print(f"Preflight: {summary['images']} images in {summary['seconds']}s - "
+          f"{summary['ok']} ok, {summary['warnings']} warnings, {summary['errors']} errors, "
+          f"{summary['duplicates']} duplicates")
+    for key, image in report['images'].items():
+        for issue in image['issues']:
+            label = 'ERROR' if image['status'] == 'error' else 'WARN'
+            print(f"  [{label}] {key[:70]}: {issue}")
+    for group in report['duplicates']:
+        print(f"  [DUPLICATE] {' = '.join(key[:50] for key in group)}")
+    for output, ad in report['ads'].items():
+        for issue in ad['issues']:
+            print(f"  [{ad['status'].upper()}] {output}: {issue}")
+    print(f"Report: {PREFLIGHT_REPORT.relative_to(PROJECT_ROOT)}")
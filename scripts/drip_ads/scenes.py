@@ -0,0 +1,463 @@
+"""
+DRIP. scene builder
+Builds moviepy clips from the ad specs of specs.py: one builder per scene
+type, plus the persistent urgency badge and the export settings shared by
+every generator.
+"""
+
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+from moviepy import CompositeVideoClip, ColorClip
+
+from .captions import caption_cues, caption_layer
+from .config import (
+    PROJECT_ROOT, OUTPUT_DIR, VIDEO_WIDTH, VIDEO_HEIGHT,
+    ROSE_NEON, ROSE_GLOW, GOLD, WHITE, DARK_BG,
+    COUNTDOWN_FONT_SIZE, COUNTDOWN_Y
+)
+from .effects import (
+    create_scene_with_text, flash_transition, create_zoom_punch_clip,
+    create_blur_in_clip, create_shake_clip_frames, create_neon_text_clip,
+    create_urgency_badge_animated
+)
+from .backgrounds import background_array, background_clip
+from .imaging import download_image, ensure_dirs, hex_to_rgb
+from .specs import source_background, source_path, spec_frames
+from .text import create_urgency_badge, create_urgency_badge_image
+
+# Background of the CTA scene unless its spec picks one (e.g. specs.CTA_GRADIENT)
+CTA_BACKGROUND = {'kind': 'solid', 'color': list(hex_to_rgb(DARK_BG))}
+
+
+# =============================================================================
+# SCENE BUILDERS
+# =============================================================================
+
+def build_hook_scene(image_path: Path, hook_text: str, duration: float = 3.0):
+    """
+    Scene 1: Hook puissant (0-3s)
+    - Flash d'entree
+    - Texte choc en neon rose
+    - Effet blur-in sur l'image
+    """
+    # Background with blur-in effect
+    bg_clip = create_blur_in_clip(image_path, duration=duration, blur_time=0.5)
+
+    # Darken overlay for text visibility
+    dark_overlay = (ColorClip(size=(VIDEO_WIDTH, VIDEO_HEIGHT), color=(0, 0, 0))
+                    .with_duration(duration)
+                    .with_opacity(0.4))
+
+    # Neon hook text
+    hook_clip = (create_neon_text_clip(
+        hook_text,
+        duration=duration - 0.3,
+        font_size=65,
+        text_color=WHITE,
+        glow_color=ROSE_NEON,
+        position=('center', 400),
+        pulse=True
+    ).with_start(0.3))
+
+    # Compose scene
+    scene = CompositeVideoClip(
+        [bg_clip, dark_overlay, hook_clip],
+        size=(VIDEO_WIDTH, VIDEO_HEIGHT)
+    ).with_duration(duration)
+
+    return scene
+
+
+def build_product_reveal_scene(image_path: Path, product_text: str,
+                               price_text: str, duration: float = 4.0):
+    """
+    Scene 2: Reveal produit (3-10s)
+    - Zoom punch dynamique
+    - Texte produit
+    - Prix en or avec glow
+    """
+    # Background with zoom punch
+    bg_clip = create_zoom_punch_clip(
+        image_path,
+        duration=duration,
+        zoom_start=1.0,
+        zoom_peak=1.15,
+        punch_time=0.4
+    )
+
+    # Product text
+    product_clip = (create_neon_text_clip(
+        product_text,
+        duration=duration - 0.5,
+        font_size=55,
+        text_color=WHITE,
+        glow_color=ROSE_GLOW,
+        position=('center', 350)
+    ).with_start(0.3))
+
+    # Price in gold
+    price_clip = (create_neon_text_clip(
+        price_text,
+        duration=duration - 1.0,
+        font_size=80,
+        text_color=GOLD,
+        glow_color=GOLD,
+        position=('center', 1400),
+        pulse=True
+    ).with_start(1.0))
+
+    scene = CompositeVideoClip(
+        [bg_clip, product_clip, price_clip],
+        size=(VIDEO_WIDTH, VIDEO_HEIGHT)
+    ).with_duration(duration)
+
+    return scene
+
+
+def build_urgency_scene(duration: float = 3.0, countdown: str = "J-9"):
+    """
+    Scene 3: Urgence (10-15s)
+    - Background sombre
+    - "J-9" pulsant en gros (omis si countdown=None, voir mode layered)
+    - Badge livraison
+    """
+    # Dark background
+    bg_color = hex_to_rgb(DARK_BG)
+
+    # Create base frame for shake effect
+    base_frame = np.full((VIDEO_HEIGHT, VIDEO_WIDTH, 3), bg_color, dtype=np.uint8)
+
+    # Shake effect on background
+    bg_shake = create_shake_clip_frames(base_frame, duration, intensity=3, frequency=15)
+
+    layers = [bg_shake]
+
+    # J-9 countdown - BIG and pulsing
+    if countdown:
+        layers.append(create_neon_text_clip(
+            countdown,
+            duration=duration,
+            font_size=COUNTDOWN_FONT_SIZE,
+            text_color=ROSE_NEON,
+            glow_color=ROSE_NEON,
+            position=('center', COUNTDOWN_Y),
+            pulse=True
+        ))
+
+    # Subtitle
+    subtitle_clip = (create_neon_text_clip(
+        "LIVRAISON GARANTIE",
+        duration=duration - 0.5,
+        font_size=45,
+        text_color=WHITE,
+        glow_color=ROSE_GLOW,
+        position=('center', 1000)
+    ).with_start(0.5))
+
+    # Date
+    date_clip = (create_neon_text_clip(
+        "avant le 14/02",
+        duration=duration - 1.0,
+        font_size=40,
+        text_color=WHITE,
+        glow_color=ROSE_GLOW,
+        position=('center', 1100)
+    ).with_start(1.0))
+
+    scene = CompositeVideoClip(
+        layers + [subtitle_clip, date_clip],
+        size=(VIDEO_WIDTH, VIDEO_HEIGHT)
+    ).with_duration(duration)
+
+    return scene
+
+
+def build_cta_scene(duration: float = 3.0, background: dict = None):
+    """
+    Scene 4: CTA (15-20s)
+    - Logo DRIP. central
+    - "Lien en bio"
+    """
+    # Dark background
+    bg_clip = background_clip(background or CTA_BACKGROUND, duration)
+
+    # DRIP logo
+    logo_clip = (create_neon_text_clip(
+        "DRIP.",
+        duration=duration - 0.5,
+        font_size=120,
+        text_color=WHITE,
+        glow_color=ROSE_NEON,
+        position=('center', 800),
+        pulse=True
+    ).with_start(0.3))
+
+    # Lien en bio
+    cta_clip = (create_neon_text_clip(
+        "Lien en bio",
+        duration=duration - 1.0,
+        font_size=50,
+        text_color=WHITE,
+        glow_color=ROSE_GLOW,
+        position=('center', 1050)
+    ).with_start(0.8))
+
+    # Urgency badge at bottom
+    badge_clip = (create_urgency_badge_animated(
+        "COMMANDE MAINTENANT",
+        duration=duration - 0.5
+    ).with_start(0.5))
+
+    scene = CompositeVideoClip(
+        [bg_clip, logo_clip, cta_clip, badge_clip],
+        size=(VIDEO_WIDTH, VIDEO_HEIGHT)
+    ).with_duration(duration)
+
+    return scene
+
+
+def build_quick_cut_scene(image_path: Path, text: str, duration: float = 1.5):
+    """
+    Quick cut scene for rapid montage
+    - Fast zoom punch
+    - Bold text overlay
+    """
+    bg_clip = create_zoom_punch_clip(
+        image_path,
+        duration=duration,
+        zoom_start=1.05,
+        zoom_peak=1.2,
+        punch_time=0.2
+    )
+
+    text_clip = (create_neon_text_clip(
+        text,
+        duration=duration - 0.2,
+        font_size=60,
+        text_color=WHITE,
+        glow_color=ROSE_NEON,
+        position=('center', 900)
+    ).with_start(0.1))
+
+    scene = CompositeVideoClip(
+        [bg_clip, text_clip],
+        size=(VIDEO_WIDTH, VIDEO_HEIGHT)
+    ).with_duration(duration)
+
+    return scene
+
+
+# =============================================================================
+# SPEC DISPATCH
+# =============================================================================
+
+def prepare_source(source: dict):
+    """
+    Makes an image source available locally and returns its path, or the
+    Image of a static procedural background (drawn in memory)
+    Returns None when it cannot be obtained (failed download, missing file)
+    """
+    background = source_background(source)
+    if background is not None:
+        return Image.fromarray(background_array(background))
+
+    if 'url' in source:
+        return download_image(source['url'], source['name'])
+
+    path = source_path(source)
+    if not path.exists():
+        print(f"  ERROR: missing image {path}")
+        return None
+    return path
+
+
+def scene_overlays(scene: dict) -> list:
+    """image_text overlays, with JSON lists turned back into positions"""
+    overlays = []
+    for overlay in scene.get('overlays', []):
+        position = overlay.get('position', 'center')
+        if isinstance(position, list):
+            position = tuple(position)
+        overlays.append(dict(overlay, position=position))
+    return overlays
+
+
+def build_scene(scene: dict):
+    """Clip of one scene spec, or None when its source image is unavailable"""
+    if scene.get('label'):
+        print(f"  {scene['label']}")
+
+    kind = scene['type']
+    duration = scene['duration']
+
+    if kind == 'flash':
+        return flash_transition(duration)
+    if kind == 'urgency':
+        return build_urgency_scene(duration=duration, countdown=scene.get('countdown'))
+    if kind == 'cta':
+        return build_cta_scene(duration=duration, background=scene.get('background'))
+
+    background = source_background(scene['source'])
+    if kind == 'image_text' and background is not None:
+        return create_scene_with_text(
+            None,
+            duration=duration,
+            overlays=scene_overlays(scene),
+            zoom_effect=scene.get('zoom', True),
+            background=background
+        )
+
+    image_path = prepare_source(scene['source'])
+    if image_path is None:
+        return None
+
+    if kind == 'image_text':
+        return create_scene_with_text(
+            image_path,
+            duration=duration,
+            overlays=scene_overlays(scene),
+            zoom_effect=scene.get('zoom', True)
+        )
+    if kind == 'hook':
+        return build_hook_scene(image_path, scene['text'], duration=duration)
+    if kind == 'reveal':
+        return build_product_reveal_scene(image_path, scene['text'], scene['price'],
+                                          duration=duration)
+    if kind == 'quick_cut':
+        return build_quick_cut_scene(image_path, scene['text'], duration=duration)
+
+    raise ValueError(f"Unknown scene type '{kind}'")
+
+
+def build_scenes(spec: dict) -> list:
+    """Clips of every scene of an ad spec, skipping unavailable ones"""
+    clips = []
+    for scene in spec['scenes']:
+        clip = build_scene(scene)
+        if clip is not None:
+            clips.append(clip)
+    return clips
+
+
+def badge_layer(badge: dict):
+    """
+    Timeline layer of the persistent urgency badge: the opaque static
+    banner, or the alpha-blended animated one
+    """
+    from .timeline import paste_layer
+
+    if badge['kind'] == 'animated':
+        sprite = np.array(create_urgency_badge_image(badge['text']))
+    else:
+        sprite = np.array(create_urgency_badge(badge['text']).convert('RGB'))
+    return paste_layer(sprite, (VIDEO_WIDTH - sprite.shape[1]) // 2, badge['y'])
+
+
+def build_ad(spec: dict, memory: dict = None, cuts: list = None):
+    """
+    Final clip of an ad spec (scenes + badge + captions), or None without scenes
+    The cut list of the scenes is evaluated frame by frame with the badge
+    and captions drawn in the same pass; scenes are built while the clip is
+    read and released after it (timeline.py). `memory` receives the
+    timeline's memory report; `cuts` is the spec's cut_list() when the
+    caller already resolved it.
+    """
+    # timeline.py builds its scenes with this module
+    from .timeline import cut_list, timeline_clip
+
+    cuts = cut_list(spec) if cuts is None else cuts
+    if not cuts:
+        return None
+
+    layers = []
+    if spec.get('badge'):
+        layers.append(badge_layer(spec['badge']))
+    if spec.get('captions') and spec.get('script'):
+        cues = caption_cues(spec['script'], 0, cuts[-1][1], spec['captions'])
+        if cues:
+            layers.append(caption_layer(cues, spec['captions']))
+    return timeline_clip(cuts, layers, stats=memory)
+
+
+def export_clip(clip, output_path: Path, threads: int, logger='bar',
+                encoding: dict = None, audio_kbps: float = 0, duration: float = None,
+                delivery_base: Path = None) -> dict:
+    """
+    Writes a clip with the encoding settings of every DRIP. ad, under the
+    rate control of `encoding` (encoding.py) and with its delivery outputs
+    (delivery.py), and returns what it achieved
+    """
+    from .encoding import encode_clip
+    return encode_clip(clip, output_path, threads=threads, logger=logger,
+                       encoding=encoding, audio_kbps=audio_kbps, duration=duration,
+                       delivery_base=delivery_base)
+
+
+def export_ad(clip, output_path: Path, threads: int, logger='bar',
+              encoding: dict = None, music: dict = None) -> dict:
+    """
+    export_clip() (or audio.export_with_music() with a beat_align() track)
+    into output_path through a part file (delivery.staging_path: outside
+    public/), renamed into place once complete: an interrupted render never
+    leaves a truncated MP4 where it can be served
+    """
+    from .delivery import staging_path
+
+    output_path = Path(output_path)
+    if music:
+        # Exported silent then muxed, both staged outside public/
+        from .audio import export_with_music
+        return export_with_music(clip, output_path, music, threads, encoding)
+
+    part_path = staging_path(output_path)
+    try:
+        encoded = export_clip(clip, part_path, threads=threads, logger=logger,
+                              encoding=encoding, delivery_base=output_path)
+        os.replace(part_path, output_path)
+    finally:
+        if part_path.exists():
+            part_path.unlink()
+    return encoded
+
+
+def render_spec(spec: dict, threads: int = None, logger=None) -> dict:
+    """
+    Renders an ad spec to OUTPUT_DIR (runs inside worker processes), staged
+    by export_ad() so an interrupted render leaves no truncated MP4 behind
+    The render waits for a slot of the machine-wide scheduler, which also
+    picks the x264 threads unless `threads` is given (scheduler.py).
+    """
+    from .scheduler import planned_peak_mb, render_slot
+    from .timeline import peak_rss_mb
+
+    started = time.time()
+    ensure_dirs()
+
+    output_path = OUTPUT_DIR / spec['output']
+    with render_slot(planned_peak_mb(spec), spec_frames(spec), threads) as slot:
+        final = build_ad(spec)
+        if final is None:
+            raise RuntimeError(f"no usable images for {spec['name']}")
+        duration = float(final.duration)
+        try:
+            encoded = export_ad(final, output_path, threads=slot['threads'], logger=logger,
+                                encoding=spec.get('encoding'))
+        finally:
+            final.close()
+
+    return {
+        'output': str(output_path.relative_to(PROJECT_ROOT)),
+        'duration': duration,
+        'bytes': output_path.stat().st_size,
+        'render_seconds': round(time.time() - started, 1),
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+        'encoder_threads': slot['threads'],
+        'kbps': encoded['kbps'],
+        'target_kbps': encoded['target_kbps'],
+        'renditions': [str(Path(r['path']).relative_to(PROJECT_ROOT))
+                       for r in encoded.get('renditions', [])]
+    }
@@ -0,0 +1,196 @@
+"""
+DRIP. render scheduler
+Machine-wide CPU and memory budget shared by every render on the box:
+the campaign ads, the viral banger, the layered countdown pieces and
+variants, catalog pool workers, `queue work` processes, daemon and
+cluster workers all take a slot before they render (the encoders have no
+default thread count), so several generators no longer each ask x264
+for 4 threads on top of each other. Watch previews and the planner's
+calibration are not scheduled.
+
+- A slot is admitted while fewer than `limit` renders run and the memory
+  still available (MemAvailable, minus what the running renders have yet
+  to reach of their planned peak) covers the new render's planned peak
+  plus MEMORY_RESERVE_MB. Otherwise the render waits for one to finish.
+- Each render gets one core for frame production (moviepy is one Python
+  thread) and cores // limit - 1 x264 threads.
+- When a render ends, its frames/s times the mean number of concurrent
+  renders feeds an estimate of the machine throughput at that
+  concurrency; the limit moves to the neighbouring concurrency while that
+  one is unmeasured or measurably faster (hill climbing), so a long batch
+  settles on the concurrency that keeps the machine busiest.
+
+State (limit, throughput per concurrency, running renders) is one JSON
+file in SCHEDULER_DIR, read and written under an flock; renders of dead
+processes are dropped from it.
+"""
+
+import fcntl
+import json
+import os
+import time
+from contextlib import contextmanager
+
+from .config import SCHEDULER_DIR
+
+MEMORY_RESERVE_MB = 1024
+MAX_ENCODER_THREADS = 8
+THROUGHPUT_MARGIN = 0.05    # a concurrency must beat its neighbour by 5%
+THROUGHPUT_SMOOTHING = 0.3  # weight of the latest render in the estimates
+POLL_SECONDS = 1.0
+
+
+def machine() -> dict:
+    """Cores usable by this process and memory from /proc/meminfo, in MB"""
+    try:
+        cores = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cores = os.cpu_count() or 1
+    memory = {}
+    try:
+        with open('/proc/meminfo', 'r') as f:
+            for line in f:
+                key, value = line.split(':', 1)
+                memory[key] = int(value.split()[0]) / 1024
+    except OSError:
+        pass
+    total = memory.get('MemTotal') or (
+        os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES') / 2 ** 20)
+    return {'cores': cores, 'total_mb': total,
+            'available_mb': memory.get('MemAvailable', total)}
+
+
+def process_rss_mb(pid: int) -> float:
+    """Resident memory of a process, None when it is gone"""
+    try:
+        with open(f'/proc/{pid}/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def max_jobs(peak_mb: float, resources: dict = None) -> int:
+    """Renders of `peak_mb` the machine could hold at once (cores and memory)"""
+    resources = resources or machine()
+    by_memory = int((resources['total_mb'] - MEMORY_RESERVE_MB) // max(peak_mb, 1))
+    return max(1, min(resources['cores'], by_memory))
+
+
+def encoder_threads(cores: int, limit: int) -> int:
+    return max(1, min(MAX_ENCODER_THREADS, cores // limit - 1))
+
+
+def planned_peak_mb(spec: dict) -> float:
+    """Peak memory of a render, from the planner's cost model"""
+    from .planner import load_cost_model, plan_ad
+    return plan_ad(spec, load_cost_model())['estimate']['peak_memory_mb']
+
+
+# =============================================================================
+# SHARED STATE
+# =============================================================================
+
+@contextmanager
+def locked_state():
+    """The scheduler state, locked against the other processes, saved on exit"""
+    SCHEDULER_DIR.mkdir(parents=True, exist_ok=True)
+    with open(SCHEDULER_DIR / 'lock', 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        path = SCHEDULER_DIR / 'state.json'
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            state = {}
+        state.setdefault('limit', 0)
+        state.setdefault('rates', {})
+        state.setdefault('running', {})
+        # Renders of processes that died without releasing their slot
+        for pid in [p for p in state['running'] if process_rss_mb(int(p)) is None]:
+            del state['running'][pid]
+        yield state
+        tmp_path = path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_path, path)
+
+
+def admit(state: dict, peak_mb: float, resources: dict) -> bool:
+    ceiling = max_jobs(peak_mb, resources)
+    if not state['limit']:
+        # Until measured: one render per two cores
+        state['limit'] = max(1, min(ceiling, resources['cores'] // 2))
+    state['limit'] = min(state['limit'], ceiling)
+    running = state['running'].values()
+    if len(running) >= state['limit']:
+        return False
+    # Running renders that have not reached their peak yet will take more
+    pending_mb = sum(max(0.0, job['peak_mb'] - (process_rss_mb(job['pid']) or 0))
+                     for job in running)
+    free_mb = resources['available_mb'] - pending_mb - MEMORY_RESERVE_MB
+    return not running or free_mb >= peak_mb
+
+
+def adjust_limit(state: dict, ceiling: int):
+    """Hill climbing on the measured throughput per concurrency"""
+    rates, limit = state['rates'], state['limit']
+    here = rates.get(str(limit))
+    if here is None:
+        return
+    below, above = rates.get(str(limit - 1)), rates.get(str(limit + 1))
+    if below is not None and here < below * (1 - THROUGHPUT_MARGIN):
+        state['limit'] = limit - 1
+    elif limit < ceiling and (above is None or above > here * (1 + THROUGHPUT_MARGIN)):
+        state['limit'] = limit + 1
+
+
+@contextmanager
+def render_slot(peak_mb: float, frames: int, threads: int = None):
+    """
+    Waits for a slot for a render of `frames` frames peaking at `peak_mb`
+    and yields {'threads', 'limit', 'running'}: the x264 threads to use
+    (`threads` when given) and the load when admitted
+    """
+    pid = os.getpid()
+    waited = False
+    while True:
+        resources = machine()
+        with locked_state() as state:
+            if admit(state, peak_mb, resources):
+                concurrency = len(state['running']) + 1
+                state['running'][str(pid)] = {'pid': pid, 'peak_mb': peak_mb,
+                                              'started': time.time(),
+                                              'concurrency': concurrency}
+                limit = state['limit']
+                break
+        if not waited:
+            print(f"  [WAIT] render slots full, waiting ({peak_mb:.0f} MB planned)")
+            waited = True
+        time.sleep(POLL_SECONDS)
+
+    slot = {'threads': threads or encoder_threads(resources['cores'], limit),
+            'limit': limit, 'running': concurrency}
+    started = time.time()
+    completed = False
+    try:
+        yield slot
+        completed = True
+    finally:
+        seconds = time.time() - started
+        with locked_state() as state:
+            job = state['running'].pop(str(pid), None)
+            if completed and job and seconds > 0:
+                # Renders alongside this one, averaged over its start and end
+                concurrency = (job['concurrency'] + len(state['running']) + 1) / 2
+                level = str(max(1, round(concurrency)))
+                rate = frames / seconds * concurrency
+                previous = state['rates'].get(level)
+                state['rates'][level] = round(rate if previous is None else
+                                              previous + THROUGHPUT_SMOOTHING
+                                              * (rate - previous), 2)
+                adjust_limit(state, max_jobs(peak_mb))
+
+
+def scheduler_status() -> dict:
+    with locked_state() as state:
+        return {'machine': machine(), **state}
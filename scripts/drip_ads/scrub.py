@@ -0,0 +1,308 @@
+"""
+DRIP. frame server
+Local scrubbing server for creative reviews: any timestamp of an ad is
+rendered on demand through the same timeline and scene builders as the
+export (timeline.py), at reduced resolution, without encoding a video.
+
+    python3 scripts/drip-ads.py scrub [--port 8766] [--reduce 3]
+
+    GET /                   ads with a scrubber (slider over the frames)
+    GET /ads                the ads as JSON (name, duration, frames, fps)
+    GET /frame/<ad>?t=2.5   one frame as JPEG (or ?i=<frame index>)
+    GET /stream/<ad>        MJPEG stream, paced in real time
+                            ?start=0&end=<s>&fps=<FPS>
+
+- Ads are the campaign ads and the viral banger of the fiches file, read
+  again on every request: an edited fiche or a replaced source image
+  (mtime) gives a new ad clip. LIVE_ADS clips stay built (each with its
+  current scenes alive), the least recently used one is closed.
+- Frames are snapped to the FPS grid and kept as JPEG in an LRU cache of
+  FRAME_CACHE_MB, keyed by ad version, frame and reduction, so scrubbing
+  back over a region costs nothing. A cache miss builds only the scenes
+  that frame shows; a seek renders a single frame (frames.py).
+- One render at a time (the timeline reuses its buffers): requests are
+  served by threads, frames are produced under a lock.
+
+The server binds to localhost only.
+"""
+
+import hashlib
+import io
+import json
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+from .config import FPS
+from .specs import spec_frames, spec_hash
+from .watch import snapshot, watched_files, watched_specs
+
+SCRUB_HOST = '127.0.0.1'
+SCRUB_PORT = 8766
+SCRUB_REDUCE = 3            # 1080x1920 -> 360x640
+MAX_REDUCE = 8
+JPEG_QUALITY = 80
+FRAME_CACHE_MB = 64
+LIVE_ADS = 4                # campaign + viral on one page
+BOUNDARY = 'dripframe'
+
+
+def ad_version(spec: dict) -> str:
+    """Spec hash plus the mtimes of its source images"""
+    payload = json.dumps([spec_hash(spec), snapshot(watched_files([spec])[1:])])
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def find_ad(name: str) -> dict:
+    specs = watched_specs([name])
+    return specs[0] if specs else None
+
+
+class FrameCache:
+    """LRU of encoded frames, bounded in bytes"""
+
+    def __init__(self, max_mb: float = FRAME_CACHE_MB):
+        self.max_bytes = max_mb * 2 ** 20
+        self.frames = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        jpeg = self.frames.get(key)
+        if jpeg is None:
+            self.misses += 1
+            return None
+        self.frames.move_to_end(key)
+        self.hits += 1
+        return jpeg
+
+    def put(self, key, jpeg: bytes):
+        if key in self.frames:
+            return
+        self.frames[key] = jpeg
+        self.size += len(jpeg)
+        while self.size > self.max_bytes and len(self.frames) > 1:
+            _, old = self.frames.popitem(last=False)
+            self.size -= len(old)
+
+    def stats(self) -> dict:
+        return {'frames': len(self.frames), 'mb': round(self.size / 2 ** 20, 1),
+                'hits': self.hits, 'misses': self.misses}
+
+
+# =============================================================================
+# RENDERING
+# =============================================================================
+
+def ad_clip(server, spec: dict, version: str):
+    """The built clip of an ad version, closing the least recently used ones"""
+    from .scenes import build_ad
+
+    clips = server.clips
+    if version in clips:
+        clips.move_to_end(version)
+        return clips[version]
+    clip = build_ad(spec)
+    if clip is None:
+        raise RuntimeError(f"no usable images for {spec['name']}")
+    clips[version] = clip
+    while len(clips) > LIVE_ADS:
+        clips.popitem(last=False)[1].close()
+    return clip
+
+
+def frame_jpeg(server, spec: dict, index: int, reduce: int) -> bytes:
+    """JPEG of frame `index` of an ad, from the cache or rendered"""
+    from PIL import Image
+
+    with server.lock:
+        version = ad_version(spec)
+        key = (version, index, reduce)
+        jpeg = server.cache.get(key)
+        if jpeg is not None:
+            return jpeg
+        started = time.perf_counter()
+        image = Image.fromarray(ad_clip(server, spec, version).get_frame(index / FPS))
+        # Off the timeline's reused buffer before the lock is released
+        image = image.reduce(reduce) if reduce > 1 else image.copy()
+        server.render_ms.append((time.perf_counter() - started) * 1000)
+        del server.render_ms[:-100]
+
+    out = io.BytesIO()
+    image.save(out, format='JPEG', quality=JPEG_QUALITY)
+    jpeg = out.getvalue()
+    with server.lock:
+        server.cache.put(key, jpeg)
+    return jpeg
+
+
+def frame_index(spec: dict, query: dict) -> int:
+    frames = spec_frames(spec)
+    if 'i' in query:
+        index = int(query['i'][0])
+    else:
+        index = int(round(float(query.get('t', ['0'])[0]) * FPS))
+    return min(max(index, 0), frames - 1)
+
+
+# =============================================================================
+# HTTP
+# =============================================================================
+
+PAGE = """<!doctype html>
+<meta charset="utf-8"><title>DRIP. scrub</title>
+<style>
+body {{ background: #1A1A2E; color: #fff; font: 14px sans-serif; margin: 20px; }}
+.ad {{ display: inline-block; margin: 0 20px 20px 0; vertical-align: top; }}
+img {{ display: block; width: {width}px; height: {height}px; background: #000; }}
+input {{ width: {width}px; }}
+a {{ color: #FF6B8A; }}
+</style>
+{ads}
+<script>
+for (const ad of document.querySelectorAll('.ad')) {{
+  const img = ad.querySelector('img'), range = ad.querySelector('input'),
+        label = ad.querySelector('span');
+  let pending = null, loading = false;
+  const show = () => {{
+    if (loading || pending === null) return;
+    loading = true;
+    img.src = '/frame/' + ad.dataset.name + '?i=' + pending;
+    label.textContent = (pending / {fps}).toFixed(2) + 's';
+    pending = null;
+  }};
+  img.onload = img.onerror = () => {{ loading = false; show(); }};
+  range.oninput = () => {{ pending = range.value; show(); }};
+}}
+</script>
+"""
+
+AD_BLOCK = """<div class="ad" data-name="{name}">
+<b>{name}</b> <span>0.00s</span> / {duration:.2f}s
+(<a href="/stream/{name}" target="_blank">play</a>)
+<img src="/frame/{name}?i=0" alt="{name}">
+<input type="range" min="0" max="{last}" value="0">
+</div>"""
+
+
+class ScrubHandler(BaseHTTPRequestHandler):
+    server_version = "drip-scrub/1"
+
+    def send_body(self, status: int, content_type: str, body: bytes):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_json(self, status: int, payload):
+        self.send_body(status, 'application/json',
+                       json.dumps(payload, ensure_ascii=False).encode('utf-8'))
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        try:
+            if url.path == '/':
+                self.send_page()
+            elif url.path == '/ads':
+                self.send_json(200, {'ads': [ad_info(spec) for spec in watched_specs()],
+                                     'cache': self.server.cache.stats(),
+                                     'render_ms': mean_ms(self.server.render_ms)})
+            elif url.path.startswith(('/frame/', '/stream/')):
+                kind, name = url.path[1:].split('/', 1)
+                spec = find_ad(unquote(name))
+                if spec is None:
+                    self.send_json(404, {'error': 'unknown ad'})
+                elif kind == 'frame':
+                    jpeg = frame_jpeg(self.server, spec, frame_index(spec, query),
+                                      self.server.reduce)
+                    self.send_body(200, 'image/jpeg', jpeg)
+                else:
+                    self.send_stream(spec, query)
+            else:
+                self.send_json(404, {'error': 'not found'})
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        except ValueError as e:
+            self.send_json(400, {'error': str(e)})
+        except Exception as e:
+            print(f"  [ERROR] {self.path}: {e}")
+            self.send_json(500, {'error': str(e)})
+
+    def send_page(self):
+        from .config import VIDEO_WIDTH, VIDEO_HEIGHT
+
+        reduce = self.server.reduce
+        ads = "\n".join(AD_BLOCK.format(**ad_info(spec)) for spec in watched_specs())
+        page = PAGE.format(ads=ads, fps=FPS, width=VIDEO_WIDTH // reduce,
+                           height=VIDEO_HEIGHT // reduce)
+        self.send_body(200, 'text/html; charset=utf-8', page.encode('utf-8'))
+
+    def send_stream(self, spec: dict, query: dict):
+        """multipart/x-mixed-replace JPEGs from start to end at fps"""
+        fps = min(max(float(query.get('fps', [FPS])[0]), 1.0), FPS)
+        first = frame_index(spec, {'t': query.get('start', ['0'])})
+        last = frame_index(spec, {'t': query['end']}) if 'end' in query \
+            else spec_frames(spec) - 1
+        step = FPS / fps
+        self.send_response(200)
+        self.send_header('Content-Type', f'multipart/x-mixed-replace; boundary={BOUNDARY}')
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        started = time.time()
+        n = 0
+        while first + int(n * step) <= last:
+            jpeg = frame_jpeg(self.server, spec, first + int(n * step), self.server.reduce)
+            self.wfile.write(f"--{BOUNDARY}\r\nContent-Type: image/jpeg\r\n"
+                             f"Content-Length: {len(jpeg)}\r\n\r\n".encode('ascii'))
+            self.wfile.write(jpeg + b"\r\n")
+            n += 1
+            # Real time when rendering keeps up, as fast as it can otherwise
+            delay = started + n / fps - time.time()
+            if delay > 0:
+                time.sleep(delay)
+        self.wfile.write(f"--{BOUNDARY}--\r\n".encode('ascii'))
+
+    def log_message(self, format, *args):
+        # Scrubbing fires a request per slider move: only errors are logged
+        pass
+
+
+def ad_info(spec: dict) -> dict:
+    frames = spec_frames(spec)
+    return {'name': spec['name'], 'duration': frames / FPS, 'frames': frames,
+            'last': frames - 1, 'fps': FPS}
+
+
+def mean_ms(values: list) -> float:
+    return round(sum(values) / len(values), 1) if values else None
+
+
+def serve_frames(host: str = SCRUB_HOST, port: int = SCRUB_PORT, reduce: int = SCRUB_REDUCE,
+                 cache_mb: float = FRAME_CACHE_MB):
+    """Runs the frame server until interrupted"""
+    server = ThreadingHTTPServer((host, port), ScrubHandler)
+    server.daemon_threads = True
+    server.reduce = min(max(1, reduce), MAX_REDUCE)
+    server.cache = FrameCache(cache_mb)
+    server.clips = OrderedDict()
+    server.lock = threading.RLock()
+    server.render_ms = []
+
+    print("=" * 60)
+    print(f"DRIP. frame server on http://{host}:{server.server_address[1]} "
+          f"(1/{server.reduce} resolution, {cache_mb:g} MB frame cache)")
+    print("=" * 60)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopping...")
+    finally:
+        server.server_close()
+        for clip in server.clips.values():
+            clip.close()
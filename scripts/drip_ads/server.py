@@ -0,0 +1,269 @@
+"""
+DRIP. render daemon
+Long-running local render service: a pool of worker processes that stay
+alive between jobs, so moviepy imports, loaded fonts, prepared source
+frames and text sprites (the lru caches of imaging.py and text.py) are
+paid once per worker instead of once per render.
+
+    python3 scripts/drip-ads.py serve [--port 8765 | --socket /tmp/drip.sock] [--workers 2]
+
+    GET  /health            workers and job counts
+    POST /render            queue a render, answers 202 with the job
+                            {"spec": {...ad spec, see specs.py...}}
+                            {"product_id": "...", "template": "showcase"}
+                            ?wait=1 answers once the job is finished
+                            (200, or 500 when it failed; still 202 when
+                            it is pending after WAIT_TIMEOUT)
+    POST /plan              same body, planner estimate only
+    GET  /jobs/<id>         job status and result
+
+Jobs are keyed by spec hash: posting a spec that is already queued or
+running returns the existing job, and a finished spec whose output is
+still on disk is not rendered again. The server binds to localhost only.
+"""
+
+import importlib
+import json
+import multiprocessing
+import os
+import signal
+import socketserver
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from .config import CATALOG_FILE, PROJECT_ROOT, OUTPUT_DIR
+from .planner import plan_ads
+from .specs import CATALOG_TEMPLATES, catalog_spec, check_spec, spec_hash
+
+DAEMON_HOST = '127.0.0.1'
+DAEMON_PORT = 8765
+DAEMON_WORKERS = 2
+WAIT_TIMEOUT = 900          # seconds a ?wait=1 request may block
+MAX_BODY_BYTES = 1024 * 1024
+
+
+def warm_worker():
+    """Pool initializer: imports and common sprites, once per worker"""
+    importlib.import_module(f"{__package__}.scenes")
+    from .fonts import font_path, get_font
+    from .text import create_urgency_badge
+
+    font_path()
+    get_font(50)
+    create_urgency_badge()
+
+
+def render_job(spec: dict) -> dict:
+    from .scenes import render_spec
+    return render_spec(spec)
+
+
+def resolve_spec(body: dict) -> tuple:
+    """(spec, errors) of a /render or /plan request body"""
+    if not isinstance(body, dict):
+        return None, ["body must be a JSON object"]
+
+    if 'product_id' in body:
+        template = body.get('template', 'showcase')
+        if template not in CATALOG_TEMPLATES:
+            return None, [f"unknown template '{template}'"]
+        with open(CATALOG_FILE, 'r', encoding='utf-8') as f:
+            products = json.load(f)
+        product = next((p for p in products if p['id'] == body['product_id']), None)
+        if product is None:
+            return None, [f"unknown product '{body['product_id']}'"]
+        if not (product.get('images') or product.get('image')):
+            return None, [f"product '{product['id']}' has no images"]
+        spec = catalog_spec(product, template)
+    else:
+        spec = body.get('spec')
+
+    errors = check_spec(spec)
+    return (None if errors else spec), errors
+
+
+# =============================================================================
+# JOB TABLE
+# =============================================================================
+
+def job_view(job: dict) -> dict:
+    return {k: v for k, v in job.items() if k not in ('spec', 'future', 'finished_event')}
+
+
+def submit_job(server, spec: dict) -> dict:
+    """Queues a spec, or returns the job already covering it"""
+    key = spec_hash(spec)[:16]
+    with server.lock:
+        job = server.jobs.get(key)
+        if job and job['status'] in ('queued', 'running'):
+            return job
+        if (job and job['status'] == 'done'
+                and (PROJECT_ROOT / job['result']['output']).exists()):
+            return job
+
+        job = {
+            'id': key,
+            'name': spec.get('name', ''),
+            'output': str((OUTPUT_DIR / spec['output']).relative_to(PROJECT_ROOT)),
+            'status': 'queued',
+            'submitted': time.time(),
+            'spec': spec,
+            'finished_event': threading.Event(),
+        }
+        job['future'] = server.pool.submit(render_job, spec)
+        job['future'].add_done_callback(lambda future: finish_job(server, key, future))
+        server.jobs[key] = job
+        print(f"  [QUEUED] {key} {job['name']} -> {job['output']}")
+        return job
+
+
+def finish_job(server, key: str, future):
+    with server.lock:
+        job = server.jobs[key]
+        try:
+            job['result'] = future.result()
+            job['status'] = 'done'
+            print(f"  [OK] {key} {job['result']['output']} "
+                  f"({job['result']['render_seconds']}s)")
+        except Exception as e:
+            job['status'] = 'error'
+            job['error'] = str(e)
+            print(f"  [ERROR] {key}: {e}")
+        job['finished'] = time.time()
+        job['finished_event'].set()
+
+
+def job_counts(server) -> dict:
+    counts = {}
+    with server.lock:
+        for job in server.jobs.values():
+            # The pool does not report starts: a job is running once its
+            # future is, queued before that
+            if job['status'] == 'queued' and job['future'].running():
+                job['status'] = 'running'
+            counts[job['status']] = counts.get(job['status'], 0) + 1
+    return counts
+
+
+# =============================================================================
+# HTTP
+# =============================================================================
+
+class RenderHandler(BaseHTTPRequestHandler):
+    server_version = "drip-render/1"
+
+    def address_string(self):
+        # Unix socket clients have no address
+        return self.client_address[0] if self.client_address else 'unix'
+
+    def send_json(self, status: int, payload: dict):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def read_json(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if not 0 < length <= MAX_BODY_BYTES:
+            return None
+        try:
+            return json.loads(self.rfile.read(length))
+        except ValueError:
+            return None
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path == '/health':
+            self.send_json(200, {
+                'status': 'ok',
+                'workers': self.server.workers,
+                'jobs': job_counts(self.server),
+            })
+        elif path.startswith('/jobs/'):
+            job_counts(self.server)
+            job = self.server.jobs.get(path[len('/jobs/'):])
+            if job is None:
+                self.send_json(404, {'error': 'unknown job'})
+            else:
+                self.send_json(200, job_view(job))
+        else:
+            self.send_json(404, {'error': 'not found'})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path not in ('/render', '/plan'):
+            self.send_json(404, {'error': 'not found'})
+            return
+
+        spec, errors = resolve_spec(self.read_json())
+        if errors:
+            self.send_json(400, {'errors': errors})
+            return
+
+        if url.path == '/plan':
+            self.send_json(200, plan_ads([spec]))
+            return
+
+        job = submit_job(self.server, spec)
+        if parse_qs(url.query).get('wait') == ['1']:
+            job['finished_event'].wait(WAIT_TIMEOUT)
+            job_counts(self.server)
+            status = {'done': 200, 'error': 500}.get(job['status'], 202)
+            self.send_json(status, job_view(job))
+            return
+        self.send_json(202, job_view(job))
+
+
+def stop_on_sigterm(signum, frame):
+    raise KeyboardInterrupt
+
+
+class UnixRenderServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def serve(host: str = DAEMON_HOST, port: int = DAEMON_PORT, socket_path: str = None,
+          workers: int = DAEMON_WORKERS):
+    """Runs the render daemon until interrupted"""
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    # spawn: the HTTP threads must not be forked into the workers
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=warm_worker,
+                               mp_context=multiprocessing.get_context('spawn'))
+
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        server = UnixRenderServer(socket_path, RenderHandler)
+        where = f"unix:{socket_path}"
+    else:
+        server = ThreadingHTTPServer((host, port), RenderHandler)
+        where = f"http://{host}:{server.server_address[1]}"
+
+    server.pool = pool
+    server.workers = workers
+    server.jobs = {}
+    server.lock = threading.RLock()
+
+    # Start the workers now so the first job finds them warm
+    for _ in range(workers):
+        pool.submit(int)
+
+    print("=" * 60)
+    print(f"DRIP. render daemon on {where} ({workers} workers)")
+    print("=" * 60)
+    signal.signal(signal.SIGTERM, stop_on_sigterm)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopping...")
+    finally:
+        server.server_close()
+        # Queued jobs are dropped, running renders finish
+        pool.shutdown(wait=True, cancel_futures=True)
+        if socket_path and os.path.exists(socket_path):
+            os.unlink(socket_path)
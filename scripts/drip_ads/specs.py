@@ -0,0 +1,629 @@
+"""
+DRIP. ad specs
+Every ad is described as plain data (JSON-compatible dicts) before any
+pixel is touched. The renderer (scenes.py) and the planner (planner.py)
+read the same specs, so a plan always matches what gets rendered.
+
+Ad spec:
+    {'name', 'title', 'output', 'badge': {'kind', 'text', 'y'}, 'scenes': [...],
+     'music': [musique_suggestions of the fiche],
+     'script': [script_voix_off lines], 'captions': None | 'line' | 'word',
+     'encoding': {'target_mb', 'max_kbps', 'crf', 'ladder', 'webm', 'hls'}
+                 (optional, encoding.py and delivery.py)}
+
+Scene spec: {'type', 'duration', ...} where type is one of SCENE_TYPES.
+Image scenes take a 'source':
+    {'url': ..., 'name': ...}   downloaded once into TEMP_DIR/<name>.jpg
+    {'name': ...}               must already be in TEMP_DIR/<name>.jpg
+    {'path': '/images/x.jpg'}   file under public/
+    {'color': [r, g, b], 'name': ...}   solid background
+    {'background': {'kind', ...}, 'name': ...}
+                                procedural background (backgrounds.py), one
+                                of BACKGROUND_KINDS; 'animated' ones only in
+                                image_text scenes
+Backgrounds are drawn in memory, never written to TEMP_DIR.
+cta scenes take an optional 'background' of the same form (solid DARK_BG
+by default, CTA_GRADIENT for a radial one lit behind the logo).
+Any scene but the first may open with a 'transition' from the previous one:
+    {'kind': one of TRANSITION_KINDS, 'duration': 0.4, ...kernel params}
+centred on the cut (transitions.py), so it does not change the timing.
+Transitions are opt-in: the shipped campaign ads keep their hard cuts.
+Only the standard library is used here.
+"""
+
+import hashlib
+import json
+import re
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from .config import (
+    PUBLIC_DIR, TEMP_DIR, VIDEO_WIDTH, VIDEO_HEIGHT, FPS,
+    URGENCY_TEXT, BADGE_Y, BADGE_TEMPLATE
+)
+
+SCENE_TYPES = ['image_text', 'flash', 'hook', 'reveal', 'quick_cut', 'urgency', 'cta']
+SCENE_FIELDS = {
+    'image_text': ['source'],
+    'hook': ['source', 'text'],
+    'reveal': ['source', 'text', 'price'],
+    'quick_cut': ['source', 'text'],
+}
+BACKGROUND_KINDS = ['solid', 'linear', 'radial', 'noise', 'animated']
+TRANSITION_KINDS = ['crossfade', 'dip', 'swipe', 'zoom_through', 'whip']
+TRANSITION_DIRECTIONS = ['left', 'right', 'up', 'down']
+DELIVERY_RUNGS = [720, 540, 360]
+# Opt-in CTA background: lighter behind the DRIP. logo (y=800), DARK_BG
+# around it, darker corners
+CTA_GRADIENT = {'kind': 'radial', 'colors': [[44, 34, 70], [26, 26, 46], [12, 12, 22]],
+                'center': [0.5, 0.42], 'radius': 0.9}
+MAX_AD_SECONDS = 180
+MAX_TEXT_CHARS = 200
+FONT_SIZE_RANGE = (8, 300)
+SAFE_NAME = re.compile(r'^[A-Za-z0-9_.-]+$')
+# CDNs taking imgix-style w/h/fit parameters
+RESIZING_HOSTS = {'images.unsplash.com'}
+
+
+def text(text: str, start: float, end: float, y: int,
+         font_size: int = 50, color: str = 'white') -> dict:
+    """Text overlay of an image_text scene, horizontally centered at y"""
+    return {
+        'text': text,
+        'start': start,
+        'end': end,
+        'position': ('center', y),
+        'font_size': font_size,
+        'color': color
+    }
+
+
+def campaign_badge() -> dict:
+    return {'kind': 'static', 'text': URGENCY_TEXT, 'y': VIDEO_HEIGHT - 100}
+
+
+def countdown_days(countdown: str) -> int:
+    """Days left of a countdown label ("J-9" -> 9)"""
+    return int(countdown.rsplit('-', 1)[1])
+
+
+# =============================================================================
+# CAMPAIGN ADS
+# =============================================================================
+
+def projecteur_spec(data: dict) -> dict:
+    images = data['fiche_1_projecteur']['images_cj']
+    return {
+        'name': 'projecteur',
+        'music': data['fiche_1_projecteur'].get('musique_suggestions', []),
+        'script': list(data['fiche_1_projecteur'].get('script_voix_off', {}).values()),
+        'captions': None,
+        'title': "Projecteur (89 Euro)",
+        'output': "ad_projecteur_89.mp4",
+        'badge': campaign_badge(),
+        'scenes': [
+            # Scene 1: Hook (0-5s)
+            {'type': 'image_text', 'duration': 5, 'zoom': True,
+             'source': {'url': images['principale'], 'name': 'projecteur_main'},
+             'overlays': [
+                 text("Le resto a 150 Euro etait complet...", 0, 4, 300, 55)
+             ]},
+            # Scene 2: Product reveal (5-15s)
+            {'type': 'image_text', 'duration': 10, 'zoom': True,
+             'source': {'url': images['ambiance'], 'name': 'projecteur_ambiance'},
+             'overlays': [
+                 text("Alors j'ai cree NOTRE cinema", 0, 4, 400, 50),
+                 text("89 Euro - UNE SEULE FOIS", 5, 10, 1400, 60, 'gold')
+             ]},
+            # Scene 3: Lifestyle + CTA (15-30s)
+            {'type': 'image_text', 'duration': 15, 'zoom': True,
+             'source': {'url': images['lifestyle'], 'name': 'projecteur_lifestyle'},
+             'overlays': [
+                 text("Netflix sur 120 pouces", 0, 5, 400, 55),
+                 text("Sur mon plafond.", 5, 10, 500, 50),
+                 text("Lien en bio - DRIP.", 10, 15, 1500, 45)
+             ]}
+        ]
+    }
+
+
+def body_spec(data: dict) -> dict:
+    images = data['fiche_2_body']['images_cj']
+    return {
+        'name': 'body',
+        'music': data['fiche_2_body'].get('musique_suggestions', []),
+        'script': list(data['fiche_2_body'].get('script_voix_off', {}).values()),
+        'captions': None,
+        'title': "Body Sculptant (35 Euro)",
+        'output': "ad_body_sculptant_35.mp4",
+        'badge': campaign_badge(),
+        'scenes': [
+            # Scene 1: Hook (0-5s)
+            {'type': 'image_text', 'duration': 5, 'zoom': True,
+             'source': {'url': images['principale'], 'name': 'body_main'},
+             'overlays': [
+                 text("Le cadeau qu'elle veut VRAIMENT", 0, 4, 300, 50)
+             ]},
+            # Scene 2: Product details (5-15s)
+            {'type': 'image_text', 'duration': 10, 'zoom': True,
+             'source': {'url': images['detail'], 'name': 'body_detail'},
+             'overlays': [
+                 text("Pas un parfum. Pas des fleurs.", 0, 3, 400, 45, 'gray'),
+                 text("LA CONFIANCE EN SOI", 3, 8, 500, 55, '#FFB6C1'),
+                 text("Seamless - Tummy Control - XS-3XL", 8, 10, 1400, 40)
+             ]},
+            # Scene 3: Transformation + CTA (15-25s)
+            {'type': 'image_text', 'duration': 10, 'zoom': True,
+             'source': {'url': images['lifestyle'], 'name': 'body_lifestyle'},
+             'overlays': [
+                 text("35 Euro - Le dupe Skims", 0, 5, 400, 55, '#FFB6C1'),
+                 text("Effet WOW garanti", 5, 8, 500, 50),
+                 text("Lien en bio - DRIP.", 8, 10, 1500, 45)
+             ]}
+        ]
+    }
+
+
+def compilation_spec(data: dict, countdown: str = "J-9") -> dict:
+    """
+    The 3-gifts compilation; countdown=None leaves out its date-dependent
+    overlay ("PLUS QUE 9 JOURS" of the CTA scene)
+    """
+    countdown_overlays = []
+    if countdown:
+        days = countdown_days(countdown)
+        countdown_overlays.append(
+            text(f"PLUS QUE {days} JOUR{'S' if days > 1 else ''}", 0, 5, 700, 70, '#FF4D6D'))
+    projecteur = data['fiche_1_projecteur']['images_cj']
+    body = data['fiche_2_body']['images_cj']
+    return {
+        'name': 'compilation',
+        'music': data['fiche_3_compilation'].get('musique_suggestions', []),
+        'script': list(data['fiche_3_compilation'].get('script_voix_off', {}).values()),
+        'captions': None,
+        'title': "Compilation 3 Cadeaux",
+        'output': "ad_compilation_3cadeaux.mp4",
+        'badge': campaign_badge(),
+        'scenes': [
+            # Scene 1: Hook (0-5s) - Dark background with text
+            {'type': 'image_text', 'duration': 5, 'zoom': False,
+             'source': {'color': [30, 30, 40], 'name': 'compilation_hook'},
+             'overlays': [
+                 text("3 cadeaux pour eviter", 0, 2, 700, 55),
+                 text("le celibat le 15/02", 1.5, 5, 800, 55, '#FF4D6D')
+             ]},
+            # Scene 2: Projecteur (5-15s)
+            {'type': 'image_text', 'duration': 10, 'zoom': True,
+             'source': {'url': projecteur['principale'], 'name': 'projecteur_main'},
+             'overlays': [
+                 text("#1 Cinema prive", 0, 3, 400, 55, 'gold'),
+                 text("89 Euro", 3, 10, 1400, 70, 'gold')
+             ]},
+            # Scene 3: Body (15-25s)
+            {'type': 'image_text', 'duration': 10, 'zoom': True,
+             'source': {'url': body['principale'], 'name': 'body_main'},
+             'overlays': [
+                 text("#2 Body sculptant", 0, 3, 400, 55, '#FFB6C1'),
+                 text("35 Euro", 3, 10, 1400, 70, '#FFB6C1')
+             ]},
+            # Scene 4: Station charge
+            {'type': 'image_text', 'duration': 8, 'zoom': False,
+             'source': {'color': [40, 50, 80], 'name': 'compilation_tech'},
+             'overlays': [
+                 text("#3 Station de charge", 0, 3, 400, 55, '#87CEEB'),
+                 text("45 Euro", 3, 8, 1400, 70, '#87CEEB')
+             ]},
+            # Scene 5: Countdown + CTA (33-45s)
+            {'type': 'image_text', 'duration': 10, 'zoom': False,
+             'source': {'color': [50, 30, 40], 'name': 'compilation_cta'},
+             'overlays': countdown_overlays + [
+                 text("Lien en bio", 5, 10, 900, 55),
+                 text("DRIP.", 7, 10, 1000, 80)
+             ]}
+        ]
+    }
+
+
+def campaign_specs(data: dict) -> list:
+    """The three campaign ads, in generation order"""
+    return [projecteur_spec(data), body_spec(data), compilation_spec(data)]
+
+
+# =============================================================================
+# VIRAL BANGER
+# =============================================================================
+
+# Source images of the viral banger (downloaded by the campaign ads)
+VIRAL_SOURCES = ['projecteur_main', 'projecteur_ambiance', 'body_main', 'body_lifestyle']
+
+
+def viral_spec(countdown: str = "J-9") -> dict:
+    """
+    The viral banger; countdown=None leaves out the date-dependent layers
+    (big countdown of the urgency scene and persistent badge)
+    """
+    return {
+        'name': 'viral',
+        'title': f"Viral Banger {countdown or 'base'}",
+        'output': f"viral_banger_{(countdown or 'base').lower().replace('-', '')}.mp4",
+        'badge': ({'kind': 'animated', 'text': BADGE_TEMPLATE.format(countdown=countdown),
+                   'y': BADGE_Y} if countdown else None),
+        'scenes': [
+            {'type': 'hook', 'duration': 3.0, 'source': {'name': 'projecteur_main'},
+             'text': "Le resto etait complet...",
+             'label': "[1/6] Building hook scene..."},
+            {'type': 'flash', 'duration': 0.1,
+             'label': "[2/6] Adding flash transition..."},
+            {'type': 'reveal', 'duration': 4.0, 'source': {'name': 'projecteur_ambiance'},
+             'text': "CINEMA PRIVE", 'price': "89 Euro",
+             'label': "[3/6] Building product reveal..."},
+            {'type': 'flash', 'duration': 0.08,
+             'label': "[4/6] Building quick cuts montage..."},
+            {'type': 'quick_cut', 'duration': 1.5, 'source': {'name': 'body_main'},
+             'text': "BODY SCULPTANT"},
+            {'type': 'flash', 'duration': 0.08},
+            {'type': 'quick_cut', 'duration': 1.5, 'source': {'name': 'body_lifestyle'},
+             'text': "35 Euro"},
+            {'type': 'flash', 'duration': 0.08},
+            {'type': 'quick_cut', 'duration': 1.5, 'source': {'name': 'projecteur_main'},
+             'text': "EFFET WOW"},
+            {'type': 'flash', 'duration': 0.1,
+             'label': "[5/6] Building urgency scene..."},
+            {'type': 'urgency', 'duration': 3.5, 'countdown': countdown},
+            {'type': 'flash', 'duration': 0.1,
+             'label': "[6/6] Building CTA scene..."},
+            {'type': 'cta', 'duration': 3.5}
+        ]
+    }
+
+
+# =============================================================================
+# CATALOG
+# =============================================================================
+
+# Scene templates applied to every product of src/data/products.json.
+# Each scene picks a product image by index (wrapping around when the product
+# has fewer images) and formats its overlay texts with the product fields:
+# {name}, {price}, {description}, {valentine}.
+CATALOG_TEMPLATES = {
+    'showcase': [
+        {'image': 0, 'duration': 4, 'overlays': [
+            text("{name}", 0, 4, 300, 55)
+        ]},
+        {'image': 1, 'duration': 5, 'overlays': [
+            text("{price}", 0.5, 5, 1400, 70, 'gold')
+        ]},
+        {'image': 2, 'duration': 5, 'overlays': [
+            text("{description}", 0, 3, 400, 40),
+            text("Lien en bio - DRIP.", 3, 5, 1500, 45)
+        ]}
+    ],
+    'valentine': [
+        {'image': 0, 'duration': 4, 'overlays': [
+            text("Le cadeau parfait pour le 14/02", 0, 4, 300, 50)
+        ]},
+        {'image': 1, 'duration': 5, 'overlays': [
+            text("{name}", 0, 2.5, 400, 55, '#FF4D6D'),
+            text("{price}", 2.5, 5, 1400, 70, 'gold')
+        ]},
+        {'image': 2, 'duration': 4, 'overlays': [
+            text("Lien en bio - DRIP.", 0, 4, 1500, 45)
+        ]}
+    ]
+}
+
+
+def catalog_texts(product: dict) -> dict:
+    """Fields available to template overlay texts"""
+    return {
+        'name': product['name'],
+        'price': f"{round(product['price'])} Euro",
+        'description': product.get('description', '').split('.')[0],
+        'valentine': product.get('valentineDescription', '')
+    }
+
+
+def catalog_source(ref: str, name: str) -> dict:
+    """Source of a products.json image reference"""
+    if ref.startswith('http://') or ref.startswith('https://'):
+        return {'url': ref, 'name': name}
+    return {'path': ref}
+
+
+def catalog_spec(product: dict, template: str) -> dict:
+    texts = catalog_texts(product)
+    images = product.get('images') or [product['image']]
+
+    scenes = []
+    for scene in CATALOG_TEMPLATES[template]:
+        index = scene['image'] % len(images)
+        scenes.append({
+            'type': 'image_text',
+            'duration': scene['duration'],
+            'zoom': True,
+            'source': catalog_source(images[index], f"{product['id']}_{index}"),
+            'overlays': [
+                dict(overlay, text=overlay['text'].format(**texts))
+                for overlay in scene['overlays']
+            ]
+        })
+
+    return {
+        'name': f"{product['id']}:{template}",
+        'title': product['name'],
+        'output': f"catalog/ad_{product['id']}_{template}.mp4",
+        'badge': campaign_badge(),
+        'scenes': scenes
+    }
+
+
+# =============================================================================
+# TIMELINE HELPERS
+# =============================================================================
+
+def spec_hash(spec: dict) -> str:
+    """Content hash of a spec, the identity of its render job"""
+    payload = json.dumps(spec, sort_keys=True).encode('utf-8')
+    return hashlib.sha1(payload).hexdigest()
+
+
+def spec_duration(spec: dict) -> float:
+    return sum(scene['duration'] for scene in spec['scenes'])
+
+
+def scene_windows(spec: dict) -> list:
+    """(start, end) of every scene on the ad timeline"""
+    windows = []
+    start = 0.0
+    for scene in spec['scenes']:
+        windows.append((start, start + scene['duration']))
+        start += scene['duration']
+    return windows
+
+
+def spec_frames(spec: dict) -> int:
+    return int(spec_duration(spec) * FPS)
+
+
+def source_background(source: dict) -> dict:
+    """Procedural background of a source ({'color'} is a solid one), None for images"""
+    if 'background' in source:
+        return source['background']
+    if 'color' in source:
+        return {'kind': 'solid', 'color': source['color']}
+    return None
+
+
+def source_path(source: dict) -> Path:
+    """Local file of an image source (None for backgrounds)"""
+    if source_background(source) is not None:
+        return None
+    if 'path' in source:
+        return PUBLIC_DIR / source['path'].lstrip('/')
+    return TEMP_DIR / f"{source['name']}.jpg"
+
+
+def sized_url(url: str, width: int = VIDEO_WIDTH, height: int = VIDEO_HEIGHT) -> str:
+    """
+    URL of the centre cover crop at width x height on resizing CDNs, the
+    URL unchanged elsewhere
+    """
+    parts = urlsplit(url)
+    if parts.hostname not in RESIZING_HOSTS:
+        return url
+    query = {k: v for k, v in parse_qsl(parts.query) if k not in ('w', 'h', 'fit', 'crop')}
+    query.update(w=str(width), h=str(height), fit='crop', crop='center')
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def spec_sources(spec: dict) -> list:
+    """Image sources used by an ad, in scene order, without duplicates"""
+    sources = []
+    for scene in spec['scenes']:
+        source = scene.get('source')
+        if source and source_background(source) is None and source not in sources:
+            sources.append(source)
+    return sources
+
+
+# =============================================================================
+# VALIDATION
+# =============================================================================
+
+def is_safe_relative(path: str) -> bool:
+    parts = Path(path).parts
+    return bool(parts) and not Path(path).is_absolute() and '..' not in parts
+
+
+def is_color(color) -> bool:
+    return (isinstance(color, list) and len(color) == 3
+            and all(isinstance(c, int) and 0 <= c <= 255 for c in color))
+
+
+def check_background(background, where: str) -> list:
+    if not isinstance(background, dict) or background.get('kind') not in BACKGROUND_KINDS:
+        return [f"{where}: background kind must be one of {', '.join(BACKGROUND_KINDS)}"]
+    errors = []
+    if background['kind'] in ('solid', 'noise'):
+        if not is_color(background.get('color')):
+            errors.append(f"{where}: background color must be [r, g, b]")
+    else:
+        colors = background.get('colors')
+        if not (isinstance(colors, list) and colors and all(map(is_color, colors))):
+            errors.append(f"{where}: background colors must be a list of [r, g, b]")
+    for field in ('angle', 'amount', 'seed'):
+        if not isinstance(background.get(field, 0), (int, float)):
+            errors.append(f"{where}: background {field} must be a number")
+    for field in ('radius', 'period'):
+        value = background.get(field, 1)
+        if not isinstance(value, (int, float)) or value <= 0:
+            errors.append(f"{where}: background {field} must be positive")
+    center = background.get('center', [0.5, 0.5])
+    if not (isinstance(center, list) and len(center) == 2
+            and all(isinstance(c, (int, float)) for c in center)):
+        errors.append(f"{where}: background center must be [x, y]")
+    return errors
+
+
+def check_text(value, where: str, field: str) -> list:
+    if not isinstance(value, str) or len(value) > MAX_TEXT_CHARS:
+        return [f"{where}: {field} must be a string of at most {MAX_TEXT_CHARS} characters"]
+    return []
+
+
+def check_overlay(overlay, where: str) -> list:
+    """Errors of an image_text overlay (see specs.text)"""
+    if not isinstance(overlay, dict) or not {'text', 'start', 'end'} <= set(overlay):
+        return [f"{where}: overlays need text, start and end"]
+    errors = check_text(overlay['text'], where, "overlay text")
+    if not all(isinstance(overlay[field], (int, float)) for field in ('start', 'end')):
+        errors.append(f"{where}: overlay start and end must be numbers")
+    low, high = FONT_SIZE_RANGE
+    font_size = overlay.get('font_size', 50)
+    if not isinstance(font_size, int) or isinstance(font_size, bool) \
+            or not low <= font_size <= high:
+        errors.append(f"{where}: overlay font_size must be an integer in [{low}, {high}]")
+    return errors
+
+
+def check_transition(transition, where: str) -> list:
+    if not isinstance(transition, dict) or transition.get('kind') not in TRANSITION_KINDS:
+        return [f"{where}: transition kind must be one of {', '.join(TRANSITION_KINDS)}"]
+    errors = []
+    duration = transition.get('duration')
+    if not isinstance(duration, (int, float)) or duration <= 0:
+        errors.append(f"{where}: transition duration must be positive")
+    if transition.get('direction', 'left') not in TRANSITION_DIRECTIONS:
+        errors.append(f"{where}: transition direction must be one of "
+                      f"{', '.join(TRANSITION_DIRECTIONS)}")
+    if not is_color(transition.get('color', [0, 0, 0])):
+        errors.append(f"{where}: transition color must be [r, g, b]")
+    for field in ('zoom', 'blur'):
+        value = transition.get(field, 1)
+        if not isinstance(value, (int, float)) or value <= 0:
+            errors.append(f"{where}: transition {field} must be positive")
+    unknown = set(transition) - {'kind', 'duration', 'direction', 'color', 'zoom', 'blur'}
+    if unknown:
+        errors.append(f"{where}: unknown transition fields {', '.join(sorted(unknown))}")
+    return errors
+
+
+def check_encoding(encoding) -> list:
+    """Errors of the rate control of an ad (see encoding.py)"""
+    if not isinstance(encoding, dict):
+        return ["encoding must be an object"]
+    errors = []
+    for field in ('target_mb', 'max_kbps'):
+        value = encoding.get(field, 1)
+        if not isinstance(value, (int, float)) or value <= 0:
+            errors.append(f"encoding {field} must be positive")
+    crf = encoding.get('crf', 23)
+    if not isinstance(crf, (int, float)) or not 0 <= crf <= 51:
+        errors.append("encoding crf must be in [0, 51]")
+    ladder = encoding.get('ladder', [])
+    if not isinstance(ladder, list) or not set(ladder) <= set(DELIVERY_RUNGS):
+        errors.append(f"encoding ladder must be a list of widths among "
+                      f"{', '.join(map(str, DELIVERY_RUNGS))}")
+    for field in ('webm', 'hls'):
+        if not isinstance(encoding.get(field, False), bool):
+            errors.append(f"encoding {field} must be true or false")
+    unknown = set(encoding) - {'target_mb', 'max_kbps', 'crf', 'ladder', 'webm', 'hls'}
+    if unknown:
+        errors.append(f"unknown encoding fields {', '.join(sorted(unknown))}")
+    return errors
+
+
+def transition_overlaps(scenes: list) -> list:
+    """Scenes too short for the halves of the transitions on both their ends"""
+    errors = []
+    for i, scene in enumerate(scenes):
+        half_in = scene['transition']['duration'] / 2 if 'transition' in scene else 0
+        after = scenes[i + 1] if i + 1 < len(scenes) else {}
+        half_out = after['transition']['duration'] / 2 if 'transition' in after else 0
+        if half_in + half_out > scene['duration']:
+            errors.append(f"scene {i + 1}: shorter than its transitions")
+    return errors
+
+
+def check_source(source, where: str) -> list:
+    if not isinstance(source, dict):
+        return [f"{where}: source must be an object"]
+    if 'background' in source:
+        errors = check_background(source['background'], where)
+        if errors:
+            return errors
+    elif 'color' in source:
+        if not is_color(source['color']):
+            return [f"{where}: color must be [r, g, b]"]
+    elif 'path' in source:
+        if not is_safe_relative(str(source['path']).lstrip('/')):
+            return [f"{where}: path must stay under public/"]
+        return []
+    elif 'url' in source and not str(source['url']).startswith(('http://', 'https://')):
+        return [f"{where}: url must be http(s)"]
+    if not SAFE_NAME.match(str(source.get('name', ''))):
+        return [f"{where}: name must match {SAFE_NAME.pattern}"]
+    return []
+
+
+def check_spec(spec) -> list:
+    """
+    Errors of an ad spec coming from outside (render daemon, queue files)
+    Output and source paths must stay inside public/ and TEMP_DIR.
+    """
+    if not isinstance(spec, dict):
+        return ["spec must be an object"]
+
+    errors = []
+    output = spec.get('output')
+    if not (isinstance(output, str) and output.endswith('.mp4') and is_safe_relative(output)):
+        errors.append("output must be a relative .mp4 path under public/ads")
+    if not isinstance(spec.get('name', ''), str):
+        errors.append("name must be a string")
+    if 'encoding' in spec:
+        errors += check_encoding(spec['encoding'])
+
+    scenes = spec.get('scenes')
+    if not isinstance(scenes, list) or not scenes:
+        return errors + ["scenes must be a non-empty list"]
+
+    for i, scene in enumerate(scenes, 1):
+        where = f"scene {i}"
+        if not isinstance(scene, dict) or scene.get('type') not in SCENE_TYPES:
+            errors.append(f"{where}: type must be one of {', '.join(SCENE_TYPES)}")
+            continue
+        duration = scene.get('duration')
+        if not isinstance(duration, (int, float)) or not 0 < duration <= MAX_AD_SECONDS:
+            errors.append(f"{where}: duration must be in ]0, {MAX_AD_SECONDS}]")
+        for field in SCENE_FIELDS.get(scene['type'], []):
+            if field not in scene:
+                errors.append(f"{where}: missing '{field}'")
+        if scene['type'] == 'cta' and 'background' in scene:
+            errors += check_background(scene['background'], where)
+        if 'source' in scene:
+            errors += check_source(scene['source'], where)
+            background = scene['source'].get('background') \
+                if isinstance(scene['source'], dict) else None
+            if (isinstance(background, dict) and background.get('kind') == 'animated'
+                    and scene['type'] != 'image_text'):
+                errors.append(f"{where}: animated backgrounds only go in image_text scenes")
+        for field in ('text', 'price'):
+            if field in scene:
+                errors += check_text(scene[field], where, field)
+        overlays = scene.get('overlays', [])
+        if not isinstance(overlays, list):
+            errors.append(f"{where}: overlays must be a list")
+            overlays = []
+        for overlay in overlays:
+            errors += check_overlay(overlay, where)
+        if 'transition' in scene:
+            if i == 1:
+                errors.append(f"{where}: the first scene has no transition")
+            else:
+                errors += check_transition(scene['transition'], where)
+
+    if not errors:
+        errors += transition_overlaps(scenes)
+    if not errors and spec_duration(spec) > MAX_AD_SECONDS:
+        errors.append(f"ad longer than {MAX_AD_SECONDS}s")
+    return errors
@@ -0,0 +1,205 @@
+"""
+DRIP. text primitives
+PIL text, neon and badge sprites shared by every generator.
+
+Sprites are cached in-process per arguments: the returned images are shared
+between callers and must be treated as read-only (convert with np.array()
+or .copy() before drawing on them).
+"""
+
+from functools import lru_cache
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFilter
+
+from .animation import pulse_curve, sprite_sizes
+from .config import VIDEO_WIDTH, ROSE_PRIMARY, ROSE_NEON, WHITE, URGENCY_TEXT
+from .fonts import get_font
+from .imaging import hex_to_rgb
+
+TEXT_CACHE_SIZE = 256
+
+
+@lru_cache(maxsize=TEXT_CACHE_SIZE)
+def create_text_overlay(
+    text: str,
+    width: int = VIDEO_WIDTH,
+    font_size: int = 60,
+    color: str = WHITE,
+    bg_color: str = None,
+    padding: int = 20
+) -> Image.Image:
+    """Create a text overlay image with optional background"""
+    font = get_font(font_size)
+
+    # Calculate text size
+    dummy_img = Image.new('RGBA', (1, 1))
+    draw = ImageDraw.Draw(dummy_img)
+    bbox = draw.textbbox((0, 0), text, font=font)
+    text_width = bbox[2] - bbox[0]
+    text_height = bbox[3] - bbox[1]
+
+    # Create image with padding
+    img_width = min(text_width + padding * 2, width)
+    img_height = text_height + padding * 2
+
+    if bg_color:
+        img = Image.new('RGBA', (img_width, img_height), bg_color)
+    else:
+        img = Image.new('RGBA', (img_width, img_height), (0, 0, 0, 0))
+
+    draw = ImageDraw.Draw(img)
+
+    # Center text
+    x = (img_width - text_width) // 2
+    y = (img_height - text_height) // 2
+
+    # Add shadow for visibility
+    if not bg_color:
+        draw.text((x + 2, y + 2), text, font=font, fill=(0, 0, 0, 180))
+
+    draw.text((x, y), text, font=font, fill=color)
+
+    return img
+
+
+@lru_cache(maxsize=TEXT_CACHE_SIZE)
+def create_urgency_badge(text: str = URGENCY_TEXT) -> Image.Image:
+    """Create the urgency badge banner"""
+    badge_height = 80
+    img = Image.new('RGBA', (VIDEO_WIDTH, badge_height), ROSE_PRIMARY)
+    draw = ImageDraw.Draw(img)
+
+    font = get_font(36)
+
+    bbox = draw.textbbox((0, 0), text, font=font)
+    text_width = bbox[2] - bbox[0]
+    text_height = bbox[3] - bbox[1]
+
+    x = (VIDEO_WIDTH - text_width) // 2
+    y = (badge_height - text_height) // 2
+
+    draw.text((x, y), text, font=font, fill=WHITE)
+
+    return img
+
+
+@lru_cache(maxsize=TEXT_CACHE_SIZE)
+def create_neon_text_image(text: str, font_size: int = 70,
+                           text_color: str = WHITE,
+                           glow_color: str = ROSE_NEON,
+                           glow_intensity: int = 3) -> Image.Image:
+    """
+    Creates a text image with neon glow effect
+    """
+    font = get_font(font_size)
+
+    # Calculate text size
+    dummy_img = Image.new('RGBA', (1, 1))
+    draw = ImageDraw.Draw(dummy_img)
+    bbox = draw.textbbox((0, 0), text, font=font)
+    text_width = bbox[2] - bbox[0]
+    text_height = bbox[3] - bbox[1]
+
+    # Create image with padding for glow
+    padding = 50
+    img_width = text_width + padding * 2
+    img_height = text_height + padding * 2
+
+    # Create transparent base
+    img = Image.new('RGBA', (img_width, img_height), (0, 0, 0, 0))
+
+    # Create glow layers
+    glow_rgb = hex_to_rgb(glow_color)
+
+    for i in range(glow_intensity, 0, -1):
+        glow_layer = Image.new('RGBA', (img_width, img_height), (0, 0, 0, 0))
+        glow_draw = ImageDraw.Draw(glow_layer)
+
+        # Draw glow text
+        alpha = int(255 * (0.3 / i))
+        glow_draw.text(
+            (padding, padding),
+            text,
+            font=font,
+            fill=(*glow_rgb, alpha)
+        )
+
+        # Blur the glow
+        glow_layer = glow_layer.filter(ImageFilter.GaussianBlur(radius=5 * i))
+
+        # Composite
+        img = Image.alpha_composite(img, glow_layer)
+
+    # Draw main text
+    draw = ImageDraw.Draw(img)
+    text_rgb = hex_to_rgb(text_color)
+
+    # Add subtle shadow
+    draw.text((padding + 2, padding + 2), text, font=font, fill=(0, 0, 0, 150))
+
+    # Main text
+    draw.text((padding, padding), text, font=font, fill=(*text_rgb, 255))
+
+    return img
+
+
+def pulse_sprite(neon_array: np.ndarray, size: tuple) -> np.ndarray:
+    """
+    RGBA sprite resized to size (h, w) and padded/cropped to its original
+    size, centered (one step of the pulse effect)
+    """
+    h, w = neon_array.shape[:2]
+    new_h, new_w = size
+
+    # Resize using PIL
+    pil_img = Image.fromarray(neon_array)
+    resized = pil_img.resize((new_w, new_h), Image.Resampling.LANCZOS)
+
+    # Pad/crop to original size
+    result = Image.new('RGBA', (w, h), (0, 0, 0, 0))
+    offset_x = (w - new_w) // 2
+    offset_y = (h - new_h) // 2
+    result.paste(resized, (offset_x, offset_y))
+
+    return np.array(result)
+
+
+def pulse_frame(neon_array: np.ndarray, t: float) -> np.ndarray:
+    """Pulse effect at time t (see animation.pulse_curve)"""
+    size = sprite_sizes(pulse_curve()(t), neon_array.shape)[0]
+    return pulse_sprite(neon_array, tuple(size))
+
+
+@lru_cache(maxsize=TEXT_CACHE_SIZE)
+def create_urgency_badge_image(text: str = "J-9") -> Image.Image:
+    """
+    Creates the RGBA urgency badge banner (full width, 120px high)
+    """
+    badge_height = 120
+
+    # Create base badge
+    img = Image.new('RGBA', (VIDEO_WIDTH, badge_height), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(img)
+
+    # Draw gradient-like background
+    rose_rgb = hex_to_rgb(ROSE_NEON)
+    for i in range(badge_height):
+        alpha = int(255 * (0.8 + 0.2 * (i / badge_height)))
+        draw.line([(0, i), (VIDEO_WIDTH, i)], fill=(*rose_rgb, alpha))
+
+    # Add text
+    font = get_font(50)
+
+    bbox = draw.textbbox((0, 0), text, font=font)
+    text_width = bbox[2] - bbox[0]
+    text_height = bbox[3] - bbox[1]
+
+    x = (VIDEO_WIDTH - text_width) // 2
+    y = (badge_height - text_height) // 2
+
+    # Shadow
+    draw.text((x + 2, y + 2), text, font=font, fill=(0, 0, 0, 100))
+    draw.text((x, y), text, font=font, fill=WHITE)
+
+    return img
@@ -0,0 +1,229 @@
+"""
+DRIP. streaming timeline
+An ad is a flat cut list: (start, end, scene) entries back to back. Each
+output frame maps straight to its scene and local time, the scene frame is
+copied into one reused buffer and the global layers (urgency badge,
+captions) are drawn into that buffer in the same pass - no concatenation
+composite and no extra full-canvas composite per global layer.
+
+Scenes are built when their first frame is requested and released once
+the timeline moves past them, instead of all being built before the first
+frame is encoded. Only the active scene's assets (prepared images, blur
+sets, neon sprites) are alive, so peak memory no longer grows with the
+length of the ad or its number of scenes.
+
+- Scene sources are resolved up front (downloads, missing files) so the
+  cut points are known before any pixel is produced; scenes without a
+  usable source are dropped like build_scenes() does.
+- A layer is a function draw(frame, t) drawing into the frame in place.
+  With layers or in a transition, the returned frame is the reused buffer:
+  it is read-only and only valid until the next frame is requested (copy
+  it to keep it).
+- MEMORY_BUDGET_MB (DRIP_MEMORY_BUDGET_MB) lets finished scenes stay alive
+  while the process RSS is under the budget, which makes seeking back
+  cheap; past the budget they are released, and so are the shared caches
+  of prepared images, backgrounds and text sprites. 0: no budget, only the
+  active scene is kept and the (bounded) caches are left alone.
+- Every materialization and release is recorded in a stats dict, printed
+  with the peak RSS of the process after the export (print_memory_report).
+- A scene's 'transition' blends the last frames of the previous scene with
+  its first ones over a window centred on the cut: both scenes are alive
+  during the window and a transitions.py kernel writes the blend into the
+  reused buffer, before the layers. Outside the windows a frame costs the
+  same as without transitions.
+"""
+
+import resource
+import time
+from bisect import bisect_right
+from collections import OrderedDict
+
+import numpy as np
+from moviepy import VideoClip
+
+from .config import FPS, MEMORY_BUDGET_MB, VIDEO_WIDTH, VIDEO_HEIGHT
+from .imaging import blend_rgba
+from .scenes import build_scene, prepare_source
+from .specs import source_background
+from .transitions import apply_transition, transition_buffers
+
+
+def rss_mb() -> float:
+    """Current resident set size of the process, in MB"""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            pages = int(f.read().split()[1])
+        return pages * resource.getpagesize() / 2 ** 20
+    except OSError:
+        return peak_rss_mb()
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of the process, in MB (ru_maxrss is in kB on Linux)"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def clear_shared_caches():
+    """Drops the process-wide caches of prepared images, backgrounds and sprites"""
+    from .backgrounds import _static_background
+    from .imaging import _prepare_for_tiktok
+    from .text import create_neon_text_image, create_urgency_badge_image
+
+    for cache in (_prepare_for_tiktok, _static_background,
+                  create_neon_text_image, create_urgency_badge_image):
+        cache.cache_clear()
+
+
+def available_scenes(spec: dict) -> list:
+    """Scenes of a spec whose source can be obtained, without decoding any image"""
+    scenes = []
+    for scene in spec['scenes']:
+        source = scene.get('source')
+        if source and source_background(source) is None and prepare_source(source) is None:
+            print(f"  [WARN] {scene.get('label') or scene['type']}: source unavailable, "
+                  "scene dropped")
+            continue
+        scenes.append(scene)
+    return scenes
+
+
+def cut_list(spec: dict) -> list:
+    """(start, end, scene) of the usable scenes of a spec, back to back"""
+    cuts = []
+    start = 0.0
+    for scene in available_scenes(spec):
+        cuts.append((start, start + scene['duration'], scene))
+        start += scene['duration']
+    return cuts
+
+
+def timeline_clip(cuts: list, layers: list = (), budget_mb: float = None,
+                  stats: dict = None) -> VideoClip:
+    """
+    Clip of a cut list, building each scene on demand and drawing the
+    global layers over every frame. `stats`, when given, receives the
+    timeline's memory report.
+    """
+    budget_mb = MEMORY_BUDGET_MB if budget_mb is None else budget_mb
+    starts = [start for start, _, _ in cuts]
+    scenes = [scene for _, _, scene in cuts]
+    buffer = np.empty((VIDEO_HEIGHT, VIDEO_WIDTH, 3), dtype=np.uint8)
+    # (begin, end, index, transition) of the windows around the cuts
+    windows = [(starts[i] - scene['transition']['duration'] / 2,
+                starts[i] + scene['transition']['duration'] / 2, i, scene['transition'])
+               for i, scene in enumerate(scenes) if i and 'transition' in scene]
+    scratch = {}                # kernel buffers, allocated with the first transition
+
+    stats = stats if stats is not None else {}
+    stats.update(budget_mb=budget_mb, scenes=[], releases=0, cache_clears=0,
+                 start_rss_mb=round(rss_mb(), 1))
+    live = OrderedDict()        # scene index -> clip, least recently used first
+
+    def release(index):
+        live.pop(index).close()
+        stats['releases'] += 1
+
+    def make_room(keep):
+        """Releases finished scenes (all of them, or down to the budget)"""
+        for other in [i for i in live if i not in keep]:
+            if budget_mb and rss_mb() <= budget_mb:
+                return
+            release(other)
+        if budget_mb and rss_mb() > budget_mb:
+            clear_shared_caches()
+            stats['cache_clears'] += 1
+
+    def materialize(index, keep):
+        make_room(keep)
+        started = time.perf_counter()
+        clip = build_scene(scenes[index])
+        if clip is None:
+            raise RuntimeError(f"scene {index + 1}: source no longer available")
+        live[index] = clip
+        stats['scenes'].append({
+            'scene': index + 1,
+            'type': scenes[index]['type'],
+            'build_ms': round((time.perf_counter() - started) * 1000),
+            'rss_mb': round(rss_mb(), 1),
+        })
+        return clip
+
+    def scene_frame(index, t, keep):
+        clip = live.get(index)
+        if clip is None:
+            clip = materialize(index, keep)
+        else:
+            live.move_to_end(index)
+        # Held on its last frame past its end: a composite is black at t = duration
+        return clip.get_frame(min(max(t - starts[index], 0), clip.duration - 1 / FPS))
+
+    def window_at(t):
+        for window in windows:
+            if window[0] <= t < window[1]:
+                return window
+        return None
+
+    def frame_function(t):
+        window = window_at(t)
+        if window is not None:
+            begin, end, index, transition = window
+            keep = {index - 1, index}
+            outgoing = scene_frame(index - 1, t, keep)
+            incoming = scene_frame(index, t, keep)
+            if not scratch:
+                scratch.update(transition_buffers())
+            buffer.setflags(write=True)
+            apply_transition(buffer, outgoing, incoming, (t - begin) / (end - begin),
+                             transition, scratch)
+        else:
+            index = min(max(bisect_right(starts, t) - 1, 0), len(scenes) - 1)
+            frame = scene_frame(index, t, {index})
+            if not layers:
+                return frame
+            buffer.setflags(write=True)
+            buffer[...] = frame
+        for draw in layers:
+            draw(buffer, t)
+        buffer.setflags(write=False)
+        return buffer
+
+    # Set after construction: VideoClip(frame_function) renders frame 0 to
+    # learn the size, which would build the first scene of a clip that may
+    # only be read elsewhere (a segment, a preview)
+    clip = VideoClip(duration=cuts[-1][1])
+    clip.frame_function = frame_function
+    clip.size = (VIDEO_WIDTH, VIDEO_HEIGHT)
+    return clip
+
+
+def paste_layer(sprite: np.ndarray, x: int, y: int, start: float = 0, end: float = None):
+    """
+    Layer drawing an RGB (opaque) or RGBA (alpha-blended) sprite at (x, y)
+    between start and end
+    """
+    h, w = sprite.shape[:2]
+    x0, y0 = max(x, 0), max(y, 0)
+    x1, y1 = min(x + w, VIDEO_WIDTH), min(y + h, VIDEO_HEIGHT)
+
+    def draw(frame, t):
+        if t < start or (end is not None and t >= end) or x0 >= x1 or y0 >= y1:
+            return
+        if sprite.shape[2] == 4:
+            blend_rgba(frame, sprite, x, y)
+        else:
+            frame[y0:y1, x0:x1] = sprite[y0 - y:y1 - y, x0 - x:x1 - x]
+
+    return draw
+
+
+def print_memory_report(stats: dict):
+    """Per-scene build times and RSS, then the peak RSS of the process"""
+    if not stats.get('scenes'):
+        return
+    budget = f"{stats['budget_mb']:.0f} MB budget" if stats['budget_mb'] else "no budget"
+    print(f"  Memory ({budget}): start {stats['start_rss_mb']} MB, "
+          f"peak {peak_rss_mb():.1f} MB, "
+          f"{stats['releases']} scene releases, {stats['cache_clears']} cache clears")
+    for scene in stats['scenes']:
+        print(f"    scene {scene['scene']:>2} {scene['type']:<11} built in "
+              f"{scene['build_ms']:>5} ms, RSS {scene['rss_mb']} MB")
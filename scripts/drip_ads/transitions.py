@@ -0,0 +1,178 @@
+"""
+DRIP. transitions
+Scene transitions as numpy kernels: kernel(out, a, b, p, buffers, **params)
+writes the blend of the outgoing frame `a` and the incoming frame `b` at
+progress p (0..1) into `out`, in place.
+
+- crossfade: integer mix a * (256 - w) + b * w, w = 256 p
+- dip: a fades to `color`, then `color` fades to b ("lights off" with black)
+- swipe: b pushes a out along `direction` (left, right, up, down)
+- zoom_through: zoom into a up to ZOOM_THROUGH, then out of b
+- whip: a swipe under a motion blur along the swipe, strongest mid-way
+
+Kernels never allocate a frame: intermediates go to `buffers`
+(transition_buffers(), allocated once per timeline), pixels are moved with
+slices, np.take and ufuncs with out=. Frames may be read-only or broadcast
+views (solid backgrounds). The timeline (timeline.py) runs a transition
+over the `duration` seconds centred on the cut into the scene that
+declares it, so cut points and ad durations do not move.
+"""
+
+import numpy as np
+
+from .animation import ease_in_out_cubic
+from .config import VIDEO_WIDTH, VIDEO_HEIGHT
+
+ZOOM_THROUGH = 1.6          # zoom reached at the cut
+WHIP_BLUR = 90              # motion blur radius mid-whip, in pixels
+BLUR_STEP = 4               # pixels per cell of the whip blur
+TRANSITION_SECONDS = 0.4
+
+
+def transition_buffers(shape: tuple = (VIDEO_HEIGHT, VIDEO_WIDTH, 3)) -> dict:
+    """Scratch buffers of the kernels (about 30 MB for a full frame)"""
+    height, width = shape[:2]
+    return {
+        'wide': np.empty(shape, dtype=np.uint16),
+        'wide_b': np.empty(shape, dtype=np.uint16),
+        'frame': np.empty(shape, dtype=np.uint8),
+    }
+
+
+def mix(out, a, b, weight: int, buffers: dict):
+    """out = (a * (256 - weight) + b * weight) / 256, rounded"""
+    wide, wide_b = buffers['wide'], buffers['wide_b']
+    np.multiply(a, 256 - weight, out=wide, dtype=np.uint16)
+    np.multiply(b, weight, out=wide_b, dtype=np.uint16)
+    np.add(wide, wide_b, out=wide)
+    np.add(wide, 128, out=wide)
+    np.right_shift(wide, 8, out=wide)
+    np.copyto(out, wide, casting='unsafe')
+
+
+def fade(out, a, color, weight: int, buffers: dict):
+    """mix() of a frame with a constant color: one multiply and one add"""
+    wide = buffers['wide']
+    np.multiply(a, 256 - weight, out=wide, dtype=np.uint16)
+    # Added as one tiled row: broadcasting a 3-value pixel is 10x slower
+    row = np.tile(np.array(color, dtype=np.uint16) * weight + 128, out.shape[1])
+    rows = wide.reshape(len(wide), -1)
+    np.add(rows, row, out=rows)
+    np.right_shift(wide, 8, out=wide)
+    np.copyto(out, wide, casting='unsafe')
+
+
+def crossfade(out, a, b, p: float, buffers: dict):
+    mix(out, a, b, int(round(p * 256)), buffers)
+
+
+def dip(out, a, b, p: float, buffers: dict, color: list = (0, 0, 0)):
+    if p < 0.5:
+        fade(out, a, color, int(round(p * 2 * 256)), buffers)
+    else:
+        fade(out, b, color, 256 - int(round((p - 0.5) * 2 * 256)), buffers)
+
+
+def along(frame, direction: str):
+    """View of a frame whose first axis is the axis of the motion"""
+    return frame.swapaxes(0, 1) if direction in ('left', 'right') else frame
+
+
+def swipe(out, a, b, p: float, buffers: dict, direction: str = 'left'):
+    o, a, b = along(out, direction), along(a, direction), along(b, direction)
+    n = o.shape[0]
+    k = int(round(float(ease_in_out_cubic(p)) * n))
+    if direction in ('left', 'up'):
+        o[:n - k] = a[k:]
+        o[n - k:] = b[:k]
+    else:
+        o[k:] = a[:n - k]
+        o[:k] = b[n - k:]
+
+
+def zoom_through(out, a, b, p: float, buffers: dict, zoom: float = ZOOM_THROUGH):
+    """Nearest-neighbour centre zoom: into a until the cut, out of b after it"""
+    if p < 0.5:
+        source, amount = a, float(ease_in_out_cubic(p * 2))
+    else:
+        source, amount = b, 1.0 - float(ease_in_out_cubic((p - 0.5) * 2))
+    scale = 1.0 + (zoom - 1.0) * amount
+    height, width = out.shape[:2]
+    rows = ((np.arange(height) + 0.5 - height / 2) / scale + height / 2).astype(np.intp)
+    cols = ((np.arange(width) + 0.5 - width / 2) / scale + width / 2).astype(np.intp)
+    np.take(source, rows, axis=0, out=buffers['frame'])
+    np.take(buffers['frame'], cols, axis=1, out=out)
+
+
+def box_blur(out, radius: int, direction: str, buffers: dict, step: int = BLUR_STEP):
+    """
+    In-place box blur of about `radius` pixels along the motion axis,
+    computed on cells of `step` pixels (a motion blur hides the coarser
+    grid). Running sums are uint16: they wrap, but a window of at most
+    65535 / 255 pixels is still exact, so the radius is capped to that.
+    """
+    horizontal = direction in ('left', 'right')
+    height, width = out.shape[:2]
+    n = width if horizontal else height
+    step = step if n % step == 0 else 1
+    cells = n // step
+    radius = min(int(radius) // step, cells - 1, (65535 // (255 * step) - 1) // 2)
+    if radius < 1:
+        return
+    wide, sums = buffers['wide'], buffers['wide_b']
+    np.copyto(wide, out)
+    # Cells are summed in the frame's own layout (contiguous reads), then
+    # the running sums run on views with the cells as first axis
+    if horizontal:
+        pixels = wide.reshape(height, cells, step, 3)
+        sums, totals = sums[:, :cells], wide[:, :cells]
+        cell = (slice(None), slice(None))
+    else:
+        pixels = wide.reshape(cells, step, width, 3)
+        sums, totals = sums[:cells], wide[:cells]
+        cell = (slice(None),)
+    np.copyto(sums, pixels[cell + (0,)])
+    for i in range(1, step):
+        np.add(sums, pixels[cell + (i,)], out=sums)
+    if horizontal:
+        sums, totals = sums.swapaxes(0, 1), totals.swapaxes(0, 1)
+    np.cumsum(sums, axis=0, out=sums)
+    # sum of cells [max(i - r, 0), min(i + r, cells - 1)] = sums[hi] - sums[lo - 1]
+    totals[:cells - radius] = sums[radius:]
+    totals[cells - radius:] = sums[cells - 1]
+    totals[radius + 1:] -= sums[:cells - radius - 1]
+    # Full windows share one divisor; only the cells near the ends do not
+    np.floor_divide(totals[radius:cells - radius], (2 * radius + 1) * step,
+                    out=totals[radius:cells - radius])
+    for i in [*range(radius), *range(cells - radius, cells)]:
+        totals[i] //= (min(i + radius + 1, cells) - max(i - radius, 0)) * step
+    if horizontal:
+        blocks, totals = out.reshape(height, cells, step, 3), totals.swapaxes(0, 1)
+    else:
+        blocks = out.reshape(cells, step, width, 3)
+    for i in range(step):
+        np.copyto(blocks[cell + (i,)], totals, casting='unsafe')
+
+
+def whip(out, a, b, p: float, buffers: dict, direction: str = 'left', blur: int = WHIP_BLUR):
+    swipe(out, a, b, p, buffers, direction)
+    box_blur(out, round(blur * np.sin(np.pi * p)), direction, buffers)
+
+
+TRANSITIONS = {
+    'crossfade': crossfade,
+    'dip': dip,
+    'swipe': swipe,
+    'zoom_through': zoom_through,
+    'whip': whip,
+}
+
+
+def apply_transition(out, a, b, p: float, transition: dict, buffers: dict):
+    """
+    Runs the kernel of a scene's transition spec at progress p (frames that
+    are not uint8, like moviepy's ColorClip ones, are converted first)
+    """
+    a, b = np.asarray(a, dtype=np.uint8), np.asarray(b, dtype=np.uint8)
+    params = {k: v for k, v in transition.items() if k not in ('kind', 'duration')}
+    TRANSITIONS[transition['kind']](out, a, b, min(max(p, 0.0), 1.0), buffers, **params)
@@ -0,0 +1,129 @@
+"""
+DRIP. data validation
+Checks tiktok-fiches-production.json and products.json before a render.
+Only the standard library is used, so validation starts instantly.
+"""
+
+import json
+import re
+from urllib.parse import urlparse
+
+from .config import DATA_FILE, CATALOG_FILE, PUBLIC_DIR
+
+CAMPAIGN_KEYS = ['campagne', 'countdown', 'date_limite_livraison', 'urgence_badge']
+FICHE_KEYS = ['produit', 'overlays_texte', 'script_voix_off', 'hashtags']
+PRODUCT_KEYS = ['id', 'name', 'price', 'category']
+
+# "0-3s", "25-30s", "5-15 secondes"
+TIMING_RE = re.compile(r'^\s*(\d+(?:\.\d+)?)\s*-\s*(\d+(?:\.\d+)?)\s*(s|secondes)?\s*$')
+
+
+def parse_timing(timing: str):
+    """Parses a fiche timing like "5-8s" into (start, end) seconds, or None"""
+    match = TIMING_RE.match(timing or '')
+    if not match:
+        return None
+    return float(match.group(1)), float(match.group(2))
+
+
+def is_url(value: str) -> bool:
+    parsed = urlparse(value)
+    return parsed.scheme in ('http', 'https') and bool(parsed.netloc)
+
+
+def load_json(path, errors: list):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        errors.append(f"{path.name}: {e}")
+        return None
+
+
+def validate_fiches(data: dict, errors: list, warnings: list):
+    """Campaign keys, image URLs, overlay timings of every fiche"""
+    for key in CAMPAIGN_KEYS:
+        if not data.get(key):
+            errors.append(f"fiches: missing '{key}'")
+
+    fiches = {k: v for k, v in data.items() if k.startswith('fiche_')}
+    if not fiches:
+        errors.append("fiches: no fiche_* entries")
+
+    for name, fiche in fiches.items():
+        for key in FICHE_KEYS:
+            if key not in fiche:
+                errors.append(f"{name}: missing '{key}'")
+
+        for role, url in fiche.get('images_cj', {}).items():
+            if not is_url(url):
+                errors.append(f"{name}.images_cj.{role}: invalid URL '{url}'")
+
+        for overlay_name, overlay in fiche.get('overlays_texte', {}).items():
+            if not overlay.get('texte'):
+                errors.append(f"{name}.overlays_texte.{overlay_name}: empty texte")
+            window = parse_timing(overlay.get('timing'))
+            if window is None:
+                errors.append(f"{name}.overlays_texte.{overlay_name}: "
+                              f"bad timing '{overlay.get('timing')}'")
+            elif window[1] <= window[0]:
+                errors.append(f"{name}.overlays_texte.{overlay_name}: "
+                              f"timing ends before it starts")
+
+        for line_name, line in fiche.get('script_voix_off', {}).items():
+            if not isinstance(line, str) or not line.strip():
+                warnings.append(f"{name}.script_voix_off.{line_name}: empty line")
+
+    known = set(fiches)
+    for day, entry in data.get('calendrier_publication', {}).items():
+        video = entry.get('video', '')
+        if video.startswith('fiche_') and video not in known:
+            errors.append(f"calendrier_publication.{day}: unknown video '{video}'")
+
+
+def validate_products(products: list, errors: list, warnings: list):
+    """Required fields, prices and image references of the catalog"""
+    seen = set()
+    for index, product in enumerate(products):
+        label = product.get('id', f"#{index}")
+        for key in PRODUCT_KEYS:
+            if key not in product:
+                errors.append(f"product {label}: missing '{key}'")
+
+        if label in seen:
+            errors.append(f"product {label}: duplicate id")
+        seen.add(label)
+
+        price = product.get('price')
+        if not isinstance(price, (int, float)) or price <= 0:
+            errors.append(f"product {label}: invalid price {price!r}")
+
+        images = product.get('images') or ([product['image']] if product.get('image') else [])
+        if not images:
+            errors.append(f"product {label}: no images")
+        for ref in images:
+            if ref.startswith('/'):
+                if not (PUBLIC_DIR / ref.lstrip('/')).exists():
+                    errors.append(f"product {label}: missing local image {ref}")
+            elif not is_url(ref):
+                errors.append(f"product {label}: invalid image reference '{ref}'")
+
+        if product.get('imageAuditStatus') not in (None, 'verified'):
+            warnings.append(f"product {label}: image audit status "
+                            f"'{product['imageAuditStatus']}'")
+
+
+def validate_all():
+    """Returns (errors, warnings) for both data files"""
+    errors = []
+    warnings = []
+
+    data = load_json(DATA_FILE, errors)
+    if data is not None:
+        validate_fiches(data, errors, warnings)
+
+    products = load_json(CATALOG_FILE, errors)
+    if products is not None:
+        validate_products(products, errors, warnings)
+
+    return errors, warnings
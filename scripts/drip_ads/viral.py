@@ -0,0 +1,137 @@
+"""
+DRIP. viral banger
+"Banger" video with modern effects for maximum engagement: flash
+transitions, zoom punch, neon text, shake, blur-in and rapid cuts.
+The timeline is described by specs.viral_spec().
+"""
+
+from pathlib import Path
+
+from .config import OUTPUT_DIR, TEMP_DIR, VIDEO_WIDTH, VIDEO_HEIGHT, FPS
+from .imaging import ensure_dirs
+from .scenes import build_ad, export_ad
+from .scheduler import planned_peak_mb, render_slot
+from .specs import viral_spec, spec_frames, spec_sources, source_path
+from .timeline import print_memory_report
+
+
+def generate_viral_banger(music: Path = None, music_start: float = 0.0,
+                          encoding: dict = None):
+    """
+    Generates the viral "Banger" video
+    With `music`, the cuts and flash transitions land on its beats and the
+    track is muxed in (see audio.py). `encoding` sets the rate control of
+    the export (encoding.py).
+    Structure:
+    - Hook (0-3s): Texte choc + blur-in
+    - Flash + Reveal (3-7s): Zoom dynamique + prix
+    - Quick cuts (7-12s): Montage rapide
+    - Urgence (12-16s): J-9 pulsant + shake
+    - CTA (16-20s): DRIP. + lien en bio
+    """
+    print("=" * 60)
+    print("DRIP. VIRAL BANGER GENERATOR")
+    print("Saint-Valentin 2026 - J-9")
+    print("=" * 60)
+
+    ensure_dirs()
+
+    spec = viral_spec("J-9")
+    if encoding:
+        spec['encoding'] = encoding
+
+    # Check images exist
+    missing = [source_path(s) for s in spec_sources(spec) if not source_path(s).exists()]
+    for img in missing:
+        print(f"ERROR: Missing image {img}")
+    if missing:
+        raise FileNotFoundError(
+            f"{len(missing)} source images missing in {TEMP_DIR} "
+            "(run generate-tiktok-ads.py first to download them)"
+        )
+
+    track = None
+    if music:
+        from .audio import beat_align
+        spec, track = beat_align(spec, music, music_start)
+
+    # Scenes are built as the export reaches them (timeline.py), under the
+    # persistent urgency badge, inside a slot of the machine-wide scheduler
+    memory = {}
+    with render_slot(planned_peak_mb(spec), spec_frames(spec)) as slot:
+        final_with_badge = build_ad(spec, memory)
+
+        # Export
+        output_path = OUTPUT_DIR / spec['output']
+        print(f"\nExporting to: {output_path}")
+        print("This may take a minute...")
+
+        export_ad(final_with_badge, output_path, slot['threads'],
+                  encoding=spec.get('encoding'), music=track)
+    print_memory_report(memory)
+
+    # Calculate duration
+    total_duration = final_with_badge.duration
+
+    print("\n" + "=" * 60)
+    print("VIRAL BANGER GENERATED!")
+    print("=" * 60)
+    print(f"\nOutput: {output_path}")
+    print(f"Duration: {total_duration:.1f} seconds")
+    print(f"Resolution: {VIDEO_WIDTH}x{VIDEO_HEIGHT}")
+    print(f"FPS: {FPS}")
+
+    return {
+        "output_path": str(output_path),
+        "music": track['path'].name if track else None,
+        "duration": total_duration,
+        "resolution": f"{VIDEO_WIDTH}x{VIDEO_HEIGHT}",
+        "fps": FPS,
+        "effects": [
+            "flash_transition (0.1s white screen)",
+            "zoom_punch (1.0 -> 1.2 in 0.3s)",
+            "neon_text (#FF4D6D glow)",
+            "shake_effect (urgency scene)",
+            "blur_in (hook reveal)",
+            "rapid_cuts (1.5s scenes)"
+        ]
+    }
+
+
+def print_generation_report(result: dict):
+    """Prints the summary of a generate_viral_banger() run"""
+    print("\n" + "=" * 60)
+    print("GENERATION REPORT")
+    print("=" * 60)
+    print(f"""
+DRIP. Viral Banger - Saint-Valentin J-9
+========================================
+
+VIDEO OUTPUT:
+- Path: {result['output_path']}
+- Duration: {result['duration']:.1f}s
+- Resolution: {result['resolution']}
+- FPS: {result['fps']}
+
+EFFECTS IMPLEMENTED:
+""")
+    for effect in result['effects']:
+        print(f"  [OK] {effect}")
+
+    print("""
+VIDEO STRUCTURE:
+  0-3s   : Hook (blur-in + texte choc neon)
+  3-3.1s : Flash transition
+  3.1-7s : Product reveal (zoom punch + prix or)
+  7-12s  : Quick cuts montage (3 scenes rapides)
+  12-16s : Urgence (J-9 pulsant + shake)
+  16-20s : CTA (DRIP. logo + lien en bio)
+
+NEXT STEPS:""")
+    if result.get('music'):
+        print(f"  1. Music already muxed in ({result['music']}, cuts on the beat)")
+    else:
+        print("  1. Add trending music in CapCut/TikTok")
+    print("""  2. Upload following the publication calendar
+  3. Use hashtags: #SaintValentin2026 #TikTokMadeMeBuyIt
+""")
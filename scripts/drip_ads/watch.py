@@ -0,0 +1,214 @@
+"""
+DRIP. watch mode
+Live low-res preview of the ads while their spec is edited: the fiches
+(tiktok-fiches-production.json) and the source images are polled, and
+every change re-renders only the scenes it touched into PREVIEW_DIR.
+
+    python3 scripts/drip-ads.py watch [--ads projecteur ...]
+
+- An ad's preview is one short MP4 segment per scene, stream-copied into
+  PREVIEW_DIR/<name>.mp4 (cluster.concat_segments) after every change.
+- A segment is keyed by a hash of everything that shows in its frames: the
+  scene, its frame range, the neighbours its transitions blend with, the
+  badge and captions, and the mtimes of the source images involved. Only
+  segments whose key is not on disk are rendered; the timeline builds
+  their scenes alone (timeline.py), the other scenes are never built.
+- Preview quality: PREVIEW_FPS frames per second, reduced PREVIEW_REDUCE
+  times (360x640), x264 ultrafast at PREVIEW_CRF. Frames still come from
+  the full-size timeline, so the preview shows exactly what gets exported.
+
+Changes to the Python code itself are not watched: restart the command.
+"""
+
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+
+from .config import DATA_FILE, PREVIEW_DIR, PROJECT_ROOT, VIDEO_WIDTH, VIDEO_HEIGHT
+from .specs import campaign_specs, check_spec, source_path, spec_sources, viral_spec
+
+PREVIEW_FPS = 10
+PREVIEW_REDUCE = 3          # 1080x1920 -> 360x640
+PREVIEW_CRF = 30
+POLL_SECONDS = 0.5
+SETTLE_SECONDS = 0.3        # lets an editor finish writing before reloading
+
+
+def watched_specs(names: list = None) -> list:
+    """The campaign ads and the viral banger, optionally filtered by name"""
+    with open(DATA_FILE, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    specs = campaign_specs(data) + [viral_spec("J-9")]
+    return [spec for spec in specs if not names or spec['name'] in names]
+
+
+def watched_files(specs: list) -> list:
+    paths = [DATA_FILE]
+    for spec in specs:
+        paths += [source_path(source) for source in spec_sources(spec)]
+    return paths
+
+
+def mtime_ns(path) -> int:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def snapshot(paths: list) -> dict:
+    return {str(path): mtime_ns(path) for path in paths}
+
+
+# =============================================================================
+# SEGMENTS
+# =============================================================================
+
+def segment_keys(spec: dict, cuts: list) -> list:
+    """(key, first frame, end frame) of the preview segment of every cut"""
+    layers = {'badge': spec.get('badge'), 'captions': spec.get('captions'),
+              'script': spec.get('script') if spec.get('captions') else None,
+              'duration': cuts[-1][1]}
+    segments = []
+    for i, (start, end, scene) in enumerate(cuts):
+        # A transition blends the frames on both sides of its cut
+        involved = [scene]
+        if i and 'transition' in scene:
+            involved.append(cuts[i - 1][2])
+        if i + 1 < len(cuts) and 'transition' in cuts[i + 1][2]:
+            involved.append(cuts[i + 1][2])
+        first, last = round(start * PREVIEW_FPS), round(end * PREVIEW_FPS)
+        payload = {
+            'scenes': involved,
+            'frames': [first, last, PREVIEW_FPS, PREVIEW_REDUCE, PREVIEW_CRF],
+            'layers': layers,
+            'sources': [mtime_ns(source_path(s['source'])) for s in involved
+                        if s.get('source') and source_path(s['source'])],
+        }
+        key = hashlib.sha1(json.dumps(payload, sort_keys=True, default=str)
+                           .encode('utf-8')).hexdigest()[:16]
+        segments.append((key, first, last))
+    return segments
+
+
+def preview_frame(frame: np.ndarray) -> np.ndarray:
+    from PIL import Image
+    return np.asarray(Image.fromarray(frame).reduce(PREVIEW_REDUCE))
+
+
+def write_segment(final, first: int, last: int, path):
+    """Encodes frames [first, last) of an ad clip at preview quality"""
+    from moviepy import VideoClip
+
+    start = first / PREVIEW_FPS
+    clip = VideoClip(duration=(last - first) / PREVIEW_FPS)
+    clip.frame_function = lambda t: preview_frame(final.get_frame(start + t))
+    clip.size = (VIDEO_WIDTH // PREVIEW_REDUCE, VIDEO_HEIGHT // PREVIEW_REDUCE)
+    part_path = path.with_name(f".{path.stem}.{os.getpid()}.part.mp4")
+    try:
+        clip.write_videofile(str(part_path), fps=PREVIEW_FPS, codec='libx264', audio=False,
+                             preset='ultrafast', ffmpeg_params=['-crf', str(PREVIEW_CRF)],
+                             logger=None)
+        os.replace(part_path, path)
+    finally:
+        part_path.unlink(missing_ok=True)
+
+
+def refresh(spec: dict, previous: list = None) -> dict:
+    """
+    Brings the preview of an ad up to date with its spec
+    Returns {'keys', 'scenes', 'rendered' (scene numbers), 'changed',
+    'output'}; nothing is rendered nor written when the keys are still
+    `previous`.
+    """
+    from .cluster import concat_segments
+    from .scenes import build_ad
+    from .timeline import cut_list
+
+    output_path = PREVIEW_DIR / f"{spec['name']}.mp4"
+    cuts = cut_list(spec)
+    if not cuts:
+        raise RuntimeError("no usable scenes")
+    # (scene number, key, first, end); scenes shorter than a preview frame have none
+    segments = [(n, *s) for n, s in enumerate(segment_keys(spec, cuts), 1) if s[2] > s[1]]
+    keys = [key for _, key, _, _ in segments]
+    result = {'keys': keys, 'scenes': len(cuts), 'rendered': [], 'changed': False,
+              'output': output_path}
+    if keys == previous and output_path.exists():
+        return result
+
+    segment_dir = PREVIEW_DIR / spec['name']
+    segment_dir.mkdir(parents=True, exist_ok=True)
+    stale = [s for s in segments if not (segment_dir / f"{s[1]}.mp4").exists()]
+    if stale:
+        final = build_ad(spec, cuts=cuts)
+        try:
+            for n, key, first, last in stale:
+                write_segment(final, first, last, segment_dir / f"{key}.mp4")
+                result['rendered'].append(n)
+        finally:
+            final.close()
+
+    concat_segments([segment_dir / f"{key}.mp4" for key in keys], output_path)
+    result['changed'] = True
+    for old in segment_dir.glob('*.mp4'):
+        if old.stem not in keys:
+            old.unlink()
+    return result
+
+
+# =============================================================================
+# LOOP
+# =============================================================================
+
+def refresh_all(specs: list, previous: dict):
+    for spec in specs:
+        errors = check_spec(spec)
+        if errors:
+            print(f"  [ERROR] {spec['name']}: {'; '.join(errors)}")
+            continue
+        started = time.time()
+        try:
+            result = refresh(spec, previous.get(spec['name']))
+        except Exception as e:
+            print(f"  [ERROR] {spec['name']}: {e}")
+            continue
+        previous[spec['name']] = result['keys']
+        if result['changed']:
+            rendered = ', '.join(map(str, result['rendered'])) or "none"
+            print(f"  [PREVIEW] {spec['name']}: scenes {rendered} of {result['scenes']} "
+                  f"re-rendered in {time.time() - started:.1f}s -> "
+                  f"{result['output'].relative_to(PROJECT_ROOT)}")
+
+
+def watch(names: list = None, interval: float = POLL_SECONDS, once: bool = False):
+    """Refreshes the previews now, then after every change (until Ctrl-C)"""
+    PREVIEW_DIR.mkdir(parents=True, exist_ok=True)
+    previous = {}
+    paths = [DATA_FILE]
+    seen = None
+    try:
+        while True:
+            current = snapshot(paths)
+            if current != seen:
+                if seen is not None:
+                    time.sleep(SETTLE_SECONDS)
+                    print(f"\nChange detected ({time.strftime('%H:%M:%S')})")
+                try:
+                    specs = watched_specs(names)
+                except (OSError, ValueError) as e:
+                    print(f"  [WARN] cannot read {DATA_FILE.name}: {e}")
+                    specs = []
+                refresh_all(specs, previous)
+                # Sources downloaded by the refresh are part of the snapshot
+                paths = watched_files(specs) if specs else paths
+                seen = snapshot(paths)
+                if once:
+                    return
+                print(f"Watching {len(paths)} files (Ctrl-C to stop)")
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        print("\nStopped")
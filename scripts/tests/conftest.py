@@ -0,0 +1,10 @@
+"""
+drip_ads lives in scripts/: importable whatever the working directory
+
+    python3 -m pytest scripts/tests
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
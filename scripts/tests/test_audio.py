@@ -0,0 +1,56 @@
+import wave
+
+import numpy as np
+import pytest
+
+from drip_ads.audio import AUDIO_RATE, detect_beats, snap_spec_to_beats
+from drip_ads.config import FPS
+
+
+def click_track(path, bpm: float, seconds: float, offset: float = 0.0):
+    """16-bit mono WAV of short noise bursts on every beat"""
+    rng = np.random.default_rng(0)
+    samples = np.zeros(int(seconds * AUDIO_RATE))
+    length = int(0.02 * AUDIO_RATE)
+    click = rng.uniform(-0.8, 0.8, length) * np.linspace(1, 0, length)
+    for beat in np.arange(offset, seconds - 0.05, 60 / bpm):
+        start = int(beat * AUDIO_RATE)
+        samples[start:start + len(click)] += click
+    with wave.open(str(path), 'wb') as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(AUDIO_RATE)
+        f.writeframes((samples * 32767).astype('<i2').tobytes())
+    return path
+
+
+@pytest.mark.parametrize('bpm', [100, 128])
+def test_detect_beats_finds_tempo_and_phase(tmp_path, bpm):
+    path = click_track(tmp_path / 'clicks.wav', bpm, 12, offset=0.25)
+    analysis = detect_beats(path)
+    assert analysis['tempo'] == pytest.approx(bpm, rel=0.02)
+    beats = analysis['beats']
+    expected = np.arange(0.25, 12 - 0.05, 60 / bpm)
+    # Every click is found, within 2 onset hops (about 46 ms)
+    nearest = np.abs(expected[:, None] - beats[None, :]).min(axis=1)
+    assert (nearest < 0.05).mean() > 0.9
+
+
+def test_snap_moves_cuts_onto_beats_and_keeps_flashes():
+    spec = {'scenes': [
+        {'type': 'image_text', 'duration': 2.9,
+         'overlays': [{'text': 'x', 'start': 0, 'end': 2.9}]},
+        {'type': 'flash', 'duration': 0.1},
+        {'type': 'image_text', 'duration': 3.0},
+    ]}
+    beats = np.arange(0, 10, 0.5)
+    snapped = snap_spec_to_beats(spec, beats)
+    durations = [scene['duration'] for scene in snapped['scenes']]
+    assert durations[0] == pytest.approx(3.0)
+    assert durations[1] == pytest.approx(0.1)
+    cuts = np.cumsum(durations)
+    assert cuts[-1] * 2 == pytest.approx(round(cuts[-1] * 2))
+    # On the frame grid, overlays stretched with their scene
+    assert all(abs(d * FPS - round(d * FPS)) < 1e-6 for d in durations)
+    assert snapped['scenes'][0]['overlays'][0]['end'] == pytest.approx(3.0)
+    assert spec['scenes'][0]['duration'] == 2.9
@@ -0,0 +1,34 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from drip_ads.cli import build_parser
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent
+HEAVY_MODULES = ['moviepy', 'numpy', 'PIL', 'requests', 'imageio_ffmpeg']
+
+
+def test_startup_does_not_import_the_render_dependencies():
+    probe = ("import sys, drip_ads.cli; "
+             f"print(' '.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))")
+    result = subprocess.run([sys.executable, '-c', probe], cwd=SCRIPTS_DIR,
+                            capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == ''
+
+
+@pytest.mark.parametrize('argv', [
+    ['plan', '--json'],
+    ['validate'],
+    ['render', 'viral'],
+    ['bench', 'text'],
+])
+def test_every_command_has_a_handler(argv):
+    args = build_parser().parse_args(argv)
+    assert callable(args.func)
+
+
+def test_unknown_commands_are_rejected():
+    with pytest.raises(SystemExit):
+        build_parser().parse_args(['publish'])
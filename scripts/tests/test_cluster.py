@@ -0,0 +1,49 @@
+import subprocess
+import sys
+from pathlib import Path
+
+from drip_ads import cluster
+from drip_ads.config import FPS
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent
+SPEC = {'name': 'cluster_test', 'title': 'Cluster test', 'output': 'cluster_test.mp4',
+        'scenes': [{'type': 'flash', 'duration': 0.5} for _ in range(3)]}
+WORKER = """
+import sys
+from pathlib import Path
+from drip_ads import scheduler
+from drip_ads.cluster import work
+scheduler.SCHEDULER_DIR = Path(sys.argv[2])
+work(sys.argv[1], heartbeat_seconds=0.5, idle_exit=60, threads=1)
+"""
+
+
+def test_segments_follow_the_scenes():
+    assert cluster.segment_windows(SPEC) == [(0.0, 1.5)]
+    assert cluster.segment_windows(SPEC, 0.5) == [(0.0, 0.5), (0.5, 1.0), (1.0, 1.5)]
+
+
+def test_workers_render_segments_the_coordinator_joins(tmp_path, monkeypatch):
+    from imageio_ffmpeg import count_frames_and_secs
+
+    shared = tmp_path / 'shared'
+    workers = [subprocess.Popen([sys.executable, '-c', WORKER, str(shared), str(tmp_path / 'slots')],
+                                cwd=SCRIPTS_DIR, stdout=subprocess.DEVNULL)
+               for _ in range(2)]
+    monkeypatch.setattr(cluster, 'OUTPUT_DIR', tmp_path / 'ads')
+    monkeypatch.setattr(cluster, 'PROJECT_ROOT', tmp_path)
+    monkeypatch.setattr(cluster, 'RENDER_TMP_DIR', tmp_path / 'render')
+    try:
+        results = cluster.coordinate([SPEC], shared, segment_seconds=0.5, dead_after=30)
+        # STOP makes the idle workers exit
+        for worker in workers:
+            assert worker.wait(timeout=60) == 0
+    finally:
+        for worker in workers:
+            worker.kill()
+
+    assert results == {'cluster_test.mp4': 'done'}
+    assert len(list((shared / 'done').glob('*.json'))) == 3
+    frames, _ = count_frames_and_secs(str(tmp_path / 'ads' / 'cluster_test.mp4'))
+    assert frames == round(1.5 * FPS)
+    assert not list((shared / 'running').iterdir())
@@ -0,0 +1,50 @@
+import math
+
+import numpy as np
+import pytest
+
+from drip_ads.golden import box_means, luma, psnr, ssim
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(0)
+    return rng.integers(0, 256, (64, 48, 3), dtype=np.uint8)
+
+
+def test_psnr_of_identical_frames_is_infinite(frame):
+    assert psnr(frame, frame) == math.inf
+
+
+def test_psnr_of_a_constant_error():
+    a = np.full((8, 8, 3), 100, dtype=np.uint8)
+    # mse = 25: 10 log10(255^2 / 25)
+    assert psnr(a, a + 5) == pytest.approx(10 * math.log10(255 ** 2 / 25))
+
+
+def test_luma_is_bt601_at_half_resolution():
+    frame = np.zeros((4, 6, 3), dtype=np.uint8)
+    frame[..., 1] = 100
+    y = luma(frame)
+    assert y.shape == (2, 3)
+    np.testing.assert_allclose(y, 58.7, rtol=1e-5)
+
+
+def test_box_means_match_brute_force():
+    x = np.random.default_rng(1).random((12, 9))
+    means = box_means(x, 4)
+    expected = np.array([[x[i:i + 4, j:j + 4].mean() for j in range(6)] for i in range(9)])
+    np.testing.assert_allclose(means, expected)
+
+
+def test_ssim_of_identical_frames_is_one(frame):
+    assert ssim(frame, frame) == pytest.approx(1.0)
+
+
+def test_ssim_drops_with_noise_and_is_symmetric(frame):
+    noisy = np.clip(frame.astype(int) + np.random.default_rng(2).integers(-40, 41, frame.shape),
+                    0, 255).astype(np.uint8)
+    value = ssim(frame, noisy)
+    assert value < 0.98
+    assert value == pytest.approx(ssim(noisy, frame))
+    assert ssim(frame, np.clip(frame.astype(int) + 1, 0, 255).astype(np.uint8)) > value
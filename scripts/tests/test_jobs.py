@@ -0,0 +1,117 @@
+import os
+
+import pytest
+
+from drip_ads import jobs
+from drip_ads.jobs import (claim, complete, connect, enqueue, fail, queue_status, renew_lease,
+                           retry_failed)
+
+SPEC = {'name': 'test', 'output': 'test_ad.mp4',
+        'scenes': [{'type': 'flash', 'duration': 1}]}
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = connect(tmp_path / 'jobs.sqlite')
+    yield conn
+    conn.close()
+
+
+def test_queueing_a_spec_twice_is_one_job(conn):
+    assert enqueue(conn, SPEC) == enqueue(conn, dict(SPEC))
+    assert queue_status(conn)['counts'] == {'pending': 1}
+
+
+def test_a_live_lease_keeps_the_job(conn):
+    enqueue(conn, SPEC)
+    job = claim(conn, 'a', lease_seconds=60)
+    assert job['attempts'] == 1 and job['spec'] == SPEC
+    assert claim(conn, 'b', lease_seconds=60) is None
+    assert renew_lease(conn, job['key'], 'a', 60)
+
+
+def test_an_expired_lease_goes_to_the_next_worker(conn):
+    enqueue(conn, SPEC)
+    lost = claim(conn, 'a', lease_seconds=-1)
+    job = claim(conn, 'b', lease_seconds=60)
+    assert job['key'] == lost['key'] and job['attempts'] == 2
+    # The first worker can no longer renew nor complete it
+    assert not renew_lease(conn, job['key'], 'a', 60)
+    complete(conn, job['key'], 'a', {'output': 'x'})
+    assert queue_status(conn)['counts'] == {'running': 1}
+
+
+def test_expired_lease_without_attempts_left_fails(conn):
+    enqueue(conn, SPEC, max_attempts=1)
+    claim(conn, 'a', lease_seconds=-1)
+    assert claim(conn, 'b') is None
+    status = queue_status(conn)
+    assert status['counts'] == {'failed': 1}
+    assert 'lease expired' in status['failed'][0]['error']
+
+
+def test_failures_back_off_then_give_up(conn, monkeypatch):
+    monkeypatch.setattr(jobs.random, 'uniform', lambda low, high: 1.0)
+    key = enqueue(conn, SPEC, max_attempts=2)
+    claim(conn, 'a')
+    assert fail(conn, key, 'a', 'boom') == 'pending'
+    status = queue_status(conn)
+    assert status['next_attempt_at'] > 0
+    # In backoff: not ready yet
+    assert claim(conn, 'a') is None
+
+    conn.execute("UPDATE jobs SET next_attempt_at = 0")
+    claim(conn, 'a')
+    assert fail(conn, key, 'a', 'boom again') == 'failed'
+    assert queue_status(conn)['failed'][0]['error'] == 'boom again'
+
+
+def test_a_failure_after_a_takeover_is_lost(conn):
+    key = enqueue(conn, SPEC)
+    claim(conn, 'a', lease_seconds=-1)
+    claim(conn, 'b', lease_seconds=60)
+    assert fail(conn, key, 'a', 'late error') == 'lost'
+    row = conn.execute("SELECT status, lease_owner, error FROM jobs").fetchone()
+    assert tuple(row) == ('running', 'b', None)
+
+
+def test_retried_jobs_drop_their_old_error(conn):
+    key = enqueue(conn, SPEC, max_attempts=1)
+    claim(conn, 'a')
+    assert fail(conn, key, 'a', 'boom') == 'failed'
+    assert retry_failed(conn) == 1
+    row = conn.execute("SELECT status, attempts, error FROM jobs").fetchone()
+    assert tuple(row) == ('pending', 0, None)
+
+
+def test_retry_delay_doubles_up_to_the_cap(monkeypatch):
+    monkeypatch.setattr(jobs.random, 'uniform', lambda low, high: 1.0)
+    delays = [jobs.retry_delay(n) for n in (1, 2, 3, 10)]
+    assert delays[:3] == [jobs.RETRY_BASE_SECONDS * k for k in (1, 2, 4)]
+    assert delays[3] == jobs.RETRY_MAX_SECONDS
+
+
+def test_stale_parts_of_dead_processes_are_removed(tmp_path):
+    dead = tmp_path / 'ad.999999999.part.mp4'
+    alive = tmp_path / f'ad.{os.getpid()}.part.mp4'
+    other = tmp_path / 'notes.txt'
+    for path in (dead, alive, other):
+        path.touch()
+    assert jobs.remove_stale_parts(tmp_path, tmp_path / 'ads') == 1
+    assert not dead.exists() and alive.exists() and other.exists()
+
+
+def test_staged_delivery_outputs_of_dead_processes_are_removed(tmp_path):
+    ads = tmp_path / 'ads'
+    (ads / 'catalog').mkdir(parents=True)
+    dead_webm = ads / 'catalog' / '.ad.999999999.part.webm'
+    dead_hls = ads / '.ad_hls.999999999.part'
+    alive = ads / f'.ad_720p.{os.getpid()}.part.mp4'
+    shipped = [ads / 'ad.mp4', ads / 'ad_hls' / 'master.m3u8']
+    (dead_hls / 'x').mkdir(parents=True)
+    shipped[1].parent.mkdir()
+    for path in (dead_webm, alive, *shipped):
+        path.touch()
+    assert jobs.remove_stale_parts(tmp_path / 'tmp', ads) == 2
+    assert not dead_webm.exists() and not dead_hls.exists()
+    assert alive.exists() and all(path.exists() for path in shipped)
@@ -0,0 +1,42 @@
+from drip_ads import layered
+from drip_ads.layered import dated_windows, layered_pieces, prune_layered_bases
+from drip_ads.specs import text
+
+
+def spec(days: int = None, badge: dict = None) -> dict:
+    dated = [text(f"PLUS QUE {days} JOURS", 1, 2.5, 700)] if days else []
+    return {'name': 'layered_test', 'output': 'layered_test.mp4', 'badge': badge,
+            'scenes': [
+                {'type': 'image_text', 'duration': 2, 'zoom': False,
+                 'source': {'color': [30, 30, 40], 'name': 'a'}, 'overlays': []},
+                {'type': 'image_text', 'duration': 3, 'zoom': False,
+                 'source': {'color': [50, 30, 40], 'name': 'b'},
+                 'overlays': dated + [text("DRIP.", 0, 3, 1000)]},
+                {'type': 'urgency', 'duration': 1, 'countdown': f"J-{days}" if days else None,
+                 'transition': {'kind': 'crossfade', 'duration': 0.2}},
+            ]}
+
+
+def test_only_the_changed_overlays_and_scenes_are_dated():
+    # Overlay lifetime in scene 2; urgency scene widened by its transition
+    assert dated_windows(spec(), spec(3)) == [(3.0, 4.5), (4.9, 6.0)]
+    assert dated_windows(spec(), spec()) == []
+
+
+def test_a_changed_global_layer_dates_every_frame():
+    assert dated_windows(spec(), spec(3, badge={'kind': 'static', 'text': "J-3"})) == [(0.0, 6.0)]
+
+
+def test_pieces_cover_the_timeline():
+    assert layered_pieces(spec(), spec(3)) == [
+        (0.0, 3.0, False), (3.0, 4.5, True), (4.5, 4.9, False), (4.9, 6.0, True)]
+
+
+def test_a_new_base_prunes_the_older_ones(tmp_path, monkeypatch):
+    monkeypatch.setattr(layered, 'TEMP_DIR', tmp_path)
+    names = ['viral_base_old_00000-00100.mp4', 'viral_base_0123.mkv',
+             'viral_base_new_00000-00100.mp4', 'compilation_base_old_00000-00100.mp4']
+    for name in names:
+        (tmp_path / name).write_bytes(b'')
+    assert prune_layered_bases('viral', 'new') == 2
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted(names[2:])
@@ -0,0 +1,86 @@
+import os
+
+import pytest
+
+from drip_ads import scheduler
+from drip_ads.scheduler import admit, adjust_limit, encoder_threads, max_jobs, render_slot
+
+MACHINE = {'cores': 8, 'total_mb': 16384, 'available_mb': 12000}
+
+
+def state(limit=0, running=(), rates=None):
+    return {'limit': limit, 'rates': rates or {},
+            'running': {str(i): job for i, job in enumerate(running)}}
+
+
+def test_max_jobs_is_bounded_by_cores_and_memory():
+    assert max_jobs(500, MACHINE) == 8
+    assert max_jobs(5000, MACHINE) == 3
+    assert max_jobs(50000, MACHINE) == 1
+
+
+def test_encoder_threads_share_the_cores():
+    assert encoder_threads(8, 1) == 7
+    assert encoder_threads(8, 4) == 1
+    assert encoder_threads(2, 4) == 1
+    assert encoder_threads(64, 1) == scheduler.MAX_ENCODER_THREADS
+
+
+def test_first_admission_starts_at_one_render_per_two_cores():
+    s = state()
+    assert admit(s, 500, MACHINE)
+    assert s['limit'] == 4
+
+
+def test_admission_stops_at_the_limit():
+    job = {'pid': os.getpid(), 'peak_mb': 0}
+    assert not admit(state(2, [job, job]), 500, MACHINE)
+    assert admit(state(3, [job, job]), 500, MACHINE)
+
+
+def test_admission_keeps_memory_for_running_renders():
+    # A running render still far from its planned peak holds that memory
+    growing = {'pid': os.getpid(), 'peak_mb': 100000}
+    assert not admit(state(4, [growing]), 500, MACHINE)
+    # Alone, a render is admitted whatever its plan
+    assert admit(state(4), 100000, MACHINE)
+
+
+def test_limit_climbs_while_unmeasured_or_faster():
+    s = state(2, rates={'2': 10.0})
+    adjust_limit(s, ceiling=8)
+    assert s['limit'] == 3
+    s = state(3, rates={'2': 10.0, '3': 10.2, '4': 10.3})
+    adjust_limit(s, ceiling=8)
+    assert s['limit'] == 3
+
+
+def test_limit_backs_off_when_slower_than_below():
+    s = state(3, rates={'2': 10.0, '3': 8.0})
+    adjust_limit(s, ceiling=8)
+    assert s['limit'] == 2
+
+
+def test_limit_stays_under_the_ceiling():
+    s = state(4, rates={'4': 10.0})
+    adjust_limit(s, ceiling=4)
+    assert s['limit'] == 4
+
+
+def test_render_slot_registers_and_measures(tmp_path, monkeypatch):
+    monkeypatch.setattr(scheduler, 'SCHEDULER_DIR', tmp_path)
+    with render_slot(10, frames=30, threads=3) as slot:
+        assert slot['threads'] == 3
+        assert str(os.getpid()) in scheduler.scheduler_status()['running']
+    status = scheduler.scheduler_status()
+    assert status['running'] == {}
+    assert list(status['rates']) == ['1']
+
+
+def test_failed_render_is_not_measured(tmp_path, monkeypatch):
+    monkeypatch.setattr(scheduler, 'SCHEDULER_DIR', tmp_path)
+    with pytest.raises(RuntimeError):
+        with render_slot(10, frames=30):
+            raise RuntimeError
+    status = scheduler.scheduler_status()
+    assert status['running'] == {} and status['rates'] == {}
@@ -0,0 +1,99 @@
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.client import HTTPConnection
+
+import pytest
+
+from drip_ads import server
+from drip_ads.server import RenderHandler, resolve_spec, submit_job
+
+SPEC = {'name': 'server_test', 'output': 'server_test.mp4',
+        'scenes': [{'type': 'flash', 'duration': 1}]}
+
+
+@pytest.fixture
+def daemon(tmp_path, monkeypatch):
+    """Daemon on a free localhost port; renders block until `release` is set"""
+    release = threading.Event()
+    renders = []
+
+    def render_job(spec):
+        renders.append(spec['name'])
+        release.wait(5)
+        if spec['name'] == 'broken':
+            raise RuntimeError("render failed")
+        output = tmp_path / 'ads' / spec['output']
+        output.parent.mkdir(exist_ok=True)
+        output.write_bytes(b'mp4')
+        return {'output': str(output.relative_to(tmp_path)), 'render_seconds': 0}
+
+    monkeypatch.setattr(server, 'render_job', render_job)
+    monkeypatch.setattr(server, 'OUTPUT_DIR', tmp_path / 'ads')
+    monkeypatch.setattr(server, 'PROJECT_ROOT', tmp_path)
+    httpd = server.ThreadingHTTPServer(('127.0.0.1', 0), RenderHandler)
+    httpd.pool = ThreadPoolExecutor(max_workers=1)
+    httpd.workers = 1
+    httpd.jobs = {}
+    httpd.lock = threading.RLock()
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd, release, renders
+    release.set()
+    httpd.shutdown()
+    httpd.server_close()
+    httpd.pool.shutdown(wait=True)
+
+
+def post(httpd, path: str, body) -> tuple:
+    conn = HTTPConnection(*httpd.server_address, timeout=10)
+    conn.request('POST', path, body=json.dumps(body),
+                 headers={'Content-Type': 'application/json'})
+    response = conn.getresponse()
+    payload = json.loads(response.read())
+    conn.close()
+    return response.status, payload
+
+
+def test_resolve_spec_rejects_bad_bodies():
+    assert resolve_spec([SPEC]) == (None, ["body must be a JSON object"])
+    assert resolve_spec({'product_id': 'x', 'template': 'nope'})[1] == ["unknown template 'nope'"]
+    assert resolve_spec({'product_id': 'no-such-product'})[1] == ["unknown product 'no-such-product'"]
+    spec, errors = resolve_spec({'spec': dict(SPEC, output='../../etc/passwd.mp4')})
+    assert spec is None and errors
+
+
+def test_resolve_spec_builds_catalog_specs():
+    spec, errors = resolve_spec({'product_id': 'mini-projector-2025', 'template': 'valentine'})
+    assert errors == []
+    assert spec['output'].endswith('.mp4')
+
+
+def test_submitting_a_spec_twice_is_one_job(daemon):
+    httpd, release, renders = daemon
+    first = submit_job(httpd, SPEC)
+    assert submit_job(httpd, json.loads(json.dumps(SPEC))) is first
+    release.set()
+    first['finished_event'].wait(5)
+    assert first['status'] == 'done'
+    # Finished with its output on disk: not rendered again
+    assert submit_job(httpd, SPEC) is first
+    assert renders == ['server_test']
+
+
+def test_render_status_codes(daemon, monkeypatch):
+    httpd, release, _ = daemon
+    status, payload = post(httpd, '/render', {'spec': {'scenes': []}})
+    assert status == 400 and payload['errors']
+
+    monkeypatch.setattr(server, 'WAIT_TIMEOUT', 0.2)
+    status, payload = post(httpd, '/render?wait=1', {'spec': SPEC})
+    assert status == 202 and payload['status'] in ('queued', 'running')
+
+    release.set()
+    monkeypatch.setattr(server, 'WAIT_TIMEOUT', 5)
+    status, payload = post(httpd, '/render?wait=1', {'spec': SPEC})
+    assert status == 200 and payload['status'] == 'done'
+
+    status, payload = post(httpd, '/render?wait=1', {'spec': dict(SPEC, name='broken')})
+    assert status == 500 and payload['error'] == "render failed"
@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from drip_ads.transitions import apply_transition, box_blur, transition_buffers
+
+SHAPE = (64, 48, 3)
+
+
+@pytest.fixture
+def buffers():
+    return transition_buffers(SHAPE)
+
+
+@pytest.fixture
+def frames():
+    rng = np.random.default_rng(0)
+    a = rng.integers(0, 256, SHAPE, dtype=np.uint8)
+    b = rng.integers(0, 256, SHAPE, dtype=np.uint8)
+    return a, b
+
+
+def run(kind, a, b, p, buffers, **params):
+    out = np.empty(SHAPE, dtype=np.uint8)
+    apply_transition(out, a, b, p, dict(kind=kind, duration=0.4, **params), buffers)
+    return out
+
+
+@pytest.mark.parametrize('kind', ['crossfade', 'dip', 'swipe', 'zoom_through', 'whip'])
+def test_ends_show_the_outgoing_then_the_incoming_frame(kind, frames, buffers):
+    a, b = frames
+    np.testing.assert_array_equal(run(kind, a, b, 0.0, buffers), a)
+    np.testing.assert_array_equal(run(kind, a, b, 1.0, buffers), b)
+
+
+def test_crossfade_is_the_rounded_integer_mix(frames, buffers):
+    a, b = frames
+    expected = (a.astype(int) * 192 + b.astype(int) * 64 + 128) >> 8
+    np.testing.assert_array_equal(run('crossfade', a, b, 0.25, buffers), expected)
+
+
+def test_dip_reaches_its_color_at_the_cut(frames, buffers):
+    a, b = frames
+    out = run('dip', a, b, 0.5, buffers, color=[10, 20, 30])
+    assert (out == [10, 20, 30]).all()
+
+
+@pytest.mark.parametrize('direction, axis', [('left', 1), ('up', 0)])
+def test_swipe_halfway_joins_both_frames(direction, axis, frames, buffers):
+    a, b = frames
+    out = run('swipe', a, b, 0.5, buffers, direction=direction)
+    half = SHAPE[axis] // 2
+    if axis == 1:
+        np.testing.assert_array_equal(out[:, :half], a[:, half:])
+        np.testing.assert_array_equal(out[:, half:], b[:, :half])
+    else:
+        np.testing.assert_array_equal(out[:half], a[half:])
+        np.testing.assert_array_equal(out[half:], b[:half])
+
+
+def test_kernels_accept_read_only_broadcast_frames(buffers):
+    a = np.broadcast_to(np.array([200, 0, 0], dtype=np.uint8), SHAPE)
+    b = np.broadcast_to(np.array([0, 0, 200], dtype=np.uint8), SHAPE)
+    out = run('crossfade', a, b, 0.5, buffers)
+    assert (out == [100, 0, 100]).all()
+
+
+def test_box_blur_keeps_a_uniform_frame(buffers):
+    out = np.full(SHAPE, 77, dtype=np.uint8)
+    box_blur(out, 12, 'left', buffers)
+    assert (out == 77).all()
+
+
+def test_box_blur_matches_a_moving_average(buffers):
+    row = np.arange(SHAPE[1], dtype=np.uint8) * 5
+    out = np.empty(SHAPE, dtype=np.uint8)
+    out[...] = row[None, :, None]
+    box_blur(out, 4, 'left', buffers, step=1)
+    padded = [row[max(i - 4, 0):i + 5].astype(int) for i in range(SHAPE[1])]
+    expected = np.array([w.sum() // len(w) for w in padded])
+    np.testing.assert_array_equal(out[0, :, 0], expected)
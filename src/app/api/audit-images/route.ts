@@ -2,6 +2,10 @@
  * API Endpoint: Audit et mise a jour des images produits
  * GET /api/audit-images - Recupere les images CJ et genere un rapport
  * POST /api/audit-images - Met a jour products.json avec les vraies images CJ
+ *
+ * Les images CJ rejetees par le preflight (src/data/image-preflight.json,
+ * genere par `python3 scripts/drip-ads.py preflight --audit audit.json`)
+ * ne sont pas appliquees: illisibles, trop petites ou doublons.
  */
 
 import { NextRequest, NextResponse } from 'next/server'
@@ -33,8 +37,29 @@ interface AuditResult {
   message: string
 }
 
+interface PreflightImage {
+  status: 'ok' | 'warning' | 'error'
+  issues: string[]
+  duplicate_of?: string
+}
+
 // Chemin vers products.json
 const PRODUCTS_FILE = path.join(process.cwd(), 'src/data/products.json')
+// Rapport du preflight des images (scripts/drip_ads/preflight.py)
+const PREFLIGHT_REPORT = path.join(process.cwd(), 'src/data/image-preflight.json')
+
+function readPreflight(): Record<string, PreflightImage> {
+  if (!fs.existsSync(PREFLIGHT_REPORT)) return {}
+  return JSON.parse(fs.readFileSync(PREFLIGHT_REPORT, 'utf-8')).images || {}
+}
+
+// Une image est rejetee si le preflight la juge illisible/trop petite ou doublon
+function preflightRejects(image: PreflightImage | undefined): string | null {
+  if (!image) return null
+  if (image.status === 'error') return image.issues.join('; ')
+  if (image.duplicate_of) return `doublon de ${image.duplicate_of}`
+  return null
+}
 
 export async function GET() {
   console.log('=== AUDIT IMAGES PRODUITS ===')
@@ -187,6 +212,8 @@ export async function POST(request: NextRequest) {
 
     // Appliquer les mises a jour
     const changes: string[] = []
+    const preflight = readPreflight()
+    const rejected: Array<{ id: string; image: string; reason: string }> = []
 
     for (const result of auditData.details as AuditResult[]) {
       if (result.status === 'updated' && result.cjImages.length > 0) {
@@ -194,8 +221,17 @@ export async function POST(request: NextRequest) {
         const productIndex = productsData.findIndex((p: any) => p.id === result.productId)
 
         if (productIndex !== -1) {
-          // Garder les 4 premieres images CJ
-          const newImages = result.cjImages.slice(0, 4)
+          // Garder les 4 premieres images CJ acceptees par le preflight
+          const accepted = result.cjImages.filter(image => {
+            const reason = preflightRejects(preflight[image])
+            if (reason) {
+              rejected.push({ id: result.productId, image, reason })
+              console.log(`[PREFLIGHT] ${result.productId}: ${image} rejetee (${reason})`)
+            }
+            return !reason
+          })
+          if (accepted.length === 0) continue
+          const newImages = accepted.slice(0, 4)
 
           productsData[productIndex].image = newImages[0]
           productsData[productIndex].images = newImages
@@ -217,6 +253,7 @@ export async function POST(request: NextRequest) {
       message: `${changes.length} produits mis a jour`,
       backup: backupPath,
       changes,
+      rejected,
       unchanged: auditData.details.filter((r: AuditResult) => r.status !== 'updated').map((r: AuditResult) => ({
         id: r.productId,
         reason: r.message
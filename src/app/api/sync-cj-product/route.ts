@@ -5,6 +5,26 @@ import * as path from 'path'
 
 const PRODUCTS_FILE = path.join(process.cwd(), 'src/data/products.json')
 
+// Local render daemon (python3 scripts/drip-ads.py serve), e.g. http://127.0.0.1:8765
+const RENDER_DAEMON_URL = process.env.DRIP_RENDER_URL
+
+// Queue the catalog ad of a synced product; the sync never fails because of it
+async function queueProductAd(productId: string) {
+  if (!RENDER_DAEMON_URL) return null
+  try {
+    const response = await fetch(`${RENDER_DAEMON_URL}/render`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ product_id: productId, template: 'showcase' }),
+      signal: AbortSignal.timeout(2000),
+    })
+    return await response.json()
+  } catch (error) {
+    console.error('Render daemon unreachable:', error)
+    return null
+  }
+}
+
 interface CJProduct {
   pid: string
   productNameEn: string
@@ -136,10 +156,13 @@ export async function POST(request: NextRequest) {
     // Save
     fs.writeFileSync(PRODUCTS_FILE, JSON.stringify(products, null, 2))
 
+    const renderJob = await queueProductAd(localProductId)
+
     return NextResponse.json({
       success: true,
       message: existingIndex >= 0 ? 'Product updated' : 'Product added',
       product: existingIndex >= 0 ? products[existingIndex] : productData,
+      renderJob,
     })
   } catch (error) {
     console.error('Sync error:', error)